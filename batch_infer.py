@@ -0,0 +1,211 @@
+# --- FILE: batch_infer.py ---
+"""
+Headless batch inference over the same models the GUI uses.
+
+Examples:
+    python batch_infer.py --model "Sentiment Analysis" --input reviews.jsonl --output emotions.jsonl
+    cat prompts.txt | python batch_infer.py --model "Text-to-Image" --format txt --workers 2 --output images.jsonl
+    python batch_infer.py --model "Sentiment Analysis" --input reviews.csv --output emotions.jsonl --resume
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from gui.model_selector import ModelSelector
+from models.registry import MODEL_SPECS
+
+
+# --- Input: generator pipeline, one row at a time ---
+
+def read_rows(stream, fmt, text_field, id_field):
+    """
+    Yields (row_index, row_id, text) from a JSONL, CSV or plain-text stream without buffering it.
+    A JSON file holding one array of records is the exception: it is parsed whole.
+    """
+    if fmt == "csv":
+        records = csv.DictReader(stream)
+    elif fmt == "json":
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError("A .json input must hold an array of records; use .jsonl for one record per line.")
+    elif fmt == "jsonl":
+        records = (json.loads(line) for line in stream if line.strip())
+    else:
+        records = ({text_field: line.rstrip("\n")} for line in stream if line.strip())
+    for index, record in enumerate(records):
+        yield index, record.get(id_field, index), record[text_field]
+
+
+def windows(rows, size):
+    """Groups a row iterator into lists of at most size rows."""
+    rows = iter(rows)
+    while True:
+        window = list(islice(rows, size))
+        if not window:
+            return
+        yield window
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".json": "json"}.get(extension, "txt")
+
+
+# --- Checkpointing: a sidecar file records how many input rows are safely on disk ---
+
+class Checkpoint:
+    """
+    Tracks progress as (rows_done, output_bytes). Output is only committed a whole
+    window at a time, so on resume the output is truncated back to output_bytes and
+    the first rows_done input rows are skipped.
+    """
+
+    def __init__(self, output_path):
+        self.path = output_path + ".ckpt"
+        self.rows_done = 0
+        self.output_bytes = 0
+
+    def load(self):
+        """Reads the checkpoint; returns False if there is none."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            state = json.load(f)
+        self.rows_done = state["rows_done"]
+        self.output_bytes = state["output_bytes"]
+        return True
+
+    def save(self, rows_done, output_bytes):
+        self.rows_done, self.output_bytes = rows_done, output_bytes
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"rows_done": rows_done, "output_bytes": output_bytes}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# --- Per-model runners ---
+
+def run_sentiment(model, window):
+    """Runs one window through predict_batch (which sorts by length internally)."""
+    results = model.predict_batch([text for _, _, text in window])
+    return [dict(id=row_id, **result.to_dict()) for (_, row_id, _), result in zip(window, results)]
+
+
+# Each pool worker process holds its own loaded model
+_worker_model = None
+
+
+def _init_image_worker(model_name, profile):
+    global _worker_model
+    _worker_model = ModelSelector().load_model(model_name)
+    if _worker_model is None:
+        raise RuntimeError(f"Failed to load {model_name} in worker process.")
+    if profile:
+        _worker_model.set_profile(profile)
+
+
+def _image_record(model, row):
+    _, row_id, prompt = row
+    result = model.predict(prompt)
+    # The image is written in the background; wait so the checkpoint never points at a missing file
+    return {"id": row_id, "prompt": prompt, "image": result.wait_saved()}
+
+
+def _generate_image(row):
+    return _image_record(_worker_model, row)
+
+
+def run_images(model, window, pool):
+    if pool is not None:
+        return list(pool.map(_generate_image, window))
+    return [_image_record(model, row) for row in window]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a model over a JSONL/CSV/text corpus and write JSONL results.")
+    parser.add_argument("--model", required=True, choices=list(MODEL_SPECS))
+    parser.add_argument("--input", default="-", help="Input file, or '-' for stdin (default).")
+    parser.add_argument("--format", choices=["jsonl", "json", "csv", "txt"],
+                        help="Input format (default: from extension); json is a single array of records.")
+    parser.add_argument("--text-field", default="text", help="Field holding the input text (jsonl/csv).")
+    parser.add_argument("--id-field", default="id", help="Field holding a row id; defaults to the row number.")
+    parser.add_argument("--output", required=True, help="Output JSONL file.")
+    parser.add_argument("--window", type=int,
+                        help="Rows read, sorted and committed together; bounds memory use "
+                             "(default: 4096 for sentiment, 8 for images).")
+    parser.add_argument("--batch-size", type=int, default=64, help="Sentiment pipeline batch size.")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for image generation.")
+    parser.add_argument("--profile", help="Text-to-Image performance profile.")
+    parser.add_argument("--backend", help="Sentiment backend: eager, int8 or onnx.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint.")
+    args = parser.parse_args(argv)
+
+    is_image_model = args.model == "Text-to-Image"
+    fmt = args.format or ("txt" if args.input == "-" else detect_format(args.input))
+    checkpoint = Checkpoint(args.output)
+    window_size = args.window or (8 if is_image_model else 4096)
+    if args.resume:
+        if not checkpoint.load() and os.path.exists(args.output):
+            parser.error(f"No checkpoint for {args.output}; the previous run already finished.")
+    elif os.path.exists(args.output):
+        parser.error(f"{args.output} already exists; use --resume or choose another path.")
+
+    # Load the model once in this process (workers load their own copy)
+    pool, model = None, None
+    if is_image_model and args.workers > 0:
+        pool = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_image_worker,
+                                   initargs=(args.model, args.profile))
+    else:
+        selector = ModelSelector()
+        model = selector.get_model(args.model)
+        if not is_image_model:
+            model.set_batch_size(args.batch_size)
+        if args.profile and hasattr(model, "set_profile"):
+            model.set_profile(args.profile)
+        if args.backend and hasattr(model, "set_backend"):
+            model.set_backend(args.backend)
+        if not model.load_model():
+            print(f"Failed to load {args.model}.", file=sys.stderr)
+            return 1
+
+    stream = sys.stdin if args.input == "-" else open(args.input, newline="" if fmt == "csv" else None)
+    rows = read_rows(stream, fmt, args.text_field, args.id_field)
+    rows = islice(rows, checkpoint.rows_done, None)
+
+    rows_done = checkpoint.rows_done
+    try:
+        with open(args.output, "a+b") as out:
+            # Drop any partially written window from a crashed run
+            out.truncate(checkpoint.output_bytes)
+            out.seek(checkpoint.output_bytes)
+            for window in windows(rows, window_size):
+                if is_image_model:
+                    records = run_images(model, window, pool)
+                else:
+                    records = run_sentiment(model, window)
+                out.write("".join(json.dumps(record) + "\n" for record in records).encode("utf-8"))
+                out.flush()
+                os.fsync(out.fileno())
+                rows_done += len(window)
+                checkpoint.save(rows_done, out.tell())
+                print(f"{rows_done} rows done", file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if pool is not None:
+            pool.shutdown()
+
+    checkpoint.remove()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
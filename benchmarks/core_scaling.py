@@ -0,0 +1,101 @@
+# --- FILE: benchmarks/core_scaling.py ---
+"""
+Sentiment throughput as the pinned replica pool grows across cores.
+
+    python benchmarks/core_scaling.py                        # real SentimentModel at 1, 2, 4 and N cores
+    python benchmarks/core_scaling.py --stub --cores 1,2     # CPU-bound stub, offline
+    python benchmarks/core_scaling.py --threads-per-replica 1 --output scaling.json
+
+For each core count the cores are split into replicas by models/core_scheduler.py,
+each replica is pinned to its slice, and 2 clients per replica keep the pool busy.
+Speedup and efficiency (speedup / cores) are relative to the 1-core run.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# Allow running as a script from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.run_benchmarks import environment_info, make_inputs, parse_int_list
+from models.core_scheduler import available_cores, plan_cores
+from models.registry import MODEL_SPECS, ModelSpec
+from models.remote_model import RemoteModel
+
+MODEL_NAME = "Sentiment Analysis"
+STUB_SPEC = ModelSpec(MODEL_NAME, "benchmarks.stub_models", "StubCpuSentimentModel",
+                      "stub/sentiment", "Stub", "CPU-bound stand-in for SentimentModel", "Any text")
+
+
+def measure(spec, cores, threads_per_replica, batch_size, requests_per_client):
+    """Items/second for a pool pinned to `cores`."""
+    core_sets = plan_cores([MODEL_NAME], threads_per_replica={MODEL_NAME: threads_per_replica},
+                           cores=cores)[MODEL_NAME]
+    model = RemoteModel(spec, core_sets=core_sets)
+    if not model.load_model():
+        raise RuntimeError(f"Could not start {len(core_sets)} replicas")
+    try:
+        clients = 2 * len(core_sets)
+        inputs = make_inputs(MODEL_NAME, batch_size * requests_per_client * clients)
+        batches = [inputs[i:i + batch_size] for i in range(0, len(inputs), batch_size)]
+        # Warm every replica before timing
+        for _ in core_sets:
+            model.predict_batch(batches[0])
+        chunks = [batches[i::clients] for i in range(clients)]
+        threads = [threading.Thread(target=lambda chunk=chunk: [model.predict_batch(batch) for batch in chunk])
+                   for chunk in chunks]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return {"cores": len(cores), "replicas": len(core_sets), "core_sets": core_sets,
+                "items_per_s": len(inputs) / elapsed}
+    finally:
+        model.unload_model()
+
+
+def main(argv=None):
+    cores = available_cores()
+    parser = argparse.ArgumentParser(description="Measure sentiment throughput scaling across cores.")
+    parser.add_argument("--stub", action="store_true", help="Use a CPU-bound offline stub model.")
+    parser.add_argument("--cores", type=parse_int_list,
+                        default=sorted({c for c in (1, 2, 4, len(cores)) if c <= len(cores)}),
+                        help="Core counts to measure (default: 1,2,4,N).")
+    parser.add_argument("--threads-per-replica", type=int, default=2, help="Cores per replica.")
+    parser.add_argument("--batch-size", type=int, default=8, help="Texts per predict_batch() request.")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client.")
+    parser.add_argument("--output", help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    spec = STUB_SPEC if args.stub else MODEL_SPECS[MODEL_NAME]
+    report = {"environment": environment_info(), "stub": args.stub, "results": []}
+    for count in args.cores:
+        if count > len(cores):
+            print(f"Skipping {count} cores: only {len(cores)} available", file=sys.stderr)
+            continue
+        print(f"Measuring {count} core(s)...", file=sys.stderr)
+        result = measure(spec, cores[:count], args.threads_per_replica, args.batch_size, args.requests)
+        report["results"].append(result)
+
+    if report["results"]:
+        base = report["results"][0]
+        for result in report["results"]:
+            result["speedup"] = result["items_per_s"] / base["items_per_s"]
+            result["efficiency"] = result["speedup"] / (result["cores"] / base["cores"])
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
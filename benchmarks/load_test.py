@@ -0,0 +1,106 @@
+# --- FILE: benchmarks/load_test.py ---
+"""
+Closed-loop load test for server.py: N keep-alive connections send requests
+back to back for a fixed duration, then throughput and tail latency are reported.
+
+    python server.py --model "Sentiment Analysis" &
+    python benchmarks/load_test.py --model "Sentiment Analysis" --connections 16 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+SAMPLE_INPUTS = [
+    "I was totally surprised by the ending of that show!",
+    "This is the worst service I have ever had.",
+    "I miss my family so much.",
+    "The package arrived on time.",
+    "I can't believe they cancelled the concert, I'm furious.",
+    "What a wonderful day at the beach with friends!",
+]
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100.0 * len(ordered)) - 1)]
+
+
+async def send(reader, writer, host, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write((f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def connection_loop(args, deadline, latencies, statuses, inputs):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        while time.perf_counter() < deadline:
+            payload = {"model": args.model, "input": random.choice(inputs)}
+            start = time.perf_counter()
+            status = await send(reader, writer, args.host, payload)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            elif status == 429:
+                await asyncio.sleep(0.05)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    if args.unique_inputs:
+        # Distinct inputs defeat request coalescing, measuring raw model throughput
+        inputs = [f"{text} #{i}" for i in range(1000) for text in SAMPLE_INPUTS]
+    else:
+        inputs = SAMPLE_INPUTS
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(connection_loop(args, deadline, latencies, statuses, inputs)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+    return {
+        "model": args.model,
+        "connections": args.connections,
+        "duration": elapsed,
+        "completed": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "status_counts": statuses,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": max(latencies) if latencies else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the local inference server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="Sentiment Analysis")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--unique-inputs", action="store_true", help="Avoid repeated inputs (no coalescing).")
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
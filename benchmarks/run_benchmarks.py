@@ -0,0 +1,235 @@
+# --- FILE: benchmarks/run_benchmarks.py ---
+"""
+Reproducible benchmarks for load_model() and predict() across the registered models.
+
+    python benchmarks/run_benchmarks.py --stub --output bench_stub.json      # offline, seconds
+    python benchmarks/run_benchmarks.py --output bench_real.json             # real models
+    python benchmarks/run_benchmarks.py --compare bench_old.json bench_new.json --threshold 0.1
+    python benchmarks/run_benchmarks.py --trace-dir traces/                  # + Chrome traces of stages
+
+Each model is measured in a fresh interpreter so cold import time and peak RSS
+are not polluted by the other model.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+# Allow running as a script from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+WORDS = ("the movie was surprisingly good and i loved every minute of it but the ending "
+         "made me sad and a little angry because nobody expected that twist").split()
+PROMPTS = ["a cute puppy wearing sunglasses", "a watercolor lighthouse at dusk", "a bowl of ramen, studio lighting"]
+
+# Metrics where a larger value is better; every other numeric metric is lower-is-better
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def make_inputs(model_name, count, seed=0):
+    """Deterministic inputs of mixed length for the given model."""
+    rng = random.Random(seed)
+    if model_name == "Text-to-Image":
+        return [PROMPTS[i % len(PROMPTS)] for i in range(count)]
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 60))) for _ in range(count)]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100.0 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def measure_concurrency(model, inputs, concurrency):
+    """Requests/second with `concurrency` threads each calling predict()."""
+    chunks = [inputs[i::concurrency] for i in range(concurrency)]
+    threads = [threading.Thread(target=lambda chunk=chunk: [model.predict(x) for x in chunk]) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(inputs) / (time.perf_counter() - start)
+
+
+def benchmark_model(model_name, use_stub, iterations, batch_sizes, concurrency_levels, trace_dir=None):
+    """Runs every measurement for one model in the current process."""
+    from models.registry import MODEL_SPECS
+    from utils.memory import peak_rss_bytes
+    if use_stub:
+        from benchmarks.stub_models import STUB_SPECS as specs
+    else:
+        specs = MODEL_SPECS
+    spec = specs[model_name]
+    result = {}
+    # A real diffusion run takes tens of seconds; keep its sample counts small
+    requests_per_thread, batches_per_size = 4, 4
+    if model_name == "Text-to-Image" and not use_stub:
+        iterations, requests_per_thread, batches_per_size = min(iterations, 3), 1, 1
+        # Batched diffusion is compared against batch size 1 (serial); large batches exhaust RAM
+        batch_sizes = [size for size in batch_sizes if size <= 4] or [1]
+
+    start = time.perf_counter()
+    model_class = spec.import_class()
+    result["import_seconds"] = time.perf_counter() - start
+
+    model = model_class()
+    if hasattr(model, "enable_instrumentation"):
+        # RSS counters are only worth their cost when a trace is exported
+        model.enable_instrumentation(sample_memory=trace_dir is not None)
+    start = time.perf_counter()
+    if not model.load_model():
+        raise RuntimeError(f"load_model() failed for {model_name}")
+    result["load_seconds"] = time.perf_counter() - start
+
+    inputs = make_inputs(model_name, max(iterations + 1, max(batch_sizes) * 4,
+                                         max(concurrency_levels) * requests_per_thread))
+    start = time.perf_counter()
+    model.predict(inputs[0])
+    result["first_predict_seconds"] = time.perf_counter() - start
+
+    warm = []
+    for text in inputs[1:iterations + 1]:
+        start = time.perf_counter()
+        model.predict(text)
+        warm.append(time.perf_counter() - start)
+    result["warm_predict_p50_seconds"] = percentile(warm, 50)
+    result["warm_predict_p95_seconds"] = percentile(warm, 95)
+
+    if hasattr(model, "predict_batch"):
+        for batch_size in batch_sizes:
+            batches = [inputs[i:i + batch_size] for i in range(0, batch_size * batches_per_size, batch_size)]
+            start = time.perf_counter()
+            for batch in batches:
+                model.predict_batch(batch)
+            result[f"throughput_batch_{batch_size}_items_per_s"] = batch_size * len(batches) / (time.perf_counter() - start)
+
+    for concurrency in concurrency_levels:
+        result[f"throughput_concurrency_{concurrency}_req_per_s"] = measure_concurrency(
+            model, inputs[:concurrency * requests_per_thread], concurrency)
+
+    # Where predict() time goes, for models with a TimingMixin
+    if hasattr(model, "get_timing_stats"):
+        for stage, summary in model.get_timing_stats()["stages"].items():
+            result[f"stage_{stage}_mean_seconds"] = summary["mean"]
+        if trace_dir:
+            model.export_chrome_trace(os.path.join(trace_dir, f"{model_name.replace(' ', '_')}.trace.json"))
+
+    result["peak_rss_bytes"] = peak_rss_bytes()
+    return result
+
+
+def run_isolated(model_name, args):
+    """Benchmarks one model in a child interpreter and returns its result dict."""
+    command = [sys.executable, os.path.abspath(__file__), "--single", model_name,
+               "--iterations", str(args.iterations),
+               "--batch-sizes", ",".join(map(str, args.batch_sizes)),
+               "--concurrency", ",".join(map(str, args.concurrency))]
+    if args.stub:
+        command.append("--stub")
+    if args.trace_dir:
+        command += ["--trace-dir", os.path.abspath(args.trace_dir)]
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit
+    }
+
+
+def compare(baseline, current, threshold, min_seconds=0.005):
+    """
+    Returns (metric path, baseline, current, relative change) for every regression beyond threshold.
+    Timing metrics that moved by less than min_seconds in absolute terms are treated as noise.
+    """
+    regressions = []
+    for model_name, metrics in current["results"].items():
+        old_metrics = baseline["results"].get(model_name, {})
+        for metric, new_value in metrics.items():
+            old_value = old_metrics.get(metric)
+            if not isinstance(new_value, (int, float)) or not isinstance(old_value, (int, float)) or not old_value:
+                continue
+            if metric.endswith("_seconds") and abs(new_value - old_value) < min_seconds:
+                continue
+            change = (new_value - old_value) / old_value
+            worse = -change if metric.startswith(HIGHER_IS_BETTER) else change
+            if worse > threshold:
+                regressions.append((f"{model_name}.{metric}", old_value, new_value, change))
+    return regressions
+
+
+def parse_int_list(value):
+    return [int(part) for part in value.split(",") if part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model import, load and predict.")
+    parser.add_argument("--models", nargs="*", help="Model display names (default: all).")
+    parser.add_argument("--stub", action="store_true", help="Use offline stub models.")
+    parser.add_argument("--iterations", type=int, default=20, help="Warm predict() samples.")
+    parser.add_argument("--batch-sizes", type=parse_int_list, default=[1, 8, 32])
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 4, 8])
+    parser.add_argument("--output", help="Write results JSON here.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files and report regressions.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression.")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="Ignore timing changes smaller than this many seconds.")
+    parser.add_argument("--trace-dir", help="Write a Chrome trace of each model's stages here.")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        print(json.dumps(benchmark_model(args.single, args.stub, args.iterations, args.batch_sizes, args.concurrency,
+                                        args.trace_dir)))
+        return 0
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.min_seconds)
+        for metric, old_value, new_value, change in regressions:
+            print(f"REGRESSION {metric}: {old_value:.6g} -> {new_value:.6g} ({change:+.1%})")
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    from models.registry import MODEL_SPECS
+    if args.trace_dir:
+        os.makedirs(args.trace_dir, exist_ok=True)
+    report = {"environment": environment_info(), "stub": args.stub, "results": {}}
+    for model_name in args.models or list(MODEL_SPECS):
+        print(f"Benchmarking {model_name}...", file=sys.stderr)
+        report["results"][model_name] = run_isolated(model_name, args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# --- FILE: benchmarks/sentiment_backends.py ---
+"""
+Accuracy parity and latency/throughput of the SentimentModel backends.
+
+    python benchmarks/sentiment_backends.py                         # eager vs int8 vs onnx
+    python benchmarks/sentiment_backends.py --backends eager onnx --output backends.json
+
+Every backend classifies the same fixed evaluation set. Labels and scores are compared
+with the eager backend; the run fails (exit code 1) if any backend's label agreement
+falls below --min-agreement.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Allow running as a script from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.run_benchmarks import environment_info, percentile
+
+# Fixed evaluation set: a few clear examples per emotion plus mixed and long inputs
+EVAL_TEXTS = [
+    "I can't believe they cancelled my flight again, this is outrageous!",
+    "Stop touching my things, I am sick of it.",
+    "That smell from the bin is absolutely revolting.",
+    "Ugh, there was a hair in my soup.",
+    "I heard footsteps in the empty house last night and couldn't sleep.",
+    "What if the test results come back bad?",
+    "We won the championship, best day ever!",
+    "Thank you so much, this gift made my whole week.",
+    "The meeting is scheduled for 3pm in room 204.",
+    "The package contains two cables and a manual.",
+    "I miss my grandmother so much since she passed away.",
+    "Nobody came to my birthday party.",
+    "Wait, you're telling me she's been here the whole time?",
+    "I did not expect the ending at all!",
+    "The food was fine but the service was painfully slow.",
+    "Honestly I'm not sure how I feel about the new policy.",
+    "I love this song, it always cheers me up.",
+    "Why does this keep happening to me, I'm so frustrated.",
+    "The spider crawled right across my pillow.",
+    "Great, another Monday. Just what I needed.",
+    " ".join(["The product arrived late and the box was damaged."] * 40
+             + ["But the support team was wonderful and sorted everything out quickly."] * 40),
+    " ".join(["We spent the afternoon walking along the beach and laughing."] * 60),
+]
+
+
+def measure_backend(backend, iterations, batch_repeats):
+    """Loads one backend and returns (predictions, metrics)."""
+    from models.sentiment_model import SentimentModel
+    model = SentimentModel(backend=backend)
+    start = time.perf_counter()
+    if not model.load_model():
+        raise RuntimeError(f"load_model() failed for backend {backend}")
+    metrics = {"load_seconds": time.perf_counter() - start}
+
+    predictions = model.predict_batch(EVAL_TEXTS)
+
+    short_texts = [text for text in EVAL_TEXTS if len(text) < 200]
+    latencies = []
+    for i in range(iterations):
+        text = short_texts[i % len(short_texts)]
+        start = time.perf_counter()
+        model.predict(text)
+        latencies.append(time.perf_counter() - start)
+    metrics["predict_p50_seconds"] = percentile(latencies, 50)
+    metrics["predict_p95_seconds"] = percentile(latencies, 95)
+
+    batch = short_texts * batch_repeats
+    start = time.perf_counter()
+    model.predict_batch(batch)
+    metrics["throughput_batch_items_per_s"] = len(batch) / (time.perf_counter() - start)
+
+    metrics["memory_footprint_bytes"] = model.memory_footprint()
+    model.unload_model()
+    return predictions, metrics
+
+
+def parity(reference, predictions):
+    """Label agreement with the reference backend and the largest top-score difference."""
+    agree = sum(ref.label == pred.label for ref, pred in zip(reference, predictions))
+    score_diff = max(abs(ref.score - pred.score) for ref, pred in zip(reference, predictions))
+    return {"label_agreement": agree / len(reference), "max_score_diff": score_diff,
+            "disagreements": [i for i, (ref, pred) in enumerate(zip(reference, predictions))
+                              if ref.label != pred.label]}
+
+
+def main(argv=None):
+    from models.sentiment_model import BACKENDS
+    parser = argparse.ArgumentParser(description="Compare SentimentModel backends for parity and speed.")
+    parser.add_argument("--backends", nargs="*", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--iterations", type=int, default=50, help="Single predict() samples per backend.")
+    parser.add_argument("--batch-repeats", type=int, default=10, help="Copies of the eval set in the batch run.")
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="Minimum label agreement with eager for a backend to pass.")
+    parser.add_argument("--output", help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    report = {"environment": environment_info(), "eval_size": len(EVAL_TEXTS), "results": {}}
+    reference = None
+    failed = []
+    # Eager runs first: it is the reference for the parity check
+    for backend in sorted(set(args.backends) | {"eager"}, key=BACKENDS.index):
+        print(f"Benchmarking backend {backend}...", file=sys.stderr)
+        try:
+            predictions, metrics = measure_backend(backend, args.iterations, args.batch_repeats)
+        except Exception as e:
+            report["results"][backend] = {"error": str(e)}
+            failed.append(backend)
+            continue
+        if backend == "eager":
+            reference = predictions
+        elif reference is not None:
+            metrics.update(parity(reference, predictions))
+            if metrics["label_agreement"] < args.min_agreement:
+                failed.append(backend)
+        report["results"][backend] = metrics
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    if failed:
+        print(f"FAILED: {', '.join(failed)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# --- FILE: benchmarks/stub_models.py ---
+# Tiny BaseModel implementations that need no ML framework or network, so the
+# benchmark harness (and anything else built on ModelSelector) can run offline in seconds.
+import time
+
+from models.base_model import BaseModel
+from models.mixins import TimingMixin
+from models.registry import ModelSpec
+from models.results import SentimentResult
+
+
+class StubSentimentModel(BaseModel, TimingMixin):
+    """Mimics SentimentModel: fixed per-call overhead plus a small per-item cost."""
+
+    LABELS = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+
+    def __init__(self, load_seconds=0.05, call_overhead=0.002, per_item=0.0002, footprint=300 * 1024 ** 2):
+        super().__init__(model_name="stub/sentiment", category="Stub", description="Offline stand-in for SentimentModel")
+        self._footprint = footprint
+        self._load_seconds = load_seconds
+        self._call_overhead = call_overhead
+        self._per_item = per_item
+        self._batch_size = 16
+
+    # Overrides abstract method
+    def load_model(self):
+        time.sleep(self._load_seconds)
+        self._is_loaded = True
+        return True
+
+    # Overrides BaseModel.memory_footprint: the size the real model would report
+    def memory_footprint(self):
+        return self._footprint if self._is_loaded else 0
+
+    # Overrides abstract method
+    def predict(self, input_data):
+        return self.predict_batch([input_data])[0]
+
+    def set_batch_size(self, batch_size):
+        self._batch_size = batch_size
+
+    def predict_batch(self, texts):
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        with self.span("forward", batch=len(texts)):
+            time.sleep(self._call_overhead + self._per_item * len(texts))
+        return [SentimentResult(self.LABELS[len(text) % len(self.LABELS)], 0.9) for text in texts]
+
+    # Overrides abstract method
+    def get_usage_example(self):
+        return "Any text"
+
+
+class StubCpuSentimentModel(StubSentimentModel):
+    """
+    StubSentimentModel that burns CPU in pure Python instead of sleeping. It holds the
+    GIL like tokenization does, so it only scales across processes: used by the
+    core-scaling benchmark.
+    """
+
+    def predict_batch(self, texts):
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        with self.span("forward", batch=len(texts)):
+            deadline = time.thread_time() + self._call_overhead + self._per_item * len(texts)
+            while time.thread_time() < deadline:
+                pass
+        return [SentimentResult(self.LABELS[len(text) % len(self.LABELS)], 0.9) for text in texts]
+
+
+class StubTextToImageModel(BaseModel, TimingMixin):
+    """Mimics TextToImageModel: slow load, fixed cost per generation, no files written."""
+
+    def __init__(self, load_seconds=0.1, generate_seconds=0.02, footprint=1200 * 1024 ** 2):
+        super().__init__(model_name="stub/text-to-image", category="Stub", description="Offline stand-in for TextToImageModel")
+        self._footprint = footprint
+        self._load_seconds = load_seconds
+        self._generate_seconds = generate_seconds
+
+    # Overrides abstract method
+    def load_model(self):
+        time.sleep(self._load_seconds)
+        self._is_loaded = True
+        return True
+
+    # Overrides BaseModel.memory_footprint: the size the real model would report
+    def memory_footprint(self):
+        return self._footprint if self._is_loaded else 0
+
+    # Overrides abstract method
+    def predict(self, input_data):
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        with self.span("generate"):
+            time.sleep(self._generate_seconds)
+        return "stub_output.png"
+
+    def predict_batch(self, prompts, num_images_per_prompt=1):
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        # Batched generation amortises most of the per-image cost
+        count = len(prompts) * num_images_per_prompt
+        with self.span("generate", batch=count):
+            time.sleep(self._generate_seconds * (1 + 0.5 * (count - 1)))
+        return ["stub_output.png"] * count
+
+    # Overrides abstract method
+    def get_usage_example(self):
+        return "Any prompt"
+
+
+# Same display names as models/registry.py, so callers can swap registries freely
+STUB_SPECS = {
+    "Text-to-Image": ModelSpec("Text-to-Image", "benchmarks.stub_models", "StubTextToImageModel",
+                               "stub/text-to-image", "Stub", "Offline stand-in for TextToImageModel", "Any prompt"),
+    "Sentiment Analysis": ModelSpec("Sentiment Analysis", "benchmarks.stub_models", "StubSentimentModel",
+                                    "stub/sentiment", "Stub", "Offline stand-in for SentimentModel", "Any text"),
+}
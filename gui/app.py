@@ -1,11 +1,23 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-from PIL import Image, ImageTk
+from tkinter import ttk, messagebox, scrolledtext
+from PIL import ImageTk
 import os
+import sqlite3
+import time
+from contextlib import contextmanager
 
 # Import core components
+from gui.history_view import HistoryView
 from gui.model_selector import ModelSelector
 from models.base_model import BaseModel 
+from models.performance_profiles import DEFAULT_PROFILE, PROFILES
+from models.results import ImageResult, SentimentResult
+from utils.job_executor import JobExecutor, JobQueueFull
+from utils.history_store import HistoryStore
+from utils.result_cache import ResultCache
+
+# The output box keeps only the most recent lines; older runs are in the history window
+MAX_OUTPUT_LINES = 500
 
 class AIModelGUI:
     """
@@ -15,10 +27,30 @@ class AIModelGUI:
     def __init__(self, root):
         self._root = root
         self._setup_window()
-        self._model_selector = ModelSelector()
+        # Identical resubmitted prompts are served from the result cache.
+        # AI_GUI_MEMORY_BUDGET_MB caps the memory of loaded models (LRU models are unloaded).
+        # AI_GUI_WORKER_PROCESSES=1 runs each model in its own worker processes.
+        budget_mb = os.environ.get("AI_GUI_MEMORY_BUDGET_MB")
+        self._model_selector = ModelSelector(
+            result_cache=ResultCache(),
+            memory_budget=int(budget_mb) * 1024 * 1024 if budget_mb else None,
+            worker_processes=os.environ.get("AI_GUI_WORKER_PROCESSES") == "1"
+        )
+        self._current_model_name = None
         self._current_model: BaseModel = None
+        # Name of the model whose load job is queued or running
+        self._loading_model_name = None
+        # (model name, ImageResult) of the most recent draft, for the Refine button
+        self._last_draft = None
         self._uploaded_file = None
+        # Every finished run is recorded here and can be searched and reshown from File > History
+        self._history = HistoryStore()
+        self._history_view = None
+        # Composition: model work runs on a background worker so the Tk loop never blocks
+        self._executor = JobExecutor(max_queue=8)
         self._create_widgets()
+        self._executor.add_listener(self._update_job_status)
+        self._executor.attach(self._root)
         
     def _setup_window(self):
         """Sets up the main window properties and custom button styles."""
@@ -40,6 +72,7 @@ class AIModelGUI:
         """Builds the overall application layout."""
         self._create_menu()
         self._create_model_selection()
+        self._create_job_status()
         
         # Main container for Input (Left) and Output (Right)
         main_content = ttk.PanedWindow(self._root, orient=tk.HORIZONTAL)
@@ -67,6 +100,8 @@ class AIModelGUI:
         self._root.config(menu=menubar)
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="History...", command=self._open_history)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self._root.quit)
         
     def _create_model_selection(self):
@@ -76,7 +111,7 @@ class AIModelGUI:
         
         ttk.Label(model_frame, text="Select Model:").pack(side=tk.LEFT, padx=5)
         self._model_var = tk.StringVar()
-        self._models_list = ["Text-to-Image", "Sentiment Analysis"]
+        self._models_list = self._model_selector.available_models()
         self._model_combo = ttk.Combobox(
             model_frame,
             textvariable=self._model_var,
@@ -90,6 +125,31 @@ class AIModelGUI:
         
         ttk.Button(model_frame, text="Load Model", command=self._load_model).pack(side=tk.LEFT, padx=10)
         
+        # Performance profile (only used by models that support profiles, e.g. Text-to-Image)
+        ttk.Label(model_frame, text="Profile:").pack(side=tk.LEFT, padx=5)
+        self._profile_var = tk.StringVar(value=DEFAULT_PROFILE)
+        ttk.Combobox(
+            model_frame,
+            textvariable=self._profile_var,
+            values=list(PROFILES),
+            state="readonly",
+            width=12
+        ).pack(side=tk.LEFT, padx=5)
+        
+    def _create_job_status(self):
+        """Creates the job status bar showing the running job, queue depth and a Cancel button."""
+        status_frame = ttk.Frame(self._root, padding="5")
+        status_frame.pack(fill=tk.X, padx=10)
+        
+        self._job_status_var = tk.StringVar(value="Idle")
+        ttk.Label(status_frame, textvariable=self._job_status_var).pack(side=tk.LEFT, padx=5)
+        
+        self._job_progress = ttk.Progressbar(status_frame, mode="determinate", maximum=1.0, length=200)
+        self._job_progress.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(status_frame, text="Cancel", command=self._cancel_jobs).pack(side=tk.LEFT, padx=5)
+        ttk.Button(status_frame, text="History", command=self._open_history).pack(side=tk.RIGHT, padx=5)
+        
     def _create_input_section(self, parent):
         """Creates the User Input section (Left Column - 30%)."""
         input_frame = ttk.LabelFrame(parent, text="Text Input Prompt", padding="10")
@@ -101,6 +161,17 @@ class AIModelGUI:
         self._input_text = scrolledtext.ScrolledText(input_frame, height=8, wrap=tk.WORD) 
         self._input_text.pack(fill=tk.BOTH, expand=True, pady=5)
         
+        # Batch options: several prompts/texts and several images per prompt run as one batched job
+        batch_frame = ttk.Frame(input_frame)
+        batch_frame.pack(fill=tk.X, pady=5)
+        self._one_per_line_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(batch_frame, text="One input per line",
+                        variable=self._one_per_line_var).pack(side=tk.LEFT, padx=5)
+        ttk.Label(batch_frame, text="Images:").pack(side=tk.LEFT, padx=5)
+        self._num_images_var = tk.IntVar(value=1)
+        ttk.Spinbox(batch_frame, from_=1, to=8, textvariable=self._num_images_var,
+                    width=4, state="readonly").pack(side=tk.LEFT)
+        
         # Action Buttons
         btn_frame = ttk.Frame(input_frame)
         btn_frame.pack(fill=tk.X, pady=5)
@@ -113,6 +184,12 @@ class AIModelGUI:
         ttk.Button(btn_frame, text="Clear All", command=self._clear_all, 
                    style='R.TButton').pack(side=tk.LEFT, padx=5, expand=True)
         
+        # Draft-then-refine (Text-to-Image): a quick low-resolution draft, then a full-quality pass from it
+        draft_frame = ttk.Frame(input_frame)
+        draft_frame.pack(fill=tk.X, pady=5)
+        ttk.Button(draft_frame, text="Draft", command=self._run_draft).pack(side=tk.LEFT, padx=5, expand=True)
+        ttk.Button(draft_frame, text="Refine Draft", command=self._run_refine).pack(side=tk.LEFT, padx=5, expand=True)
+        
         return input_frame
         
     def _create_output_section(self, parent):
@@ -129,6 +206,9 @@ class AIModelGUI:
         # Image output label (for Text-to-Image results)
         self._output_image_label = tk.Label(self._output_container)
         
+        # Thumbnail grid for batched Text-to-Image results
+        self._gallery_frame = ttk.Frame(self._output_container)
+        
         return output_frame
         
     def _create_info_section(self):
@@ -141,61 +221,253 @@ class AIModelGUI:
         self._info_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
     def _on_model_selected(self, event=None):
-        """Updates the information panel when a new model is selected."""
+        """Updates the information panel and starts importing the selected model's framework in the background."""
         self._update_info_display()
+        self._model_selector.prefetch(self._model_var.get())
             
     def _load_model(self):
         """
         Loads the selected model instance using the ModelSelector factory.
         Demonstrates Polymorphism by interacting with the BaseModel interface.
+        The load itself runs on the background job executor.
         """
         model_name = self._model_var.get()
         if not model_name:
             messagebox.showwarning("Warning", "Please select a model")
             return
             
-        try:
-            # Polymorphism: get_model returns an object implementing BaseModel
-            self._current_model = self._model_selector.get_model(model_name) 
-            if self._current_model is None:
-                messagebox.showerror("Error", "Model not found")
-                return
-                
-            self._output_text.insert(tk.END, f"Loading {model_name}...\n")
-            self._root.update()
-            
-            # Polymorphism: Calls the correct load_model() implementation
-            if self._current_model.load_model(): 
-                self._output_text.insert(tk.END, f"✅ {model_name} loaded successfully!\n\n")
+        def on_done(model):
+            if self._loading_model_name == model_name:
+                self._loading_model_name = None
+            if model is not None:
+                self._current_model = model
+                self._current_model_name = model_name
+                self._append_output(f"✅ {model_name} loaded successfully!\n\n")
             else:
-                self._output_text.insert(tk.END, f"❌ Failed to load {model_name}. Check console for errors.\n\n")
-                self._current_model = None
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading model: {str(e)}")
-            self._current_model = None
+                self._append_output(f"❌ Failed to load {model_name}. Check console for errors.\n\n")
+                    
+        def on_error(error):
+            if self._loading_model_name == model_name:
+                self._loading_model_name = None
+            messagebox.showerror("Error", f"Error loading model: {str(error)}")
+                
+        # Polymorphism: get_model() (framework import and construction) and the correct
+        # load_model() implementation both run on the worker, through the selector so the
+        # residency manager can account for it. Returns the model or None on failure.
+        load = lambda job: self._model_selector.load_model(model_name)
+        if self._submit_job(load, f"Loading {model_name}", on_done, on_error):
+            self._loading_model_name = model_name
+            self._append_output(f"Loading {model_name}...\n")
             
     def _run_model(self):
         """
-        Runs the currently loaded model with the input prompt.
+        Queues the currently loaded model to run with the input prompt.
         Demonstrates Polymorphism by calling the predict method.
         """
         if not self._current_model:
-            messagebox.showwarning("Warning", "Please load a model first")
+            if self._loading_model_name:
+                messagebox.showwarning("Warning", f"{self._loading_model_name} is still loading")
+            else:
+                messagebox.showwarning("Warning", "Please load a model first")
             return
             
         input_data = self._get_input_data()
         if input_data is None:
             return
             
-        try:
-            self._output_text.insert(tk.END, "Running model...\n")
-            self._root.update()
+        model = self._current_model
+        model_name = self._current_model_name
+        profile = self._profile_var.get()
+        inputs = [line.strip() for line in input_data.splitlines() if line.strip()] \
+            if self._one_per_line_var.get() else [input_data]
+        # Extra images only apply to image models; they are ignored for text models
+        num_images = self._num_images_var.get() if hasattr(model, "generate_stream") else 1
+        batched = hasattr(model, "predict_batch") and (len(inputs) > 1 or num_images > 1)
+        
+        def run(job):
+            kwargs = {}
+            if hasattr(model, "set_profile"):
+                kwargs["profile"] = profile
+            if hasattr(model, "generate_stream"):
+                # Step-wise models report previews and stop at the next step when cancelled
+                kwargs.update(self._step_kwargs(job))
+            params = {"profile": kwargs["profile"]} if "profile" in kwargs else {}
+            if batched and num_images > 1:
+                kwargs["num_images_per_prompt"] = params["num_images_per_prompt"] = num_images
+            # Reloads the model if the residency manager evicted it since it was loaded,
+            # and keeps it from being evicted while it runs
+            with self._leased(model_name):
+                start = time.perf_counter()
+                if batched:
+                    result = model.predict_batch(inputs, **kwargs)
+                else:
+                    # Polymorphism: Calls the correct predict() implementation on the worker
+                    result = model.predict(input_data, **kwargs)
+            self._record_history(model_name, inputs, result, params, time.perf_counter() - start)
+            return result
+            
+        if self._submit_job(run, f"Running: {input_data[:40]}", self._display_result, self._show_run_error,
+                            on_progress=self._show_preview):
+            self._append_output("Running model...\n")
+            
+    def _run_draft(self):
+        """Queues a fast low-resolution draft of the prompt on the loaded image model."""
+        model = self._current_model
+        if not model or not hasattr(model, "draft"):
+            messagebox.showwarning("Warning", "Please load the Text-to-Image model first")
+            return
+        input_data = self._get_input_data()
+        if input_data is None:
+            return
+        model_name = self._current_model_name
+        
+        def run(job):
+            with self._leased(model_name):
+                start = time.perf_counter()
+                result = model.draft(input_data, **self._step_kwargs(job))
+            self._record_history(model_name, [input_data], result, {"draft": True}, time.perf_counter() - start)
+            return result
             
-            # Polymorphism: Calls the correct predict() implementation
-            result = self._current_model.predict(input_data) 
+        def on_done(result):
+            self._last_draft = (model_name, result)
             self._display_result(result)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error running model: {str(e)}")
+            self._append_output(f"\nDraft seed: {result.seed}. Click 'Refine Draft' for full quality.")
+            
+        if self._submit_job(run, f"Drafting: {input_data[:40]}", on_done, self._show_run_error,
+                            on_progress=self._show_preview):
+            self._append_output("Drafting...\n")
+            
+    def _run_refine(self):
+        """Queues a full-quality refinement of the most recent draft."""
+        if self._last_draft is None or self._last_draft[0] != self._current_model_name:
+            messagebox.showwarning("Warning", "Please create a draft first")
+            return
+        model_name, draft = self._last_draft
+        model = self._current_model
+        profile = self._profile_var.get()
+        
+        def run(job):
+            with self._leased(model_name):
+                start = time.perf_counter()
+                # The path identifies the draft, also when the model runs in a worker process
+                result = model.refine(draft.path, profile=profile, **self._step_kwargs(job))
+            self._record_history(model_name, [draft.prompt], result,
+                                 {"profile": profile, "refined_from": draft.path}, time.perf_counter() - start)
+            return result
+            
+        if self._submit_job(run, f"Refining: {draft.prompt[:40]}", self._display_result, self._show_run_error,
+                            on_progress=self._show_preview):
+            self._append_output("Refining draft...\n")
+            
+    @contextmanager
+    def _leased(self, model_name):
+        """Loads the model if needed and keeps it resident for the block; called on the worker."""
+        with self._model_selector.lease_model(model_name) as model:
+            if model is None:
+                raise RuntimeError(f"Failed to load {model_name}.")
+            yield model
+            
+    def _step_kwargs(self, job):
+        """Progress and cancellation arguments for step-wise generation methods."""
+        return {
+            "progress_callback": lambda event: job.report_progress(
+                event.fraction, f"step {event.step}/{event.total_steps}", event.preview),
+            "should_cancel": job.is_cancelled
+        }
+        
+    def _record_history(self, model_name, inputs, result, params, duration):
+        """Stores a finished run in the history database; called on the worker thread."""
+        results = result if isinstance(result, list) else [result]
+        for index, item in enumerate(results):
+            # Image results carry their own prompt; other batches line up with their inputs
+            prompt = getattr(item, "prompt", None) or inputs[min(index, len(inputs) - 1)]
+            # Only files the app wrote are the history's to delete; a result-cache disk hit
+            # points at the cache's own copy and has no save of its own
+            owned = False
+            if isinstance(item, ImageResult):
+                output, image_path, owned = item.to_dict(), item.path, item.save_future is not None
+            elif isinstance(item, str) and item.endswith(('.png', '.jpg', '.jpeg')):
+                output, image_path = {"image_path": item}, item
+            else:
+                output = item.to_dict() if hasattr(item, "to_dict") else str(item)
+                image_path = None
+            try:
+                self._history.add(model_name, prompt, output, params, duration / len(results), image_path, owned)
+            except sqlite3.Error as e:
+                print(f"Could not record run in history: {e}")
+                
+    def _open_history(self):
+        """Opens the history window, or raises it if it is already open."""
+        if self._history_view is not None and self._history_view.window.winfo_exists():
+            self._history_view.refresh()
+            self._history_view.window.lift()
+            return
+        self._history_view = HistoryView(self._root, self._history, self._show_history_entry,
+                                         self._use_history_prompt)
+        
+    def _show_history_entry(self, entry):
+        """Redisplays a stored result without running the model again."""
+        output = entry["output"]
+        image_path = entry["image_path"]
+        if image_path and os.path.exists(image_path):
+            result = ImageResult.from_file(image_path, prompt=entry["prompt"])
+            if isinstance(output, dict):
+                result.seed = output.get("seed")
+        elif isinstance(output, dict) and "label" in output:
+            result = SentimentResult.from_dict(output)
+        elif isinstance(output, dict) and "image_path" in output:
+            result = f"Image {output['image_path']} is no longer on disk (evicted from history)."
+        else:
+            result = output
+        self._display_result(result)
+        duration = f" in {entry['duration']:.2f}s" if entry["duration"] is not None else ""
+        self._append_output(f"\nFrom history: {entry['model']}, originally computed{duration}.\n")
+        
+    def _use_history_prompt(self, entry):
+        """Copies a stored prompt into the input box, e.g. to rerun it with other settings."""
+        self._input_text.delete(1.0, tk.END)
+        self._input_text.insert(tk.END, entry["prompt"])
+        
+    def _append_output(self, text):
+        """Appends to the output box, dropping the oldest lines beyond MAX_OUTPUT_LINES."""
+        self._output_text.insert(tk.END, text)
+        lines = int(self._output_text.index("end-1c").split(".")[0])
+        if lines > MAX_OUTPUT_LINES:
+            self._output_text.delete(1.0, f"{lines - MAX_OUTPUT_LINES + 1}.0")
+            
+    def _show_run_error(self, error):
+        messagebox.showerror("Error", f"Error running model: {str(error)}")
+            
+    def _submit_job(self, func, description, on_done, on_error, on_progress=None):
+        """Submits work to the job executor, warning the user if the queue is full."""
+        try:
+            self._executor.submit(func, description, on_done=on_done, on_error=on_error,
+                                  on_progress=on_progress)
+            return True
+        except JobQueueFull as e:
+            messagebox.showwarning("Busy", str(e))
+            return False
+            
+    def _cancel_jobs(self):
+        """Cancels the running job and all queued jobs."""
+        self._executor.cancel_all()
+        self._append_output("⏹ Cancelled queued jobs.\n")
+        
+    def _update_job_status(self, executor):
+        """Refreshes the status bar; called on the Tk thread whenever job state changes."""
+        current = executor.current_job
+        queued = len(executor.pending_jobs())
+        if current is None:
+            self._job_status_var.set("Idle" if not queued else f"{queued} queued")
+            self._job_progress.config(value=0)
+            return
+        status = current.description
+        if current.message:
+            status += f" - {current.message}"
+        if queued:
+            status += f" ({queued} queued)"
+        self._job_status_var.set(status)
+        self._job_progress.config(value=current.progress)
             
     def _get_input_data(self):
         """Retrieves the text input from the prompt box."""
@@ -209,28 +481,82 @@ class AIModelGUI:
         """Displays the result, handling both text and generated images."""
         self._output_text.delete(1.0, tk.END)
         self._output_image_label.pack_forget()
+        self._gallery_frame.pack_forget()
         self._output_text.pack_forget()
         
-        if isinstance(result, str) and result.endswith(('.png', '.jpg', '.jpeg')):
+        if isinstance(result, list):
+            # Batched results: images go to the gallery, anything else is listed as text
+            results = [self._as_image_result(item) for item in result]
+            if results and all(isinstance(item, ImageResult) for item in results):
+                self._display_gallery(results)
+            else:
+                self._output_text.pack(fill=tk.BOTH, expand=True)
+                for item in results:
+                    self._append_output(f"Result:\n{item}\n{'-'*40}\n")
+            self._output_text.see(tk.END)
+            return
+            
+        result = self._as_image_result(result)
+        if isinstance(result, ImageResult):
             try:
-                img = Image.open(result)
-                img.thumbnail((450, 450)) 
-                photo = ImageTk.PhotoImage(img)
+                # The in-memory image is used directly; its thumbnail is computed once and cached
+                photo = ImageTk.PhotoImage(result.thumbnail((450, 450)))
                 self._output_image_label.config(image=photo)
                 self._output_image_label.image = photo
                 
                 # Image at the top, text below for file path/confirmation
                 self._output_image_label.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
                 self._output_text.pack(fill=tk.X)
-                self._output_text.insert(tk.END, f"✅ Image generated and saved!\nFile: {result}")
+                self._append_output(f"✅ Image generated and saved!\nFile: {result.path}")
             except Exception as e:
                 self._output_text.pack(fill=tk.BOTH, expand=True)
-                self._output_text.insert(tk.END, f"❌ Image error: Could not display image: {str(e)}")
+                self._append_output(f"❌ Image error: Could not display image: {str(e)}")
         else:
             # Display text result only
             self._output_text.pack(fill=tk.BOTH, expand=True)
-            self._output_text.insert(tk.END, f"Result:\n{result}\n{'-'*40}\n")
+            self._append_output(f"Result:\n{result}\n{'-'*40}\n")
+            
+        self._output_text.see(tk.END)
+        
+    def _as_image_result(self, result):
+        """Plain file paths (e.g. from stub models) are wrapped so both cases share one path."""
+        if isinstance(result, str) and result.endswith(('.png', '.jpg', '.jpeg')):
+            return ImageResult.from_file(result)
+        return result
+        
+    def _display_gallery(self, results, columns=3):
+        """Shows several ImageResults as a grid of thumbnails, with their seeds and files listed below."""
+        for child in self._gallery_frame.winfo_children():
+            child.destroy()
+        try:
+            for index, result in enumerate(results):
+                photo = ImageTk.PhotoImage(result.thumbnail((220, 220)))
+                label = tk.Label(self._gallery_frame, image=photo)
+                label.image = photo  # Keep reference
+                label.grid(row=index // columns, column=index % columns, padx=4, pady=4)
+            self._gallery_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+            self._output_text.pack(fill=tk.X)
+            self._append_output(f"✅ {len(results)} images generated and saved!\n")
+            for result in results:
+                seed = f" (seed {result.seed})" if result.seed is not None else ""
+                self._append_output(f"File: {result.path}{seed}\n")
+        except Exception as e:
+            self._output_text.pack(fill=tk.BOTH, expand=True)
+            self._append_output(f"❌ Image error: Could not display images: {str(e)}")
             
+    def _show_preview(self, job, preview):
+        """Shows a low-resolution in-progress preview; called on the Tk thread."""
+        if preview is None:
+            return
+        photo = ImageTk.PhotoImage(preview)
+        self._output_image_label.config(image=photo)
+        self._output_image_label.image = photo
+        if not self._output_image_label.winfo_ismapped():
+            self._gallery_frame.pack_forget()
+            self._output_text.pack_forget()
+            self._output_image_label.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+            self._output_text.pack(fill=tk.X)
+        self._append_output(f"Preview at {job.message}\n")
         self._output_text.see(tk.END)
         
     def _update_info_display(self):
@@ -240,15 +566,13 @@ class AIModelGUI:
 
         model_name = self._model_var.get()
         
-        temp_model = self._model_selector.get_model(model_name)
-        # Note: get_model_info() and get_usage_example() are assumed to be implemented
-        # in the model classes (SentimentModel and TextToImageModel).
-        if not temp_model:
+        # Static metadata comes from the registry, so no model is imported or built here
+        model_info = self._model_selector.get_model_info(model_name)
+        if not model_info:
             model_info = {"Model Name": "N/A", "Category": "N/A", "Description": "N/A"}
             usage_example = "N/A"
         else:
-            model_info = temp_model.get_model_info()
-            usage_example = temp_model.get_usage_example()
+            usage_example = self._model_selector.get_usage_example(model_name)
             
         info = f"""
 *** MODEL INFORMATION ***
@@ -262,7 +586,7 @@ class AIModelGUI:
 
 • Polymorphism & Method Overriding: The `AIModelGUI` interacts with all models through a common interface defined by the **BaseModel** abstract class. Each concrete model (**SentimentModel**, **TextToImageModel**) implements its own specific logic in methods like `load_model()` and `predict()`, formally **overriding** the abstract base methods.
 
-• Multiple Inheritance: Used in the **TextToImageModel** class, which inherits from **BaseModel** and the **TimingMixin** class, allowing it to inherit core model functionality and timing utilities.
+• Multiple Inheritance: Used in the **TextToImageModel** and **SentimentModel** classes, which inherit from **BaseModel** and the **TimingMixin** class, allowing them to inherit core model functionality and per-stage timing utilities.
 
 • Multiple Decorators: Applied to the **SentimentModel.predict()** method, using both **@log_action** and **@measure_time** to log function calls and execution duration simultaneously.
 """
@@ -278,6 +602,7 @@ class AIModelGUI:
         self._input_text.delete(1.0, tk.END)
         self._output_text.delete(1.0, tk.END)
         self._output_image_label.pack_forget()
+        self._gallery_frame.pack_forget()
         self._output_text.pack(fill=tk.BOTH, expand=True)
         self._uploaded_file = None 
         self._input_type.set("text") 
@@ -0,0 +1,162 @@
+import json
+import os
+import time
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+from PIL import Image, ImageTk
+
+ALL_MODELS = "All models"
+
+
+class HistoryView:
+    """
+    Window listing past runs from a HistoryStore, newest first, one page at a time.
+    Only the current page is held in memory, and an entry's image thumbnail is only
+    decoded when the entry is selected.
+    """
+
+    def __init__(self, parent, history, on_show, on_use_prompt, page_size=50):
+        self._history = history
+        self._on_show = on_show
+        self._on_use_prompt = on_use_prompt
+        self._page_size = page_size
+        # Encapsulation: keyset cursors ((created, id) of each page's predecessor) for Prev/Next
+        self._cursors = [None]
+        self._has_next = False
+        self._entries = {}
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Result History")
+        self.window.geometry("950x550")
+        self._create_widgets()
+        self.refresh()
+
+    def _create_widgets(self):
+        search_frame = ttk.Frame(self.window, padding="5")
+        search_frame.pack(fill=tk.X)
+        ttk.Label(search_frame, text="Search prompts:").pack(side=tk.LEFT, padx=5)
+        self._query_var = tk.StringVar()
+        entry = ttk.Entry(search_frame, textvariable=self._query_var, width=40)
+        entry.pack(side=tk.LEFT, padx=5)
+        entry.bind("<Return>", lambda event: self.refresh())
+        self._model_var = tk.StringVar(value=ALL_MODELS)
+        self._model_combo = ttk.Combobox(search_frame, textvariable=self._model_var, state="readonly", width=25)
+        self._model_combo.pack(side=tk.LEFT, padx=5)
+        self._model_combo.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+        ttk.Button(search_frame, text="Search", command=self.refresh).pack(side=tk.LEFT, padx=5)
+
+        body = ttk.PanedWindow(self.window, orient=tk.HORIZONTAL)
+        body.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        list_frame = ttk.Frame(body)
+        self._tree = ttk.Treeview(list_frame, columns=("time", "model", "prompt", "duration"),
+                                  show="headings", selectmode="browse")
+        for column, heading, width in (("time", "Time", 120), ("model", "Model", 120),
+                                       ("prompt", "Prompt", 300), ("duration", "Seconds", 70)):
+            self._tree.heading(column, text=heading)
+            self._tree.column(column, width=width, stretch=column == "prompt")
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self._tree.yview)
+        self._tree.configure(yscrollcommand=scrollbar.set)
+        self._tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._tree.bind("<Double-1>", lambda event: self._show_selected())
+        body.add(list_frame, weight=60)
+
+        detail_frame = ttk.Frame(body)
+        self._preview_label = tk.Label(detail_frame)
+        self._preview_label.pack(pady=5)
+        self._detail_text = scrolledtext.ScrolledText(detail_frame, height=10, wrap=tk.WORD, font=("Arial", 9))
+        self._detail_text.pack(fill=tk.BOTH, expand=True)
+        body.add(detail_frame, weight=40)
+
+        nav_frame = ttk.Frame(self.window, padding="5")
+        nav_frame.pack(fill=tk.X)
+        self._prev_button = ttk.Button(nav_frame, text="< Prev", command=self._prev_page)
+        self._prev_button.pack(side=tk.LEFT, padx=5)
+        self._page_var = tk.StringVar()
+        ttk.Label(nav_frame, textvariable=self._page_var).pack(side=tk.LEFT, padx=5)
+        self._next_button = ttk.Button(nav_frame, text="Next >", command=self._next_page)
+        self._next_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="Use Prompt", command=self._use_selected).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(nav_frame, text="Show Result", command=self._show_selected).pack(side=tk.RIGHT, padx=5)
+
+    def refresh(self):
+        """Restarts from the newest page with the current search and model filter."""
+        self._model_combo.config(values=[ALL_MODELS] + self._history.models())
+        self._cursors = [None]
+        self._load_page()
+
+    def _load_page(self):
+        model = self._model_var.get()
+        # One extra row tells whether a next page exists
+        entries = self._history.search(self._query_var.get(), None if model == ALL_MODELS else model,
+                                       before=self._cursors[-1], limit=self._page_size + 1)
+        self._has_next = len(entries) > self._page_size
+        entries = entries[:self._page_size]
+        self._tree.delete(*self._tree.get_children())
+        self._entries = {}
+        for entry in entries:
+            iid = str(entry["id"])
+            self._entries[iid] = entry
+            duration = f"{entry['duration']:.2f}" if entry["duration"] is not None else ""
+            self._tree.insert("", tk.END, iid=iid, values=(
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created"])),
+                entry["model"], " ".join(entry["prompt"].split())[:120], duration))
+        self._page_var.set(f"Page {len(self._cursors)}")
+        self._prev_button.config(state=tk.NORMAL if len(self._cursors) > 1 else tk.DISABLED)
+        self._next_button.config(state=tk.NORMAL if self._has_next else tk.DISABLED)
+        self._show_details(None)
+
+    def _next_page(self):
+        if self._has_next and self._entries:
+            last = self._entries[self._tree.get_children()[-1]]
+            self._cursors.append((last["created"], last["id"]))
+            self._load_page()
+
+    def _prev_page(self):
+        if len(self._cursors) > 1:
+            self._cursors.pop()
+            self._load_page()
+
+    def _selected_entry(self):
+        selection = self._tree.selection()
+        return self._entries.get(selection[0]) if selection else None
+
+    def _on_select(self, event=None):
+        self._show_details(self._selected_entry())
+
+    def _show_details(self, entry):
+        self._preview_label.config(image="")
+        self._preview_label.image = None
+        self._detail_text.delete(1.0, tk.END)
+        if entry is None:
+            return
+        image_path = entry["image_path"]
+        if image_path and os.path.exists(image_path):
+            try:
+                with Image.open(image_path) as image:
+                    # draft() lets JPEG decoders skip straight to a reduced size
+                    image.draft("RGB", (200, 200))
+                    image.thumbnail((200, 200))
+                    photo = ImageTk.PhotoImage(image)
+                self._preview_label.config(image=photo)
+                self._preview_label.image = photo  # Keep reference
+            except Exception as e:
+                print(f"Could not load history image {image_path}: {e}")
+        elif image_path is None and isinstance(entry["output"], dict) and "image_path" in entry["output"]:
+            self._detail_text.insert(tk.END, "Image evicted from history to save disk space.\n\n")
+        self._detail_text.insert(tk.END, f"Prompt:\n{entry['prompt']}\n\n"
+                                         f"Params: {json.dumps(entry['params'])}\n\n"
+                                         f"Output: {json.dumps(entry['output'], indent=2)}\n")
+
+    def _show_selected(self):
+        entry = self._selected_entry()
+        if entry is not None:
+            self._on_show(entry)
+
+    def _use_selected(self):
+        entry = self._selected_entry()
+        if entry is not None:
+            self._on_use_prompt(entry)
@@ -1,14 +1,129 @@
-from models.text_to_image_model import TextToImageModel
-from models.sentiment_model import SentimentModel
+import threading
+
+from models.mixins import CachingMixin
+from models.core_scheduler import plan_cores
+from models.registry import MODEL_SPECS
+from models.remote_model import RemoteModel
+from models.residency import ResidencyManager
+
 
 class ModelSelector:
-    """Handles the selection and instantiation of model objects."""
-    def __init__(self):
-        # Instantiating the models here establishes Composition
-        self.models = {
-            "Text-to-Image": TextToImageModel(),
-            "Sentiment Analysis": SentimentModel()
-        }
+    """
+    Handles the selection and instantiation of model objects.
+    Models are registered declaratively; their ML frameworks are only imported
+    and the instances only constructed on first get_model()/load_model().
+    Loaded models are tracked by a ResidencyManager, which unloads the least
+    recently used ones when memory_budget (bytes) is exceeded.
+    worker_processes hosts models in worker processes (see models/remote_model.py):
+    True for every model with default pool sizes, or {model name: replicas}, where
+    None means that model's default pool size. pin_cores partitions the available
+    cores between those models instead (see models/core_scheduler.py); it may be True
+    or a list of core ids to use.
+    """
+    def __init__(self, specs=None, result_cache=None, memory_budget=None, worker_processes=None,
+                 pin_cores=False):
+        self._specs = dict(specs or MODEL_SPECS)
+        self._result_cache = result_cache
+        if result_cache is not None:
+            # Entries from model ids no longer registered can never be hit again
+            result_cache.retain_models(spec.model_id for spec in self._specs.values())
+        if worker_processes is True:
+            worker_processes = dict.fromkeys(self._specs)
+        self._worker_processes = worker_processes or {}
+        self._core_plan = {}
+        if pin_cores and self._worker_processes:
+            self._core_plan = plan_cores(list(self._worker_processes),
+                                         cores=None if pin_cores is True else pin_cores)
+        self._residency = ResidencyManager(memory_budget)
+        # Composition: instances are created lazily and then kept here
+        self.models = {}
+        self._lock = threading.Lock()
+        self._prefetching = {}
+
+    def available_models(self):
+        """Returns the display names of every registered model."""
+        return list(self._specs)
+
+    def get_model_info(self, model_name):
+        """Returns model metadata without importing the model's framework."""
+        model = self.models.get(model_name)
+        if model is not None:
+            return model.get_model_info()
+        spec = self._specs.get(model_name)
+        return spec.get_model_info() if spec else None
+
+    def get_usage_example(self, model_name):
+        spec = self._specs.get(model_name)
+        return spec.usage_example if spec else None
 
     def get_model(self, model_name):
-        return self.models.get(model_name)
\ No newline at end of file
+        """Returns the model instance, importing and constructing it on first use."""
+        spec = self._specs.get(model_name)
+        if spec is None:
+            return None
+        with self._lock:
+            model = self.models.get(model_name)
+            if model is None and model_name in self._worker_processes:
+                # Polymorphism: the proxy is used exactly like the in-process model
+                model = RemoteModel(spec, replicas=self._worker_processes[model_name],
+                                    core_sets=self._core_plan.get(model_name))
+                self.models[model_name] = model
+            elif model is None:
+                model = spec.import_class()()
+                if self._result_cache is not None and isinstance(model, CachingMixin):
+                    model.enable_result_cache(self._result_cache)
+                self.models[model_name] = model
+            return model
+
+    def load_model(self, model_name):
+        """
+        Constructs (if needed) and loads the model, reloading it if it was evicted.
+        Returns the model or None on failure.
+        """
+        model = self.get_model(model_name)
+        if model is None:
+            return None
+        return self._residency.acquire(model_name, model)
+
+    def lease_model(self, model_name):
+        """
+        Context manager that loads the model like load_model() and keeps it from being
+        evicted until the block exits: `with selector.lease_model(name) as model: ...`.
+        """
+        return self._residency.lease(model_name, self.get_model(model_name))
+
+    def unload_model(self, model_name):
+        """Unloads a model and frees its memory; it is reloaded on the next load_model()."""
+        self._residency.release(model_name)
+
+    def pin_model(self, model_name):
+        """Keeps a hot model resident even when the memory budget is exceeded."""
+        self._residency.pin(model_name)
+
+    def unpin_model(self, model_name):
+        self._residency.unpin(model_name)
+
+    def get_residency_stats(self):
+        return self._residency.get_stats()
+
+    def get_core_plan(self):
+        """{model name: [cores of each replica]} when pin_cores is enabled."""
+        return dict(self._core_plan)
+
+    def prefetch(self, model_name):
+        """Imports the model's module on a background thread so a later get_model() is fast."""
+        spec = self._specs.get(model_name)
+        if spec is None or model_name in self.models or model_name in self._prefetching \
+                or model_name in self._worker_processes:
+            return
+        thread = threading.Thread(target=self._prefetch_worker, args=(spec,),
+                                  name=f"prefetch-{model_name}", daemon=True)
+        self._prefetching[model_name] = thread
+        thread.start()
+
+    def _prefetch_worker(self, spec):
+        try:
+            spec.import_class()
+        except Exception as e:
+            # get_model() will surface the real error when the model is requested
+            print(f"Prefetch of {spec.name} failed: {e}")
@@ -1,7 +1,9 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import os
 
+from models.results import ImageResult
+
 class OutputDisplay:
     def __init__(self, parent_frame):
         self.frame = tk.Frame(parent_frame)
@@ -13,15 +15,43 @@ class OutputDisplay:
         self.image_label = tk.Label(self.frame)
         self.image_label.pack(pady=10)
 
+        self.gallery_frame = tk.Frame(self.frame)
+
     def display_text(self, text):
         self.result_label.config(text=text)
         self.image_label.config(image="")
+        self.gallery_frame.pack_forget()
+
+    def display_image(self, image):
+        """Shows an ImageResult from memory, or loads an image file path."""
+        if not isinstance(image, ImageResult):
+            if not os.path.exists(image):
+                return
+            image = ImageResult.from_file(image)
+        photo = ImageTk.PhotoImage(image.thumbnail((400, 400)))
+        self.image_label.config(image=photo)
+        self.image_label.image = photo  # Keep reference
+        self.gallery_frame.pack_forget()
+        self.result_label.config(text="Image generated successfully!")
+
+    def display_gallery(self, images, columns=3):
+        """Shows a list of ImageResults (or image paths) as a grid of thumbnails."""
+        for child in self.gallery_frame.winfo_children():
+            child.destroy()
+        self.image_label.config(image="")
+        for index, image in enumerate(images):
+            if not isinstance(image, ImageResult):
+                image = ImageResult.from_file(image)
+            photo = ImageTk.PhotoImage(image.thumbnail((200, 200)))
+            label = tk.Label(self.gallery_frame, image=photo)
+            label.image = photo  # Keep reference
+            label.grid(row=index // columns, column=index % columns, padx=4, pady=4)
+        self.gallery_frame.pack(pady=10)
+        self.result_label.config(text=f"{len(images)} images generated successfully!")
 
-    def display_image(self, image_path):
-        if os.path.exists(image_path):
-            img = Image.open(image_path)
-            img.thumbnail((400, 400))
-            photo = ImageTk.PhotoImage(img)
-            self.image_label.config(image=photo)
-            self.image_label.image = photo  # Keep reference
-            self.result_label.config(text="Image generated successfully!")
\ No newline at end of file
+    def display_preview(self, preview, step, total_steps):
+        """Shows an in-progress preview image (PIL) while a generation is running."""
+        photo = ImageTk.PhotoImage(preview)
+        self.image_label.config(image=photo)
+        self.image_label.image = photo  # Keep reference
+        self.result_label.config(text=f"Generating... step {step}/{total_steps}")
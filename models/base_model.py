@@ -20,6 +20,20 @@ class BaseModel(ABC):
         """Make prediction - must be implemented (Overridden) by subclasses"""
         pass
     
+    def unload_model(self):
+        """Release the loaded weights - subclasses drop their pipeline references, then call super()"""
+        self._is_loaded = False
+        return True
+    
+    def memory_footprint(self):
+        """Bytes held by the loaded weights, or None if the subclass can't measure it"""
+        return None
+    
+    @property
+    def is_loaded(self):
+        """Read-only access to the encapsulated load state"""
+        return self._is_loaded
+    
     def get_model_info(self):
         """Get model information, accessing encapsulated state"""
         return {
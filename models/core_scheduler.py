@@ -0,0 +1,86 @@
+# --- FILE: models/core_scheduler.py ---
+# Splits the host's cores between models and their worker replicas, so every
+# replica gets its own CPU slice and a matching torch thread budget instead of
+# all processes oversubscribing every core.
+import os
+
+# Share of the cores each model gets when several are planned together
+DEFAULT_CORE_SHARES = {"Text-to-Image": 0.5, "Sentiment Analysis": 0.5}
+
+# Cores per replica; None gives the model's whole slice to a single replica.
+# The classifier is small, so many narrow replicas beat one wide one.
+DEFAULT_THREADS_PER_REPLICA = {"Text-to-Image": None, "Sentiment Analysis": 2}
+
+
+def available_cores():
+    """Core ids this process may run on (respects taskset/cgroup CPU sets on Linux)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_cores(model_names, shares=None, threads_per_replica=None, cores=None):
+    """
+    Returns {model name: [core ids of replica 0, core ids of replica 1, ...]}.
+    Each model gets a contiguous slice of `cores` proportional to its share (at least one
+    core), which is split into replicas of threads_per_replica cores each. With fewer
+    cores than models, every model gets all cores.
+    """
+    cores = list(cores if cores is not None else available_cores())
+    shares = dict(DEFAULT_CORE_SHARES, **(shares or {}))
+    threads_per_replica = dict(DEFAULT_THREADS_PER_REPLICA, **(threads_per_replica or {}))
+    if len(cores) < len(model_names):
+        slices = {name: cores for name in model_names}
+    else:
+        weights = [shares.get(name, 1.0 / len(model_names)) for name in model_names]
+        total = sum(weights)
+        sizes = [max(1, int(len(cores) * weight / total)) for weight in weights]
+        # Hand cores lost to rounding to the largest shares; take back any excess from them
+        order = sorted(range(len(sizes)), key=lambda i: -weights[i])
+        i = 0
+        while sum(sizes) != len(cores):
+            index = order[i % len(order)]
+            if sum(sizes) < len(cores):
+                sizes[index] += 1
+            elif sizes[index] > 1:
+                sizes[index] -= 1
+            i += 1
+        slices, start = {}, 0
+        for name, size in zip(model_names, sizes):
+            slices[name] = cores[start:start + size]
+            start += size
+
+    plan = {}
+    for name, cores_slice in slices.items():
+        width = threads_per_replica.get(name) or len(cores_slice)
+        replicas = max(1, len(cores_slice) // width)
+        # Spread any remainder over the first replicas
+        base, extra = divmod(len(cores_slice), replicas)
+        plan[name], start = [], 0
+        for i in range(replicas):
+            size = base + (1 if i < extra else 0)
+            plan[name].append(cores_slice[start:start + size])
+            start += size
+    return plan
+
+
+def pin_current_process(cores, interop_threads=1):
+    """
+    Restricts this process to `cores` and sizes torch's pools to match: one intra-op
+    thread per core and a small inter-op pool. Call before any torch work starts.
+    """
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            print(f"Could not pin process {os.getpid()} to cores {cores}: {e}")
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(len(cores))
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Only allowed before the first inter-op parallel work in this process
+        pass
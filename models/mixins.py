@@ -1,5 +1,225 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+
+from utils.memory import current_rss_bytes
+from utils.metrics import LatencyHistogram
+from utils.result_cache import make_cache_key
+
 
 class TimingMixin:
-    """Simple mixin providing additional functionality for Multiple Inheritance."""
+    """
+    Per-stage instrumentation for BaseModel subclasses.
+    Hot paths wrap their stages in `with self.span("stage"):`, or attach hooks to torch
+    modules with instrument_module(). Durations are aggregated per stage (get_timing_stats())
+    and kept as trace events, with RSS samples, for export_chrome_trace().
+    Instrumentation is opt-in: spans are no-ops until enable_instrumentation() is called.
+    """
+    _timing = None
+
     def get_mixin_info(self):
-        return "(Inherits from TimingMixin)"
\ No newline at end of file
+        return "(Inherits from TimingMixin)"
+
+    def enable_instrumentation(self, sample_memory=True, trace_allocations=False, max_events=20000):
+        """
+        sample_memory records process RSS at the end of every span; trace_allocations also
+        records Python heap usage via tracemalloc (slow; torch tensors are not included).
+        Only the last max_events trace events are kept.
+        """
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._timing = {
+            "enabled": True,
+            "sample_memory": sample_memory,
+            "trace_allocations": trace_allocations,
+            "torch_profiling": False,
+            "events": deque(maxlen=max_events),
+            "stages": {},
+            "lock": threading.Lock()
+        }
+
+    def disable_instrumentation(self):
+        self._timing_state()["enabled"] = False
+
+    def reset_timing(self):
+        state = self._timing_state()
+        with state["lock"]:
+            state["events"].clear()
+            state["stages"].clear()
+
+    def get_timing_stats(self):
+        """Latency summary (seconds) per stage name."""
+        state = self._timing_state()
+        with state["lock"]:
+            return {"stages": {name: histogram.summary() for name, histogram in state["stages"].items()}}
+
+    @contextmanager
+    def span(self, name, **args):
+        """Times the enclosed block as stage `name`; args are attached to the trace event."""
+        state = self._timing_state()
+        if not state["enabled"]:
+            yield
+            return
+        label = nullcontext()
+        if state["torch_profiling"]:
+            # Also label the block in the torch profiler's own trace
+            from torch.profiler import record_function
+            label = record_function(name)
+        start = time.perf_counter_ns()
+        error = False
+        try:
+            with label:
+                yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._record_span(name, start, time.perf_counter_ns(), args, error)
+
+    def instrument_module(self, module, stage):
+        """Records every forward() of a torch module as a `stage` span; returns the hook handles."""
+        starts = {}
+
+        def before(mod, inputs):
+            if self._timing_state()["enabled"]:
+                starts.setdefault(threading.get_ident(), []).append(time.perf_counter_ns())
+
+        def after(mod, inputs, output):
+            stack = starts.get(threading.get_ident())
+            if stack:
+                self._record_span(stage, stack.pop(), time.perf_counter_ns())
+
+        return [module.register_forward_pre_hook(before), module.register_forward_hook(after)]
+
+    @contextmanager
+    def torch_profile(self, trace_path=None):
+        """
+        Runs the enclosed block under torch.profiler (operator-level CPU times and memory).
+        Spans are labelled in its trace; it is written to trace_path if given.
+        """
+        from torch.profiler import ProfilerActivity, profile
+        state = self._timing_state()
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True, profile_memory=True) as profiler:
+            state["torch_profiling"] = True
+            try:
+                yield profiler
+            finally:
+                state["torch_profiling"] = False
+        if trace_path:
+            profiler.export_chrome_trace(trace_path)
+
+    def export_chrome_trace(self, path):
+        """Writes the recorded spans as Chrome trace JSON (chrome://tracing, Perfetto); returns the event count."""
+        state = self._timing_state()
+        with state["lock"]:
+            events = list(state["events"])
+        threads = {event["tid"] for event in events if "tid" in event}
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                     "args": {"name": names.get(tid, str(tid))}} for tid in threads]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def _timing_state(self):
+        if self._timing is None:
+            # Nothing is recorded until enable_instrumentation()
+            self.enable_instrumentation(sample_memory=False)
+            self._timing["enabled"] = False
+        return self._timing
+
+    def _record_span(self, name, start_ns, end_ns, args=None, error=False):
+        state = self._timing_state()
+        # Spans finishing after disable_instrumentation() (e.g. background image saves) are dropped
+        if not state["enabled"]:
+            return
+        event = {"name": name, "cat": self._model_name, "ph": "X", "ts": start_ns / 1000,
+                 "dur": (end_ns - start_ns) / 1000, "pid": os.getpid(), "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        counters = {}
+        if state["sample_memory"]:
+            rss = current_rss_bytes()
+            if rss is not None:
+                counters["rss_mb"] = rss / 2 ** 20
+        if state["trace_allocations"] and tracemalloc.is_tracing():
+            counters["python_heap_mb"] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        with state["lock"]:
+            state["stages"].setdefault(name, LatencyHistogram()).add((end_ns - start_ns) / 1e9, error)
+            state["events"].append(event)
+            if counters:
+                state["events"].append({"name": "memory", "ph": "C", "ts": end_ns / 1000,
+                                        "pid": os.getpid(), "args": counters})
+
+
+class CachingMixin:
+    """
+    Opt-in result caching for BaseModel subclasses.
+    A subclass routes predict() through _cached_predict() and overrides the
+    encode/decode hooks if its results are not plain JSON values.
+    """
+    _result_cache = None
+
+    def enable_result_cache(self, cache):
+        """Attaches a utils.result_cache.ResultCache (may be shared between models)."""
+        self._result_cache = cache
+
+    def disable_result_cache(self):
+        self._result_cache = None
+
+    def get_cache_stats(self):
+        return self._result_cache.get_stats() if self._result_cache else None
+
+    def _cache_params(self, **params):
+        """Generation parameters that change the output; included in the cache key."""
+        return params
+
+    def _cache_encode(self, result):
+        """
+        Returns (json_value, file_to_store) for the disk tier. file_to_store may be None,
+        a path, or a Future resolving to a path for files that are still being written.
+        """
+        return result, None
+
+    def _cache_decode(self, value, file_path):
+        """Rebuilds a result from the disk tier; file_path is the cached copy of the stored file."""
+        return value
+
+    def _cache_sizeof(self, result):
+        """Approximate in-memory size of a result, for the memory tier's byte budget."""
+        return 256
+
+    def _cached_predict(self, input_data, compute, **params):
+        """Returns a cached result for (model id, input, params), or calls compute() and caches it."""
+        cache = self._result_cache
+        if cache is None:
+            return compute()
+
+        key = make_cache_key(self._model_name, input_data, self._cache_params(**params))
+        hit = cache.get(key)
+        if hit is not None:
+            tier, stored = hit
+            if tier == "memory":
+                return stored
+            result = self._cache_decode(*stored)
+            cache.put_memory(key, self._model_name, result, self._cache_sizeof(result))
+            return result
+
+        result = compute()
+        model_id = self._model_name
+        cache.put_memory(key, model_id, result, self._cache_sizeof(result))
+        value, source_file = self._cache_encode(result)
+        if isinstance(source_file, Future):
+            # Add to the disk tier once the background write finishes, off the caller's path
+            def store(future):
+                if future.exception() is None:
+                    cache.put_disk(key, model_id, value, future.result())
+            source_file.add_done_callback(store)
+        else:
+            cache.put_disk(key, model_id, value, source_file)
+        return result
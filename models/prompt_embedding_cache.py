@@ -0,0 +1,81 @@
+# --- FILE: models/prompt_embedding_cache.py ---
+# Byte-bounded LRU of text-encoder outputs, so regenerating the same prompt with a
+# different seed, step count or profile skips text encoding entirely.
+import threading
+from collections import OrderedDict
+
+
+def tensor_nbytes(tensor):
+    return tensor.numel() * tensor.element_size() if tensor is not None else 0
+
+
+class PromptEmbeddingCache:
+    """
+    Maps (model id, prompt, negative prompt) to (prompt_embeds, negative_prompt_embeds).
+    Entries are evicted least recently used first once max_bytes is exceeded.
+    Embeddings shared between entries (e.g. the precomputed empty-prompt embeddings) can
+    be registered with set_shared() so they are not counted against every entry.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._shared = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_shared(self, model_id, name, tensor):
+        """Stores a per-model tensor that entries may reference (e.g. name="uncond")."""
+        with self._lock:
+            self._shared[(model_id, name)] = tensor
+
+    def get_shared(self, model_id, name):
+        return self._shared.get((model_id, name))
+
+    def get_or_compute(self, model_id, prompt, negative_prompt, compute):
+        """Returns the cached embeddings pair, or calls compute() and caches its result."""
+        key = (model_id, prompt, negative_prompt or "")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # Encoding runs outside the lock; concurrent misses on one key just encode twice
+        embeddings = compute()
+        shared = {id(tensor) for tensor in self._shared.values()}
+        size = sum(tensor_nbytes(tensor) for tensor in embeddings if id(tensor) not in shared)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (embeddings, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+        return embeddings
+
+    def clear(self, model_id=None):
+        """Drops every entry (and shared tensor) for model_id, or everything if None."""
+        with self._lock:
+            for key in [key for key in self._entries if model_id is None or key[0] == model_id]:
+                self._bytes -= self._entries.pop(key)[1]
+            for key in [key for key in self._shared if model_id is None or key[0] == model_id]:
+                del self._shared[key]
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,59 @@
+# --- FILE: models/registry.py ---
+# Static model metadata. This module must not import any ML framework so the GUI
+# can list and describe models before torch/transformers/diffusers are loaded.
+import importlib
+
+
+class ModelSpec:
+    """Declarative description of a model: metadata plus where to import its class from."""
+
+    def __init__(self, name, module, class_name, model_id, category, description, usage_example):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.model_id = model_id
+        self.category = category
+        self.description = description
+        self.usage_example = usage_example
+
+    def get_model_info(self):
+        """Same shape as BaseModel.get_model_info(), without constructing the model."""
+        return {
+            "Model Name": self.model_id,
+            "Category": self.category,
+            "Description": self.description,
+            "Status": "Not Loaded"
+        }
+
+    def import_class(self):
+        """Imports the model module (the expensive part) and returns the model class."""
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+
+MODEL_SPECS = {
+    "Text-to-Image": ModelSpec(
+        name="Text-to-Image",
+        module="models.text_to_image_model",
+        class_name="TextToImageModel",
+        model_id="nota-ai/bk-sdm-small",
+        category="Image Generation",
+        description="Generates images from text prompts (Stable Diffusion)",
+        usage_example="Enter text like 'a cute puppy wearing sunglasses'"
+    ),
+    # 'j-hartmann/emotion-english-distilroberta-base' is a highly stable model
+    # for 7 key emotion labels (anger, joy, sadness, etc.)
+    "Sentiment Analysis": ModelSpec(
+        name="Sentiment Analysis",
+        module="models.sentiment_model",
+        class_name="SentimentModel",
+        model_id="j-hartmann/emotion-english-distilroberta-base",
+        category="Text Classification (7 Emotion Labels)",
+        description="Classifies text into 7 key emotion labels (e.g., anger, joy, sadness, fear, love, surprise, neutral).",
+        usage_example="Enter text like 'I was totally surprised by the ending of that show!'"
+    ),
+}
+
+
+def get_spec(name):
+    """Returns the ModelSpec registered under the given display name."""
+    return MODEL_SPECS[name]
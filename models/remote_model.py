@@ -0,0 +1,431 @@
+# --- FILE: models/remote_model.py ---
+# Hosts a registered model in worker processes behind the BaseModel interface.
+# Each worker owns its own interpreter (and GIL), so Tk, tokenization and torch no
+# longer compete, and a native crash in a pipeline only takes down that worker.
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future
+from multiprocessing.shared_memory import SharedMemory
+
+from models.base_model import BaseModel
+from models.core_scheduler import pin_current_process
+from models.results import GenerationProgress, ImageResult, stream_generation
+from utils.image_writer import flush_default_writer
+from utils.memory import current_rss_bytes
+
+# Replicas per model when the pool size is not given: diffusion is memory-bound and
+# already uses every core in one process; the classifier scales with more replicas
+DEFAULT_REPLICAS = {"Text-to-Image": 1}
+
+# Read by torch/MKL/OpenMP at import time, so they are set before the model is imported
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Methods that change model state: sent to every replica and replayed after a restart
+STATE_PREFIXES = ("set_", "enable_", "disable_")
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process exited while handling a request; it is restarted automatically."""
+
+
+class SharedImage:
+    """Picklable handle to image pixels placed in shared memory by a worker."""
+
+    def __init__(self, shm_name, nbytes, mode, size, path, prompt, seed, saving=False):
+        self.shm_name = shm_name
+        # The block may be rounded up to a whole page
+        self.nbytes = nbytes
+        self.mode = mode
+        self.size = size
+        self.path = path
+        self.prompt = prompt
+        self.seed = seed
+        # True while the worker is still writing the file; completion is reported separately
+        self.saving = saving
+
+    @classmethod
+    def publish(cls, result):
+        """Copies an ImageResult's pixels into a new shared memory block (worker side)."""
+        data = result.image.tobytes()
+        shm = SharedMemory(create=True, size=max(1, len(data)))
+        shm.buf[:len(data)] = data
+        handle = cls(shm.name, len(data), result.image.mode, result.image.size, result.path, result.prompt, result.seed,
+                     saving=result.save_future is not None)
+        # The block outlives this handle; the receiving process unlinks it
+        shm.close()
+        return handle
+
+    def open(self, save_future=None):
+        """Rebuilds the ImageResult and frees the shared memory block (parent side)."""
+        from PIL import Image
+        shm = SharedMemory(name=self.shm_name)
+        try:
+            image = Image.frombytes(self.mode, self.size, bytes(shm.buf[:self.nbytes]))
+        finally:
+            shm.close()
+            shm.unlink()
+        return ImageResult(image, path=self.path, prompt=self.prompt, seed=self.seed, save_future=save_future)
+
+
+def _to_wire(result, saved_queue=None):
+    if isinstance(result, ImageResult):
+        # The pixels go back now; the file keeps being written in the background and
+        # (path, error or None) is sent on saved_queue once it is on disk
+        if saved_queue is not None and result.save_future is not None:
+            path = result.path
+            result.save_future.add_done_callback(lambda future: saved_queue.put(
+                (path, None if future.exception() is None else f"Error writing image {path}: {future.exception()}")))
+        return SharedImage.publish(result)
+    if isinstance(result, list):
+        return [_to_wire(item, saved_queue) for item in result]
+    return result
+
+
+def _from_wire(value, replica=None):
+    if isinstance(value, SharedImage):
+        return value.open(replica.claim_save(value.path) if value.saving and replica is not None else None)
+    if isinstance(value, list):
+        return [_from_wire(item, replica) for item in value]
+    return value
+
+
+def _footprint(model):
+    # Workers have nothing else resident, so RSS is a fair fallback
+    footprint = model.memory_footprint()
+    return footprint if footprint is not None else current_rss_bytes()
+
+
+def _worker_main(spec, conn, cancel_event, num_threads, cores=None, saved_queue=None):
+    """Worker process loop: receives (method, args, kwargs, streaming) and replies on conn."""
+    if num_threads:
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(num_threads)
+    model = spec.import_class()()
+    if cores:
+        # Pinned replicas own their cores: no other worker's threads compete for them
+        pin_current_process(cores)
+    elif num_threads:
+        try:
+            import torch
+            torch.set_num_threads(num_threads)
+        except ImportError:
+            pass
+
+    commands = {
+        "__methods__": lambda: sorted(name for name in dir(model)
+                                      if not name.startswith("_") and callable(getattr(model, name, None))),
+        "__footprint__": lambda: _footprint(model),
+    }
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            message = None
+        if message is None:
+            # Spawned processes skip atexit handlers: finish the queued image writes first
+            flush_default_writer()
+            return
+        method, args, kwargs, streaming = message
+        cancel_event.clear()
+        if streaming:
+            kwargs["progress_callback"] = lambda event: conn.send(
+                ("progress", event.step, event.total_steps, event.preview))
+            kwargs["should_cancel"] = cancel_event.is_set
+        try:
+            if method in commands:
+                result = commands[method]()
+            else:
+                result = getattr(model, method)(*args, **kwargs)
+            conn.send(("result", _to_wire(result, saved_queue)))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # Unpicklable exception types are reported by message
+                conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class WorkerReplica:
+    """One worker process hosting one copy of the model; handles one request at a time."""
+
+    def __init__(self, spec, num_threads, context, name, cores=None):
+        self._spec = spec
+        self._num_threads = num_threads
+        self.cores = cores
+        self._context = context
+        self.name = name
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.restarts = 0
+        self._process = None
+        self._conn = None
+        self._cancel_event = None
+        self._saved_queue = None
+        self._save_watcher = None
+        # Encapsulation: path -> Future for images the worker is still writing
+        self._saves = {}
+        self._saves_lock = threading.Lock()
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        # A previous worker that died between requests can no longer finish its writes
+        self._stop_watching(f"{self.name} exited before the image was written.")
+        parent_conn, child_conn = self._context.Pipe()
+        self._cancel_event = self._context.Event()
+        self._saved_queue = self._context.SimpleQueue()
+        self._process = self._context.Process(
+            target=_worker_main, args=(self._spec, child_conn, self._cancel_event, self._num_threads, self.cores,
+                                       self._saved_queue),
+            name=self.name, daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._save_watcher = threading.Thread(target=self._watch_saves, args=(self._saved_queue,),
+                                              name=f"{self.name}-saves", daemon=True)
+        self._save_watcher.start()
+
+    def stop(self, timeout=5.0):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._conn.close()
+        self._process = None
+        self._stop_watching(f"{self.name} stopped before the image was written.")
+
+    def call(self, method, args=(), kwargs=None, progress_callback=None, should_cancel=None):
+        """Runs method in the worker; the caller must hold self.lock."""
+        streaming = progress_callback is not None or should_cancel is not None
+        try:
+            self._conn.send((method, args, dict(kwargs or {}), streaming))
+            while True:
+                if not self._conn.poll(0.1):
+                    if should_cancel is not None and should_cancel():
+                        self._cancel_event.set()
+                    if not self._process.is_alive() and not self._conn.poll():
+                        raise EOFError
+                    continue
+                kind, *payload = self._conn.recv()
+                if kind != "progress":
+                    break
+                if progress_callback is not None:
+                    progress_callback(GenerationProgress(*payload))
+        except (EOFError, OSError):
+            exitcode = self._process.exitcode if self._process is not None else None
+            self._process = None
+            # The dead worker's end is gone; don't leak this one's descriptor on every restart
+            self._conn.close()
+            self.restarts += 1
+            self._stop_watching(f"{self.name} exited before the image was written.")
+            raise WorkerCrashed(f"{self.name} exited (code {exitcode}) during {method}(); restarting it.")
+        if kind == "error":
+            # Exceptions raised by the model itself are re-raised unchanged
+            raise payload[0]
+        return _from_wire(payload[0], self)
+
+    def claim_save(self, path):
+        """
+        The Future for the image at path. Whichever of the reply and the worker's
+        save notification arrives first creates it; the second one takes it out.
+        """
+        with self._saves_lock:
+            if path in self._saves:
+                return self._saves.pop(path)
+            future = self._saves[path] = Future()
+            return future
+
+    def _watch_saves(self, saved_queue):
+        while True:
+            message = saved_queue.get()
+            if message is None:
+                return
+            path, error = message
+            future = self.claim_save(path)
+            if error is None:
+                future.set_result(path)
+            else:
+                future.set_exception(OSError(error))
+
+    def _stop_watching(self, reason):
+        """Ends the save watcher and fails the images the worker can no longer write."""
+        if self._save_watcher is None:
+            return
+        # Queued after any notifications the worker sent before it exited
+        self._saved_queue.put(None)
+        self._save_watcher.join(5.0)
+        if not self._save_watcher.is_alive():
+            self._saved_queue.close()
+        self._save_watcher = None
+        with self._saves_lock:
+            pending, self._saves = self._saves, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashed(reason))
+
+
+class RemoteModel(BaseModel):
+    """
+    Proxy for a registered model running in `replicas` worker processes.
+    load_model()/predict() behave like the hosted model's; its other public methods are
+    forwarded once loaded. Requests go to the least busy replica, results come back over a
+    pipe and generated images through shared memory. A crashed worker fails its current
+    request with WorkerCrashed and is restarted (and reloaded) in the background.
+    core_sets (see models/core_scheduler.py) pins replica i to core_sets[i] and sizes its
+    thread pool to match; it overrides replicas and threads_per_replica.
+    """
+
+    def __init__(self, spec, replicas=None, threads_per_replica=None, core_sets=None):
+        # Encapsulation: metadata comes from the spec, so nothing is imported in this process
+        super().__init__(model_name=spec.model_id, category=spec.category, description=spec.description)
+        self._spec = spec
+        cpus = os.cpu_count() or 1
+        self._core_sets = core_sets
+        if core_sets:
+            replicas, threads_per_replica = len(core_sets), max(len(cores) for cores in core_sets)
+        self._replica_count = replicas or DEFAULT_REPLICAS.get(spec.name, max(1, cpus // 2))
+        self._threads = threads_per_replica or max(1, cpus // self._replica_count)
+        self._context = multiprocessing.get_context("spawn")
+        self._replicas = []
+        self._methods = set()
+        # Latest (args, kwargs) per state-changing method, in the order they were last called
+        self._state_calls = {}
+        # Set once load_model() starts: (re)started workers load the model. _is_loaded is only
+        # set after every replica has loaded it, so readiness checks see a finished load.
+        self._start_requested = False
+        self._pool_lock = threading.Lock()
+
+    # Overrides abstract method
+    def load_model(self):
+        try:
+            if not self._replicas:
+                self._replicas = [WorkerReplica(self._spec, len(self._core_sets[i]) if self._core_sets else self._threads,
+                                                self._context, f"{self._spec.name}-worker-{i}",
+                                                self._core_sets[i] if self._core_sets else None)
+                                  for i in range(self._replica_count)]
+            self._start_requested = True
+            for replica in self._replicas:
+                with replica.lock:
+                    self._ensure_started(replica)
+            with self._replicas[0].lock:
+                self._methods = set(self._replicas[0].call("__methods__"))
+            self._is_loaded = True
+            return True
+        except Exception as e:
+            print(f"Error starting workers for {self._spec.name}: {e}")
+            self.unload_model()
+            return False
+
+    # Overrides BaseModel.unload_model: stopping the workers returns all of their memory
+    def unload_model(self):
+        for replica in self._replicas:
+            with replica.lock:
+                replica.stop()
+        self._replicas = []
+        self._start_requested = False
+        return super().unload_model()
+
+    # Overrides BaseModel.memory_footprint: the sum over every worker
+    def memory_footprint(self):
+        total = 0
+        for replica in self._replicas:
+            with replica.lock:
+                if replica.is_alive():
+                    total += replica.call("__footprint__") or 0
+        return total
+
+    # Overrides abstract method
+    def predict(self, input_data, **kwargs):
+        return self._call("predict", (input_data,), kwargs)
+
+    # Overrides abstract method
+    def get_usage_example(self):
+        return self._spec.usage_example
+
+    def get_pool_stats(self):
+        return {
+            "replicas": len(self._replicas),
+            "threads_per_replica": self._threads,
+            "alive": sum(replica.is_alive() for replica in self._replicas),
+            "cores": [replica.cores for replica in self._replicas] if self._core_sets else None,
+            "outstanding": [replica.outstanding for replica in self._replicas],
+            "restarts": sum(replica.restarts for replica in self._replicas)
+        }
+
+    def __getattr__(self, name):
+        # Only reached for attributes not defined here: forward the hosted model's public methods
+        if name.startswith("_") or name not in self.__dict__.get("_methods", ()):
+            raise AttributeError(name)
+        if name == "generate_stream":
+            return self._generate_stream
+        if name.startswith(STATE_PREFIXES):
+            return lambda *args, **kwargs: self._broadcast(name, args, kwargs)
+        return lambda *args, **kwargs: self._call(name, args, kwargs)
+
+    def _ensure_started(self, replica):
+        """(Re)starts a dead worker and restores its state; the caller holds replica.lock."""
+        if replica.is_alive():
+            return
+        replica.start()
+        if self._start_requested and not replica.call("load_model"):
+            raise RuntimeError(f"{replica.name} failed to load {self._spec.name}.")
+        for method, (args, kwargs) in list(self._state_calls.items()):
+            replica.call(method, args, kwargs)
+
+    def _call(self, method, args, kwargs):
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        kwargs = dict(kwargs)
+        progress_callback = kwargs.pop("progress_callback", None)
+        should_cancel = kwargs.pop("should_cancel", None)
+        # Least-loaded dispatch: the replica with the fewest requests running or waiting
+        with self._pool_lock:
+            replica = min(self._replicas, key=lambda r: r.outstanding)
+            replica.outstanding += 1
+        try:
+            with replica.lock:
+                self._ensure_started(replica)
+                return replica.call(method, args, kwargs, progress_callback, should_cancel)
+        except WorkerCrashed:
+            threading.Thread(target=self._restart, args=(replica,), name=f"restart-{replica.name}",
+                             daemon=True).start()
+            raise
+        finally:
+            with self._pool_lock:
+                replica.outstanding -= 1
+
+    def _restart(self, replica):
+        try:
+            with replica.lock:
+                self._ensure_started(replica)
+        except Exception as e:
+            # The next request to this replica retries the restart
+            print(f"Could not restart {replica.name}: {e}")
+
+    def _broadcast(self, method, args, kwargs):
+        """Applies a state-changing call to every replica and records it for restarts."""
+        # Only the latest call per method is replayed; re-inserting keeps the replay order
+        # right for pairs like enable_x()/disable_x()
+        self._state_calls.pop(method, None)
+        self._state_calls[method] = (args, kwargs)
+        result = None
+        for replica in self._replicas:
+            with replica.lock:
+                if replica.is_alive():
+                    result = replica.call(method, args, kwargs)
+        return result
+
+    def _generate_stream(self, input_data, **kwargs):
+        """Streaming predict() for step-wise models; closing the generator cancels the run."""
+        return stream_generation(
+            lambda progress_callback, should_cancel: self._call(
+                "predict", (input_data,), dict(kwargs, progress_callback=progress_callback, should_cancel=should_cancel)),
+            f"{self._spec.name}-stream")
@@ -0,0 +1,142 @@
+# --- FILE: models/residency.py ---
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.memory import current_rss_bytes, format_bytes, release_memory
+
+
+class ResidencyManager:
+    """
+    Keeps the total footprint of loaded models under a memory budget.
+    Models are loaded on acquire(); when the budget is exceeded the least recently
+    used unpinned models are unloaded. Footprints come from BaseModel.memory_footprint(),
+    falling back to the RSS growth measured around load_model().
+    Models used through lease() are never evicted mid-call: eviction skips them and is
+    retried when their last lease ends. Loads run outside the manager's lock, so a cold
+    load only blocks callers of that same model.
+    """
+
+    def __init__(self, budget_bytes=None):
+        self.budget_bytes = budget_bytes
+        self._resident = OrderedDict()
+        self._pinned = set()
+        # Encapsulation: number of active leases per model name
+        self._in_use = {}
+        # Name -> Event set when the load in progress for that model finishes
+        self._loading = {}
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+
+    def acquire(self, name, model):
+        """Makes sure model is loaded, marks it most recently used and returns it (None on load failure)."""
+        return self._acquire(name, model, lease=False)
+
+    def _acquire(self, name, model, lease):
+        while True:
+            with self._lock:
+                if model.is_loaded and name in self._resident:
+                    self._resident.move_to_end(name)
+                    if lease:
+                        self._in_use[name] = self._in_use.get(name, 0) + 1
+                    return model
+                loading = self._loading.get(name)
+                if loading is None:
+                    loading = self._loading[name] = threading.Event()
+                    break
+            # Another caller is loading this model; use its result (or retry if it failed)
+            loading.wait()
+
+        loaded, footprint = False, 0
+        try:
+            rss_before = current_rss_bytes()
+            loaded = model.is_loaded or model.load_model()
+            if loaded:
+                footprint = model.memory_footprint()
+                if footprint is None:
+                    rss_after = current_rss_bytes()
+                    footprint = max(0, rss_after - rss_before) if rss_before is not None and rss_after is not None else 0
+        finally:
+            with self._lock:
+                if loaded:
+                    self.loads += 1
+                    self._resident[name] = (model, footprint)
+                    if lease:
+                        self._in_use[name] = self._in_use.get(name, 0) + 1
+                    self._enforce_budget(keep=name)
+                del self._loading[name]
+                loading.set()
+        return model if loaded else None
+
+    @contextmanager
+    def lease(self, name, model):
+        """
+        Context manager around a call on the model: acquires it (loading it if needed) and
+        keeps it resident until the block exits. Yields the model, or None on load failure.
+        """
+        model = self._acquire(name, model, lease=True)
+        try:
+            yield model
+        finally:
+            if model is not None:
+                with self._lock:
+                    self._in_use[name] -= 1
+                    if name in self._resident:
+                        self._resident.move_to_end(name)
+                    if not self._in_use[name]:
+                        del self._in_use[name]
+                        # Evictions skipped while this model (or another) was busy
+                        self._enforce_budget()
+
+    def release(self, name):
+        """Unloads a model now, regardless of the budget (pinned models included)."""
+        with self._lock:
+            entry = self._resident.pop(name, None)
+            self._pinned.discard(name)
+        if entry is not None:
+            entry[0].unload_model()
+            release_memory()
+
+    def pin(self, name):
+        """Exempts a model from eviction."""
+        with self._lock:
+            self._pinned.add(name)
+
+    def unpin(self, name):
+        with self._lock:
+            self._pinned.discard(name)
+            self._enforce_budget()
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(footprint for _, footprint in self._resident.values())
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "budget": format_bytes(self.budget_bytes) if self.budget_bytes else "unlimited",
+                "resident": {name: format_bytes(footprint) for name, (_, footprint) in self._resident.items()},
+                "resident_bytes": self.resident_bytes(),
+                "pinned": sorted(self._pinned),
+                "in_use": dict(self._in_use),
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
+
+    def _enforce_budget(self, keep=None):
+        if not self.budget_bytes:
+            return
+        evicted = False
+        for name in list(self._resident):
+            if self.resident_bytes() <= self.budget_bytes:
+                break
+            if name == keep or name in self._pinned or name in self._in_use:
+                continue
+            model, footprint = self._resident.pop(name)
+            model.unload_model()
+            self.evictions += 1
+            evicted = True
+            print(f"Evicted {name} ({format_bytes(footprint)}) to stay within {format_bytes(self.budget_bytes)}")
+        if evicted:
+            release_memory()
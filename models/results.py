@@ -0,0 +1,156 @@
+# --- FILE: models/results.py ---
+# Structured prediction results. str() keeps the text the GUI has always shown.
+import queue
+import threading
+
+
+class SentimentResult:
+    """
+    Top emotion label and its confidence for one input text.
+    Long texts classified window by window also carry the aggregated label
+    distribution and, on request, the per-window scores.
+    """
+
+    def __init__(self, label, score, distribution=None, aggregation=None, num_windows=1, chunks=None):
+        self.label = label
+        self.score = float(score)
+        self.distribution = distribution
+        self.aggregation = aggregation
+        self.num_windows = num_windows
+        # Per-window dicts: {"start_token", "end_token", "label", "score", "distribution"}
+        self.chunks = chunks
+
+    @property
+    def display_label(self):
+        # The model returns the raw emotion label (e.g., 'anger'); make it human-readable
+        return self.label.replace("_", " ").title()
+
+    def to_dict(self):
+        data = {"label": self.label, "score": self.score}
+        if self.distribution is not None:
+            data.update(distribution=self.distribution, aggregation=self.aggregation, num_windows=self.num_windows)
+        if self.chunks is not None:
+            data["chunks"] = self.chunks
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["label"], data["score"], data.get("distribution"), data.get("aggregation"),
+                   data.get("num_windows", 1), data.get("chunks"))
+
+    def __str__(self):
+        text = f"Detected Emotion: {self.display_label} (Confidence: {self.score:.4f})"
+        if self.num_windows > 1:
+            text += f" across {self.num_windows} windows ({self.aggregation})"
+        return text
+
+    def __repr__(self):
+        return f"SentimentResult(label={self.label!r}, score={self.score:.4f})"
+
+
+class ImageResult:
+    """
+    A generated image kept in memory, plus the path it is being written to.
+    The file is written in the background (see utils/image_writer.py); display
+    code should use the in-memory image or thumbnail() rather than re-reading it.
+    """
+
+    def __init__(self, image, path=None, prompt=None, save_future=None, seed=None):
+        self.image = image
+        self.path = path
+        self.prompt = prompt
+        self.seed = seed
+        self._save_future = save_future
+        self._thumbnails = {}
+
+    @classmethod
+    def from_file(cls, path, prompt=None):
+        """Wraps an existing image file; pixels are decoded lazily on first use."""
+        from PIL import Image
+        return cls(Image.open(path), path=path, prompt=prompt)
+
+    @property
+    def save_future(self):
+        return self._save_future
+
+    def wait_saved(self, timeout=None):
+        """Blocks until the background write has finished; returns the path."""
+        if self._save_future is not None:
+            self._save_future.result(timeout)
+        return self.path
+
+    def thumbnail(self, size=(450, 450)):
+        """Downscaled copy for display, computed once per size."""
+        thumb = self._thumbnails.get(size)
+        if thumb is None:
+            thumb = self.image.copy()
+            thumb.thumbnail(size)
+            self._thumbnails[size] = thumb
+        return thumb
+
+    @property
+    def nbytes(self):
+        """Approximate decoded size in memory."""
+        width, height = self.image.size
+        return width * height * len(self.image.getbands())
+
+    def to_dict(self):
+        return {"image_path": self.path, "prompt": self.prompt, "seed": self.seed,
+                "width": self.image.size[0], "height": self.image.size[1]}
+
+    def __str__(self):
+        return self.path or "<unsaved image>"
+
+    def __repr__(self):
+        return f"ImageResult(path={self.path!r}, size={self.image.size})"
+
+
+class GenerationCancelled(Exception):
+    """Raised by a generation that stopped early because cancellation was requested."""
+
+
+class GenerationProgress:
+    """One progress event from a step-wise generation, optionally with a low-resolution preview."""
+
+    def __init__(self, step, total_steps, preview=None):
+        self.step = step
+        self.total_steps = total_steps
+        self.preview = preview
+
+    @property
+    def fraction(self):
+        return self.step / self.total_steps if self.total_steps else 0.0
+
+    def __repr__(self):
+        return f"GenerationProgress({self.step}/{self.total_steps}, preview={self.preview is not None})"
+
+
+def stream_generation(generate, thread_name="generation-stream"):
+    """
+    Runs generate(progress_callback, should_cancel) on a background thread and yields every
+    GenerationProgress it reports, then its result. Closing the generator early cancels the run.
+    """
+    events = queue.Queue()
+    cancelled = threading.Event()
+    done = object()
+
+    def run():
+        try:
+            events.put(generate(events.put, cancelled.is_set))
+        except Exception as e:
+            events.put(e)
+        finally:
+            events.put(done)
+
+    threading.Thread(target=run, name=thread_name, daemon=True).start()
+    try:
+        while True:
+            event = events.get()
+            if event is done:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+    finally:
+        # Reached on normal completion too, where it is a no-op
+        cancelled.set()
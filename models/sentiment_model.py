@@ -1,53 +1,348 @@
-from transformers import pipeline
+import os
+
+import torch
+from transformers import AutoTokenizer, pipeline
 
 # Import necessary classes and decorators
 from models.base_model import BaseModel
+from models.mixins import CachingMixin, TimingMixin
+from models.registry import get_spec
+from models.results import SentimentResult
+from models.weights_cache import (has_local_export, has_local_weights, local_export_path, local_weights_path,
+                                  save_local_export, save_local_weights)
+from utils.memory import module_nbytes, release_memory
 from utils.decorators import log_action, measure_time
+from utils.micro_batcher import MicroBatcher
+
+# How per-window label distributions are combined into one document distribution
+AGGREGATIONS = ("mean", "max", "length")
+
+# Inference backends: eager fp32 PyTorch, dynamic int8-quantized PyTorch, or an optimized ONNX Runtime graph
+BACKENDS = ("eager", "int8", "onnx")
+DEFAULT_BACKEND = os.environ.get("AI_SENTIMENT_BACKEND", "eager")
+ONNX_FILE = "model_optimized.onnx"
 
 
-# Inheritance: Inherits from BaseModel
-class SentimentModel(BaseModel):
-    def __init__(self):
+# Multiple Inheritance: Inherits from BaseModel (core), TimingMixin (stage timing) and CachingMixin (result caching)
+class SentimentModel(BaseModel, TimingMixin, CachingMixin):
+    def __init__(self, batch_size=16, backend=DEFAULT_BACKEND):
         # Call BaseModel constructor for Encapsulation
-        # UPDATED: Using 'j-hartmann/emotion-english-distilroberta-base'. 
-        # This is a highly stable model for 7 key emotion labels (anger, joy, sadness, etc.)
+        # Metadata lives in models/registry.py so the GUI can show it without importing transformers
+        self._spec = get_spec("Sentiment Analysis")
         super().__init__(
-            model_name="j-hartmann/emotion-english-distilroberta-base",
-            category="Text Classification (7 Emotion Labels)",
-            description="Classifies text into 7 key emotion labels (e.g., anger, joy, sadness, fear, love, surprise, neutral)."
+            model_name=self._spec.model_id,
+            category=self._spec.category,
+            description=self._spec.description
         )
         self.classifier = None
-        
+        self._batch_size = batch_size
+        self._batcher = None
+        self._long_text = None
+        self.enable_long_text()
+        self._backend = None
+        self.set_backend(backend)
+
     # Overrides abstract method
     def load_model(self):
         try:
             # The model ID is fetched from self._model_name
             # This model is specifically compatible with the 'text-classification' pipeline.
-            self.classifier = pipeline("text-classification", model=self._model_name)
+            # Reloads use the local safetensors copy instead of resolving through the hub cache.
+            if self._backend == "onnx":
+                self.classifier = self._load_onnx()
+            elif has_local_weights(self._model_name):
+                self.classifier = pipeline("text-classification", model=local_weights_path(self._model_name))
+            else:
+                self.classifier = pipeline("text-classification", model=self._model_name)
+                save_local_weights(self._model_name, [self.classifier.model, self.classifier.tokenizer])
+            if self._backend == "int8":
+                # Linear weights are stored as int8; activations are quantized on the fly per batch
+                self.classifier.model = torch.ao.quantization.quantize_dynamic(
+                    self.classifier.model, {torch.nn.Linear}, dtype=torch.qint8)
             self._is_loaded = True
             return True
         except Exception as e:
             # Display the actual error message that caused the failure
-            print(f"Error loading model {self._model_name}: {e}") 
+            print(f"Error loading model {self._model_name}: {e}")
             return False
 
+    # Overrides BaseModel.unload_model
+    def unload_model(self):
+        self.classifier = None
+        release_memory()
+        return super().unload_model()
+
+    # Overrides BaseModel.memory_footprint
+    def memory_footprint(self):
+        if self.classifier is None:
+            return 0
+        if self._backend == "onnx":
+            return os.path.getsize(os.path.join(local_export_path(self._model_name, "onnx"), ONNX_FILE))
+        if self._backend == "int8":
+            # Packed int8 weights are not parameters; the residency manager measures RSS instead
+            return None
+        return module_nbytes(self.classifier.model)
+
+    def set_backend(self, backend):
+        """Selects the inference backend (see BACKENDS); takes effect on the next load_model()."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Available: {', '.join(BACKENDS)}")
+        if backend != self._backend and self._is_loaded:
+            self.unload_model()
+        self._backend = backend
+
+    def get_backend(self):
+        return self._backend
+
+    def _load_onnx(self):
+        """
+        Builds an ONNX Runtime pipeline. The first load exports the model and applies graph
+        optimizations (fusions, constant folding); the result is cached on local disk, so
+        later loads skip the export. Needs: pip install optimum[onnxruntime]
+        """
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTOptimizer
+        from optimum.onnxruntime.configuration import OptimizationConfig
+
+        if not has_local_export(self._model_name, "onnx", ONNX_FILE):
+            source = local_weights_path(self._model_name) if has_local_weights(self._model_name) else self._model_name
+
+            def export(directory):
+                exported = ORTModelForSequenceClassification.from_pretrained(source, export=True)
+                # Level 2 adds transformer-specific fusions (attention, GELU, LayerNorm) to the basic ones
+                ORTOptimizer.from_pretrained(exported).optimize(
+                    OptimizationConfig(optimization_level=2), save_dir=directory, file_suffix="optimized")
+                AutoTokenizer.from_pretrained(source).save_pretrained(directory)
+            if not save_local_export(self._model_name, "onnx", export):
+                raise RuntimeError("ONNX export failed.")
+
+        path = local_export_path(self._model_name, "onnx")
+        model = ORTModelForSequenceClassification.from_pretrained(path, file_name=ONNX_FILE)
+        return pipeline("text-classification", model=model, tokenizer=AutoTokenizer.from_pretrained(path))
+
+    def set_batch_size(self, batch_size):
+        """Sets how many texts the pipeline runs per padded forward pass."""
+        self._batch_size = batch_size
+
+    def enable_micro_batching(self, max_batch_size=16, max_wait_ms=5.0):
+        """
+        Routes predict() through a MicroBatcher so concurrent callers share one forward pass.
+        max_wait_ms is the latency/throughput knob: 0 dispatches immediately, larger values
+        wait longer to fill bigger batches.
+        """
+        self.disable_micro_batching()
+        self._batcher = MicroBatcher(self._run_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def disable_micro_batching(self):
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+
+    def enable_long_text(self, aggregation="mean", overlap=64, max_windows_per_batch=16):
+        """
+        Texts longer than the model's maximum length are tokenized once, split into windows
+        that overlap by `overlap` tokens, and classified window by window instead of being
+        truncated. Window distributions are aggregated by `aggregation` (see AGGREGATIONS);
+        max_windows_per_batch bounds the size of each padded forward pass.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{aggregation}'. Available: {', '.join(AGGREGATIONS)}")
+        self._long_text = {"aggregation": aggregation, "overlap": overlap,
+                           "max_windows_per_batch": max_windows_per_batch}
+
+    def disable_long_text(self):
+        """Long texts are truncated to the model's maximum length again."""
+        self._long_text = None
+
     # Multiple Decorators: Apply both log_action and measure_time
-    @log_action 
+    @log_action
     @measure_time
     def predict(self, input_data): # Overrides abstract method
         if not self._is_loaded:
             raise RuntimeError("Model not loaded.")
-            
-        print(f"Running Sentiment Analysis on: {input_data}")
-        # The model returns the most likely emotion (label) and its score
-        result = self.classifier(input_data)[0] 
-        
-        # The model returns the human-readable emotion label (e.g., 'anger').
-        emotion_label = result['label'].replace("_", " ").title()
-        
-        return f"Detected Emotion: {emotion_label} (Confidence: {result['score']:.4f})"
+
+        # Concurrent callers are coalesced into one batch when micro-batching is enabled
+        if self._batcher is not None:
+            compute = lambda: self._batcher(input_data)
+        else:
+            compute = lambda: self._run_batch([input_data])[0]
+        # Quantized backends may differ slightly from eager, so they are cached separately;
+        # every long-text setting changes the windows and so the aggregate
+        return self._cached_predict(input_data, compute, long_text=self._long_text, backend=self._backend)
+
+    @log_action
+    @measure_time
+    def predict_batch(self, texts):
+        """
+        Classifies many texts at once; returns one SentimentResult per text, in input order.
+        Bypasses the result cache, which is meant for interactive resubmissions.
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        return self._run_batch(list(texts))
+
+    @log_action
+    @measure_time
+    def predict_long(self, text, aggregation=None, return_chunks=False):
+        """
+        Classifies one text of any length with the sliding-window mode, even when long-text
+        mode is disabled. return_chunks adds the per-window scores to the result.
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        config = dict(self._long_text or {"overlap": 64, "max_windows_per_batch": 16})
+        config["aggregation"] = aggregation or config.get("aggregation", "mean")
+        if config["aggregation"] not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{config['aggregation']}'. Available: {', '.join(AGGREGATIONS)}")
+        return self._run_windows(self._tokenize([text]), config, return_chunks)[0]
+
+    def _run_batch(self, texts):
+        if not texts:
+            return []
+        results = [None] * len(texts)
+        if self._long_text is not None:
+            # Texts that may not fit in one window (a token covers at least one UTF-8 byte)
+            # are tokenized together in one call. Those that turn out to fit are classified
+            # from these ids; only the rest go through the windows.
+            window = self._window_size()
+            candidates = [i for i, text in enumerate(texts) if len(text.encode("utf-8")) > window]
+            if candidates:
+                documents = dict(zip(candidates, self._tokenize([texts[i] for i in candidates])))
+                long_ids = [i for i in candidates if len(documents[i]) > window]
+                fitting = [i for i in candidates if len(documents[i]) <= window]
+                short = [i for i in range(len(texts)) if i not in documents]
+                for i, result in zip(long_ids, self._run_windows([documents[i] for i in long_ids], self._long_text)):
+                    results[i] = result
+                for i, result in zip(fitting, self._run_ids([documents[i] for i in fitting])):
+                    results[i] = result
+                for i, result in zip(short, self._run_short([texts[i] for i in short])):
+                    results[i] = result
+                return results
+        return self._run_short(texts)
+
+    def _run_short(self, texts):
+        if not texts:
+            return []
+        # Sort by length so each padded batch groups similarly sized inputs,
+        # then restore the caller's order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        # The pipeline's tokenizer and model are called directly (same steps as the
+        # text-classification pipeline) so each stage can be timed separately
+        tokenizer = self.classifier.tokenizer
+        results = [None] * len(texts)
+        for start in range(0, len(order), self._batch_size):
+            batch = order[start:start + self._batch_size]
+            with self.span("tokenize", batch=len(batch)):
+                encoded = tokenizer([texts[i] for i in batch], padding=True, truncation=True,
+                                    return_tensors="pt").to(self.classifier.model.device)
+            self._classify(encoded, batch, results)
+        return results
+
+    def _run_ids(self, documents):
+        """Classifies token-id documents that fit in one window, padding the ids instead of re-tokenizing."""
+        if not documents:
+            return []
+        order = sorted(range(len(documents)), key=lambda i: len(documents[i]))
+        tokenizer = self.classifier.tokenizer
+        results = [None] * len(documents)
+        for start in range(0, len(order), self._batch_size):
+            batch = order[start:start + self._batch_size]
+            encoded = tokenizer.pad({"input_ids": [tokenizer.build_inputs_with_special_tokens(documents[i])
+                                                   for i in batch]}, return_tensors="pt")
+            self._classify(encoded.to(self.classifier.model.device), batch, results)
+        return results
+
+    def _classify(self, encoded, batch, results):
+        """Runs one padded batch and stores the top label of each row at results[batch[row]]."""
+        model = self.classifier.model
+        with self.span("forward", batch=len(batch), tokens=int(encoded["input_ids"].shape[1])):
+            with torch.no_grad():
+                scores, label_ids = model(**encoded).logits.softmax(-1).max(-1)
+        with self.span("postprocess", batch=len(batch)):
+            for i, score, label_id in zip(batch, scores.tolist(), label_ids.tolist()):
+                # The model returns the most likely emotion (label) and its score
+                results[i] = SentimentResult(model.config.id2label[label_id], score)
+
+    def _window_size(self):
+        """Content tokens per window: the model's maximum length minus its special tokens."""
+        tokenizer = self.classifier.tokenizer
+        max_length = tokenizer.model_max_length
+        if max_length > 100_000:
+            # Tokenizers without a configured limit report a huge sentinel value
+            max_length = self.classifier.model.config.max_position_embeddings
+        return max_length - tokenizer.num_special_tokens_to_add(pair=False)
+
+    def _tokenize(self, texts):
+        """Token ids of each text, without special tokens or truncation, from one batched tokenizer call."""
+        with self.span("tokenize", batch=len(texts)):
+            return self.classifier.tokenizer(texts, add_special_tokens=False, truncation=False,
+                                             verbose=False)["input_ids"]
+
+    def _run_windows(self, documents, config, return_chunks=False):
+        """
+        Classifies token-id documents window by window. Windows from all documents share
+        padded batches of at most max_windows_per_batch, so cost grows linearly with the
+        total number of tokens and memory stays bounded.
+        """
+        if not documents:
+            return []
+        window = self._window_size()
+        step = max(1, window - config["overlap"])
+        spans = []  # (document index, start token, end token)
+        for doc, ids in enumerate(documents):
+            start = 0
+            while True:
+                end = min(start + window, len(ids))
+                spans.append((doc, start, end))
+                if end >= len(ids):
+                    break
+                start += step
+
+        tokenizer = self.classifier.tokenizer
+        model = self.classifier.model
+        labels = [model.config.id2label[i] for i in range(model.config.num_labels)]
+        probabilities = []
+        limit = config["max_windows_per_batch"]
+        for i in range(0, len(spans), limit):
+            batch = [tokenizer.build_inputs_with_special_tokens(documents[doc][start:end])
+                     for doc, start, end in spans[i:i + limit]]
+            encoded = tokenizer.pad({"input_ids": batch}, return_tensors="pt").to(model.device)
+            with self.span("forward", batch=len(batch), tokens=int(encoded["input_ids"].shape[1])):
+                with torch.no_grad():
+                    probabilities.extend(model(**encoded).logits.softmax(-1).tolist())
+
+        with self.span("postprocess", batch=len(documents)):
+            per_document = [[] for _ in documents]
+            for (doc, start, end), probs in zip(spans, probabilities):
+                per_document[doc].append((start, end, probs))
+            return [self._aggregate(windows, labels, config["aggregation"], return_chunks) for windows in per_document]
+
+    def _aggregate(self, windows, labels, aggregation, return_chunks):
+        """Combines (start, end, probabilities) windows into one document-level SentimentResult."""
+        if aggregation == "max":
+            combined = [max(column) for column in zip(*(probs for _, _, probs in windows))]
+        else:
+            # "length" weights each window by its token count; "mean" weights them equally
+            weights = [end - start if aggregation == "length" else 1 for start, end, _ in windows]
+            combined = [sum(w * p for w, p in zip(weights, column)) for column in zip(*(probs for _, _, probs in windows))]
+        total = sum(combined)
+        distribution = {label: value / total for label, value in zip(labels, combined)}
+        label = max(distribution, key=distribution.get)
+        chunks = None
+        if return_chunks:
+            chunks = []
+            for start, end, probs in windows:
+                best = max(range(len(probs)), key=probs.__getitem__)
+                chunks.append({"start_token": start, "end_token": end, "label": labels[best], "score": probs[best],
+                               "distribution": dict(zip(labels, probs))})
+        return SentimentResult(label, distribution[label], distribution, aggregation, len(windows), chunks)
+
+    # Overrides CachingMixin hooks
+    def _cache_encode(self, result):
+        return result.to_dict(), None
+
+    def _cache_decode(self, value, file_path):
+        return SentimentResult.from_dict(value)
 
     # Overrides abstract method
     def get_usage_example(self):
-        # Updated usage example to reflect the 7-emotion classification
-        return "Enter text like 'I was totally surprised by the ending of that show!'"
+        return self._spec.usage_example
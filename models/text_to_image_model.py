@@ -1,54 +1,434 @@
 # --- FILE: models/text_to_image_model.py ---
-from diffusers import StableDiffusionPipeline
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+import random
+import diffusers
+from diffusers import StableDiffusionImg2ImgPipeline, StableDiffusionPipeline
 import torch
-import os
 import time
 
 # Import necessary classes
 from models.base_model import BaseModel
-from models.mixins import TimingMixin
+from models.registry import get_spec
+from models.mixins import CachingMixin, TimingMixin
+from models.results import GenerationCancelled, GenerationProgress, ImageResult, stream_generation
+from models.performance_profiles import DEFAULT_PROFILE, cpu_supports_bf16, get_profile
+from models.prompt_embedding_cache import PromptEmbeddingCache
+from models.weights_cache import has_local_weights, local_weights_path, save_local_weights
+from utils.image_writer import get_default_writer
+from utils.memory import RssSampler, module_nbytes, release_memory
 
+# Linear approximation of the SD v1 VAE decoder (4 latent channels -> RGB), used for
+# cheap previews without running the VAE
+LATENT_RGB_FACTORS = [
+    [0.298, 0.207, 0.208],
+    [0.187, 0.286, 0.173],
+    [-0.158, 0.189, 0.264],
+    [-0.184, -0.271, -0.473],
+]
 
-# Multiple Inheritance: Inherits from BaseModel (core) and TimingMixin (utility)
-class TextToImageModel(BaseModel, TimingMixin):
-    def __init__(self):
+# Draft latents kept for refine(), most recent first out
+MAX_DRAFTS = 16
+
+
+# Multiple Inheritance: Inherits from BaseModel (core), TimingMixin and CachingMixin (utilities)
+class TextToImageModel(BaseModel, TimingMixin, CachingMixin):
+    def __init__(self, profile=DEFAULT_PROFILE, image_writer=None, embedding_cache=None):
         # Call BaseModel constructor for Encapsulation
+        self._spec = get_spec("Text-to-Image")
         super().__init__(
-            model_name="nota-ai/bk-sdm-small",
-            category="Image Generation",
-            description="Generates images from text prompts (Stable Diffusion)"
+            model_name=self._spec.model_id,
+            category=self._spec.category,
+            description=self._spec.description
         )
         self.pipe = None
-        
+        # Image-to-image view of the same modules, built on the first refine()
+        self._img2img = None
+        self._drafts = OrderedDict()
+        self._device = "cpu"
+        self._profile = get_profile(profile)
+        self._applied_profile = None
+        self._default_scheduler = None
+        # torch's thread count when the model was loaded; runs with another count restore it
+        self._default_num_threads = None
+        self._profile_stats = {}
+        # Encoding and writing the PNG happens off the predict() path
+        self._image_writer = image_writer
+        # Text-encoder outputs for recently used prompts (may be shared between models)
+        self._embedding_cache = embedding_cache or PromptEmbeddingCache()
+
     # Overrides abstract method
-    def load_model(self):
+    def load_model(self, profile=None):
         try:
+            if profile is not None:
+                self._profile = get_profile(profile)
+            # Reloads use the local safetensors copy instead of resolving through the hub cache
+            cached = has_local_weights(self._model_name)
             self.pipe = StableDiffusionPipeline.from_pretrained(
-                self._model_name,
+                local_weights_path(self._model_name) if cached else self._model_name,
                 torch_dtype=torch.float32,
                 safety_checker=None
             )
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.pipe = self.pipe.to(device)
+            if not cached:
+                save_local_weights(self._model_name, [self.pipe])
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.pipe = self.pipe.to(self._device)
+            self._default_scheduler = self.pipe.scheduler
+            if self._default_num_threads is None:
+                self._default_num_threads = torch.get_num_threads()
+            self._applied_profile = None
+            self._apply_profile(self._profile)
+            # Stage spans: one text_encode per prompt batch, one unet_step per denoising step
+            # (both CFG branches run in one call), one vae_decode per batch
+            self.instrument_module(self.pipe.text_encoder, "text_encode")
+            self.instrument_module(self.pipe.unet, "unet_step")
+            self.instrument_module(self.pipe.vae.decoder, "vae_decode")
+            # Unconditional embeddings are the same for every prompt without a negative prompt
+            with torch.no_grad():
+                uncond = self.pipe.encode_prompt("", self._device, 1, False)[0]
+            self._embedding_cache.set_shared(self._model_name, "uncond", uncond)
             self._is_loaded = True
             return True
         except Exception as e:
             print(f"Error loading TTI model: {e}")
             return False
 
+    # Overrides BaseModel.unload_model
+    def unload_model(self):
+        self._embedding_cache.clear(self._model_name)
+        self.pipe = None
+        self._img2img = None
+        self._drafts.clear()
+        self._default_scheduler = None
+        self._applied_profile = None
+        release_memory()
+        return super().unload_model()
+
+    # Overrides BaseModel.memory_footprint
+    def memory_footprint(self):
+        if self.pipe is None:
+            return 0
+        return sum(module_nbytes(component) for component in self.pipe.components.values()
+                   if isinstance(component, torch.nn.Module))
+
+    def set_profile(self, profile):
+        """Selects the performance profile used by subsequent predict() calls."""
+        self._profile = get_profile(profile)
+
+    def get_profile_report(self):
+        """Measured latency and RSS growth during the run for every profile that has been run."""
+        return {name: dict(stats) for name, stats in self._profile_stats.items()}
+
+    def get_embedding_cache_stats(self):
+        """Hit rate and size of the prompt-embedding cache."""
+        return self._embedding_cache.get_stats()
+
     # Overrides abstract method
-    def predict(self, input_data):
+    def predict(self, input_data, profile=None, progress_callback=None, should_cancel=None, preview_every=5,
+                negative_prompt=None):
+        """
+        Generates one image, steered away from negative_prompt if given. progress_callback(GenerationProgress) is called after every
+        denoising step, with a low-resolution preview every preview_every steps (0 disables
+        previews). If should_cancel() returns True the run stops at the next step boundary
+        and GenerationCancelled is raised.
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        active = get_profile(profile) if profile is not None else self._profile
+        generate = lambda: self._generate(input_data, active, progress_callback, should_cancel, preview_every,
+                                          negative_prompt)
+        params = active.cache_params()
+        if negative_prompt:
+            params["negative_prompt"] = negative_prompt
+        return self._cached_predict(input_data, generate, **params)
+
+    def generate_stream(self, input_data, profile=None, preview_every=5):
+        """
+        Streaming variant of predict(): yields GenerationProgress events while the image is
+        generated, then the final ImageResult. Closing the generator early cancels the run.
+        """
+        return stream_generation(
+            lambda progress_callback, should_cancel: self.predict(input_data, profile, progress_callback,
+                                                                  should_cancel, preview_every),
+            "TTI-stream")
+
+    def _generate(self, input_data, profile, progress_callback=None, should_cancel=None, preview_every=5,
+                  negative_prompt=None):
+        print(f"Running TTI with prompt: {input_data} (profile: {profile.name})")
+        self._apply_profile(profile)
+        with self._profile_run(profile):
+            prompt_embeds, negative_embeds = self._encode_prompts([input_data], negative_prompt)
+            total_steps = profile.num_inference_steps
+            on_step_end = self._step_callback(progress_callback, should_cancel, preview_every)
+
+            with self._autocast(profile), self.span("generate", profile=profile.name, steps=total_steps):
+                image = self.pipe(
+                    prompt_embeds=prompt_embeds,
+                    negative_prompt_embeds=negative_embeds,
+                    num_inference_steps=total_steps,
+                    callback_on_step_end=on_step_end
+                ).images[0]
+        return self._to_result(image, input_data)
+
+    def predict_batch(self, prompts, num_images_per_prompt=1, seeds=None, max_batch_size=4, profile=None,
+                      progress_callback=None, should_cancel=None, negative_prompt=None):
+        """
+        Generates num_images_per_prompt images for each prompt, running up to max_batch_size
+        images per UNet forward pass (text encoding is batched too). Every image gets its own
+        seed - taken from seeds if given, otherwise drawn at random - so any image can be
+        regenerated individually. Returns ImageResults in prompt order. Bypasses the result cache.
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        if isinstance(prompts, str):
+            prompts = [prompts]
+        items = [prompt for prompt in prompts for _ in range(num_images_per_prompt)]
+        if seeds is None:
+            seeds = [random.randrange(2 ** 32) for _ in items]
+        elif len(seeds) != len(items):
+            raise ValueError(f"Expected {len(items)} seeds, got {len(seeds)}.")
+        active = get_profile(profile) if profile is not None else self._profile
+        print(f"Running TTI batch: {len(prompts)} prompt(s) x {num_images_per_prompt} image(s) (profile: {active.name})")
+        self._apply_profile(active)
+
+        results = []
+        total_steps = active.num_inference_steps
+        batches = [(items[i:i + max_batch_size], seeds[i:i + max_batch_size])
+                   for i in range(0, len(items), max_batch_size)]
+        for index, (batch_prompts, batch_seeds) in enumerate(batches):
+            def on_step_end(pipe, step, timestep, callback_kwargs):
+                if should_cancel is not None and should_cancel():
+                    raise GenerationCancelled(f"Cancelled in batch {index + 1}/{len(batches)}")
+                if progress_callback is not None:
+                    batch_steps = self._num_timesteps(pipe)
+                    done = index * batch_steps + step + 1
+                    progress_callback(GenerationProgress(done, batch_steps * len(batches)))
+                return callback_kwargs
+
+            generators = [torch.Generator(device=self._device).manual_seed(seed) for seed in batch_seeds]
+            with self._profile_run(active, images=len(batch_prompts)):
+                prompt_embeds, negative_embeds = self._encode_prompts(batch_prompts, negative_prompt)
+                with self._autocast(active), self.span("generate", profile=active.name, steps=total_steps,
+                                                       batch=len(batch_prompts)):
+                    images = self.pipe(
+                        prompt_embeds=prompt_embeds,
+                        negative_prompt_embeds=negative_embeds,
+                        num_inference_steps=total_steps,
+                        generator=generators,
+                        callback_on_step_end=on_step_end
+                    ).images
+            results.extend(self._to_result(image, prompt, seed)
+                           for image, prompt, seed in zip(images, batch_prompts, batch_seeds))
+        return results
+
+    def draft(self, input_data, seed=None, size=256, profile="fast", negative_prompt=None,
+              progress_callback=None, should_cancel=None, preview_every=0):
+        """
+        First phase of draft-then-refine: a quick size x size image with the given profile's
+        (few) steps, to judge composition. The final latents are kept, keyed by the returned
+        ImageResult's path, so refine() continues from them. Bypasses the result cache.
+        """
         if not self._is_loaded:
             raise RuntimeError("Model not loaded.")
-            
-        print(f"Running TTI with prompt: {input_data}")
-        image = self.pipe(input_data).images[0]
-        output_path = f"output_{int(time.time())}.png"
-        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-        image.save(output_path)
-        
-        return output_path
+        active = get_profile(profile)
+        seed = random.randrange(2 ** 32) if seed is None else seed
+        print(f"Drafting TTI with prompt: {input_data} ({size}px, seed {seed})")
+        self._apply_profile(active)
+        with self._profile_run(active):
+            prompt_embeds, negative_embeds = self._encode_prompts([input_data], negative_prompt)
+            total_steps = active.num_inference_steps
+            captured = {}
+            on_step_end = self._step_callback(progress_callback, should_cancel, preview_every, captured)
+
+            with self._autocast(active), self.span("draft", profile=active.name, steps=total_steps, size=size):
+                image = self.pipe(
+                    prompt_embeds=prompt_embeds,
+                    negative_prompt_embeds=negative_embeds,
+                    height=size,
+                    width=size,
+                    num_inference_steps=total_steps,
+                    generator=torch.Generator(device=self._device).manual_seed(seed),
+                    callback_on_step_end=on_step_end
+                ).images[0]
+        result = self._to_result(image, input_data, seed)
+        self._drafts[result.path] = {"latents": captured["latents"].detach().clone(), "prompt": input_data,
+                                     "negative_prompt": negative_prompt, "seed": seed}
+        while len(self._drafts) > MAX_DRAFTS:
+            self._drafts.popitem(last=False)
+        return result
+
+    def refine(self, draft, strength=0.55, upscale=2, profile=None, progress_callback=None, should_cancel=None,
+               preview_every=5):
+        """
+        Second phase: upscales the draft's latents by `upscale` and re-denoises them with
+        image-to-image on the same loaded modules, using the draft's prompt and seed.
+        strength (0-1) is how much may change; only about strength x steps steps are run.
+        draft is the ImageResult returned by draft(), or its path.
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded.")
+        state = self._drafts.get(draft.path if isinstance(draft, ImageResult) else draft)
+        if state is None:
+            raise ValueError("That draft is no longer available; create a new draft.")
+        active = get_profile(profile) if profile is not None else self._profile
+        print(f"Refining TTI draft: {state['prompt']} (profile: {active.name}, strength {strength})")
+        self._apply_profile(active)
+        with self._profile_run(active):
+            prompt_embeds, negative_embeds = self._encode_prompts([state["prompt"]], state["negative_prompt"])
+            latents = state["latents"]
+            if upscale != 1:
+                latents = torch.nn.functional.interpolate(latents, scale_factor=upscale, mode="bicubic")
+            total_steps = active.num_inference_steps
+            # The step count actually run comes from the img2img scheduler (see _step_callback)
+            on_step_end = self._step_callback(progress_callback, should_cancel, preview_every)
+
+            with self._autocast(active), self.span("refine", profile=active.name, steps=total_steps, strength=strength):
+                image = self._img2img_pipeline()(
+                    prompt_embeds=prompt_embeds,
+                    negative_prompt_embeds=negative_embeds,
+                    # 4-channel input is taken as latents: no VAE encode
+                    image=latents,
+                    strength=strength,
+                    num_inference_steps=total_steps,
+                    generator=torch.Generator(device=self._device).manual_seed(state["seed"]),
+                    callback_on_step_end=on_step_end
+                ).images[0]
+        return self._to_result(image, state["prompt"], state["seed"])
+
+    def _img2img_pipeline(self):
+        if self._img2img is None:
+            # Shares every module with self.pipe, so no weights are loaded or copied
+            self._img2img = StableDiffusionImg2ImgPipeline(**self.pipe.components, requires_safety_checker=False)
+        # _apply_profile() swaps self.pipe's scheduler; keep both pipelines on the same one
+        self._img2img.scheduler = self.pipe.scheduler
+        return self._img2img
+
+    @staticmethod
+    def _num_timesteps(pipe):
+        """Denoising steps the running pipeline actually takes (PNDM runs one more than requested)."""
+        return getattr(pipe, "_num_timesteps", None) or len(pipe.scheduler.timesteps)
+
+    def _step_callback(self, progress_callback=None, should_cancel=None, preview_every=5, captured=None):
+        """Builds a callback_on_step_end reporting progress, honouring cancellation and keeping the final latents."""
+        def on_step_end(pipe, step, timestep, callback_kwargs):
+            total_steps = self._num_timesteps(pipe)
+            # Raising here leaves the denoising loop immediately and skips the VAE decode
+            if should_cancel is not None and should_cancel():
+                raise GenerationCancelled(f"Cancelled at step {step + 1}/{total_steps}")
+            if captured is not None:
+                # Overwritten every step, so the last write is the final latents whatever the step count
+                captured["latents"] = callback_kwargs["latents"]
+            if progress_callback is not None:
+                preview = None
+                if preview_every and (step + 1) % preview_every == 0 and step + 1 < total_steps:
+                    preview = self._latent_preview(callback_kwargs["latents"])
+                progress_callback(GenerationProgress(step + 1, total_steps, preview))
+            return callback_kwargs
+        return on_step_end
+
+    def _encode_prompts(self, prompts, negative_prompt=None):
+        """
+        Text-encoder outputs for each prompt, batched along dim 0, through the embedding cache.
+        Encoded in full precision outside any autocast, so every profile reuses the same entries.
+        """
+        pairs = [self._embedding_cache.get_or_compute(self._model_name, prompt, negative_prompt,
+                                                      lambda prompt=prompt: self._encode_prompt(prompt, negative_prompt))
+                 for prompt in prompts]
+        return torch.cat([pair[0] for pair in pairs]), torch.cat([pair[1] for pair in pairs])
+
+    def _encode_prompt(self, prompt, negative_prompt=None):
+        with torch.no_grad():
+            if not negative_prompt:
+                prompt_embeds = self.pipe.encode_prompt(prompt, self._device, 1, False)[0]
+                return prompt_embeds, self._embedding_cache.get_shared(self._model_name, "uncond")
+            return self.pipe.encode_prompt(prompt, self._device, 1, True, negative_prompt)
+
+    def _latent_preview(self, latents, size=256):
+        """Approximate RGB preview of the first latent in the batch, without running the VAE."""
+        from PIL import Image
+        factors = torch.tensor(LATENT_RGB_FACTORS, dtype=latents.dtype, device=latents.device)
+        rgb = torch.einsum("chw,cr->hwr", latents[0], factors)
+        rgb = ((rgb + 1.0) / 2.0).clamp(0, 1).mul(255).to(torch.uint8).cpu().numpy()
+        return Image.fromarray(rgb).resize((size, size), Image.BILINEAR)
+
+    def _to_result(self, image, prompt, seed=None):
+        """Wraps the in-memory image and queues it for a background write."""
+        writer = self._image_writer or get_default_writer()
+        submitted = time.perf_counter_ns()
+        output_path, save_future = writer.submit(image)
+        # Recorded on the writer thread; includes time spent queued behind earlier images
+        save_future.add_done_callback(
+            lambda future: self._record_span("image_save", submitted, time.perf_counter_ns(), {"path": output_path},
+                                             future.exception() is not None))
+        return ImageResult(image, path=output_path, prompt=prompt, save_future=save_future, seed=seed)
+
+    def _apply_profile(self, profile):
+        """Reconfigures the loaded pipeline in place; cheap when the profile is unchanged."""
+        if profile is self._applied_profile:
+            return
+        if profile.scheduler:
+            scheduler_class = getattr(diffusers, profile.scheduler)
+            self.pipe.scheduler = scheduler_class.from_config(self._default_scheduler.config)
+        else:
+            self.pipe.scheduler = self._default_scheduler
+        if profile.attention_slicing:
+            self.pipe.enable_attention_slicing()
+        else:
+            self.pipe.disable_attention_slicing()
+        memory_format = torch.channels_last if profile.channels_last else torch.contiguous_format
+        self.pipe.unet.to(memory_format=memory_format)
+        self._applied_profile = profile
+
+    def _autocast(self, profile):
+        if profile.bf16_autocast and self._device == "cpu" and cpu_supports_bf16():
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return nullcontext()
+
+    @contextmanager
+    def _profile_run(self, profile, images=1):
+        """
+        Runs the block with the profile's thread count, then records its latency and the
+        RSS growth sampled while it ran. torch's thread count is process-wide (other models
+        in this process share it), so it is restored as soon as the block exits.
+        """
+        default = self._default_num_threads
+        # Never above the default, which a pinned worker has already sized to its cores
+        threads = min(profile.num_threads or default, default)
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+        start = time.perf_counter()
+        try:
+            with RssSampler() as memory:
+                yield
+        finally:
+            if threads != default:
+                torch.set_num_threads(default)
+        self._record_profile_run(profile, time.perf_counter() - start, images, memory.peak_growth)
+
+    def _record_profile_run(self, profile, latency, images=1, rss_growth=None):
+        stats = self._profile_stats.setdefault(profile.name, {"runs": 0, "images": 0, "total_latency": 0.0})
+        stats["runs"] += 1
+        stats["images"] += images
+        stats["total_latency"] += latency
+        stats["last_latency"] = latency
+        stats["mean_latency"] = stats["total_latency"] / stats["runs"]
+        # Per-image cost, comparable between serial predict() and batched predict_batch()
+        stats["mean_latency_per_image"] = stats["total_latency"] / stats["images"]
+        # Peak RSS above the RSS at the start of this run, so profiles can be compared in one process
+        stats["last_rss_growth_bytes"] = rss_growth
+        if rss_growth is not None:
+            stats["max_rss_growth_bytes"] = max(stats.get("max_rss_growth_bytes", 0), rss_growth)
+
+    # Overrides CachingMixin hooks: the image file is copied into the disk tier once written
+    def _cache_encode(self, result):
+        return result.to_dict(), result.save_future or result.path
+
+    def _cache_decode(self, value, file_path):
+        return ImageResult.from_file(file_path or value["image_path"], prompt=value.get("prompt"))
+
+    def _cache_sizeof(self, result):
+        return result.nbytes
 
     # Overrides abstract method
     def get_usage_example(self):
-        return "Enter text like 'a cute puppy wearing sunglasses'"
\ No newline at end of file
+        return self._spec.usage_example
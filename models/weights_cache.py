@@ -0,0 +1,61 @@
+# --- FILE: models/weights_cache.py ---
+# Local safetensors copies of hub models, and exported variants (e.g. ONNX graphs). Loading from a plain local directory skips
+# hub cache resolution, and safetensors files are memory-mapped, so a reload after
+# eviction is mostly page-cache reads.
+import os
+import shutil
+
+WEIGHTS_DIR = os.path.join(".model_cache", "weights")
+EXPORTS_DIR = os.path.join(".model_cache", "exports")
+
+
+def local_weights_path(model_id):
+    """Directory holding the local safetensors copy of model_id."""
+    return os.path.join(WEIGHTS_DIR, model_id.replace("/", "--"))
+
+
+def has_local_weights(model_id):
+    path = local_weights_path(model_id)
+    return os.path.isdir(path) and any(
+        name.endswith(".safetensors") for _, _, files in os.walk(path) for name in files)
+
+
+def save_local_weights(model_id, save_pretrained_objects):
+    """
+    Writes a local safetensors copy using each object's save_pretrained().
+    Failures are reported and ignored: the cache only speeds up later loads.
+    """
+    def write(directory):
+        for obj in save_pretrained_objects:
+            obj.save_pretrained(directory, safe_serialization=True)
+    return _write_atomically(local_weights_path(model_id), write, f"Could not cache weights for {model_id}")
+
+
+def local_export_path(model_id, kind):
+    """Directory holding an exported variant of model_id (e.g. kind="onnx")."""
+    return os.path.join(EXPORTS_DIR, kind, model_id.replace("/", "--"))
+
+
+def has_local_export(model_id, kind, file_name):
+    return os.path.isfile(os.path.join(local_export_path(model_id, kind), file_name))
+
+
+def save_local_export(model_id, kind, write):
+    """Runs write(directory) to produce an export; returns False (and reports) on failure."""
+    return _write_atomically(local_export_path(model_id, kind), write, f"Could not export {model_id} to {kind}")
+
+
+def _write_atomically(path, write, error_message):
+    # Write to a temporary directory first so a crash never leaves a half-written copy
+    tmp_path = path + ".tmp"
+    try:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        write(tmp_path)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        print(f"{error_message}: {e}")
+        return False
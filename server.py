@@ -0,0 +1,326 @@
+# --- FILE: server.py ---
+"""
+Local HTTP inference server exposing every ModelSelector model through one endpoint.
+
+    python server.py --port 8000
+    curl -X POST localhost:8000/predict -d '{"model": "Sentiment Analysis", "input": "I love this!"}'
+
+Endpoints:
+    POST /predict   {"model": name, "input": text, "params": {...}}
+    GET  /health    process is up
+    GET  /ready     200 once every served model has loaded once, 503 before
+    GET  /metrics   per-model queue, coalescing and latency statistics
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from gui.model_selector import ModelSelector
+from models.performance_profiles import PROFILES
+from models.registry import MODEL_SPECS
+from models.remote_model import RemoteModel
+from models.results import ImageResult
+from utils.metrics import LatencyHistogram
+
+# Default per-model limits: diffusion owns the CPU, sentiment calls are short and batchable
+DEFAULT_CONCURRENCY = {"Text-to-Image": 1, "Sentiment Analysis": 8}
+DEFAULT_MAX_QUEUE = {"Text-to-Image": 4, "Sentiment Analysis": 64}
+
+# predict() keyword arguments clients may set, with their allowed values (a type or a
+# collection of values); models not listed accept no params
+PREDICT_PARAMS = {
+    "Text-to-Image": {"profile": tuple(PROFILES), "negative_prompt": str},
+}
+
+
+class ServerBusy(Exception):
+    """Raised when a model's queue is full; carries the suggested Retry-After in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Server busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ModelLane:
+    """Concurrency limit, queue depth and in-flight coalescing for one resident model."""
+
+    def __init__(self, name, model, concurrency, max_queue, selector=None):
+        self.name = name
+        self.model = model
+        # Calls go through the selector's residency lease when given, so a memory budget
+        # never evicts the model mid-request
+        self._selector = selector
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        # Set after the first successful load. A model evicted by a memory budget afterwards
+        # stays ready: the next request's lease reloads it.
+        self.ready = False
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._in_flight = {}
+        self.outstanding = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.failures = 0
+        self.latency = LatencyHistogram()
+
+    async def predict(self, input_data, params, executor):
+        key = json.dumps([input_data, params], sort_keys=True)
+        # Identical requests already in flight share one computation
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        if self.outstanding >= self.concurrency + self.max_queue:
+            self.rejected += 1
+            raise ServerBusy(self._retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.outstanding += 1
+        try:
+            async with self._semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        executor, self._run, input_data, params)
+                finally:
+                    self.latency.add(time.perf_counter() - start)
+            future.set_result(result)
+        except Exception as e:
+            self.failures += 1
+            future.set_exception(e)
+        finally:
+            self.outstanding -= 1
+            del self._in_flight[key]
+        # Mark the exception as retrieved when nobody else was waiting on it
+        if future.exception() is not None:
+            raise future.exception()
+        return future.result()
+
+    def _run(self, input_data, params):
+        if self._selector is None:
+            result = self.model.predict(input_data, **params)
+        else:
+            with self._selector.lease_model(self.name) as model:
+                if model is None:
+                    raise RuntimeError(f"Failed to load {self.name}.")
+                result = model.predict(input_data, **params)
+        # Images are written in the background; the client is handed the path, so it must exist
+        if isinstance(result, ImageResult):
+            result.wait_saved()
+        return result
+
+    def _retry_after(self):
+        """Seconds until the current backlog should drain, from the observed mean latency."""
+        mean = self.latency.total / self.latency.count if self.latency.count else 1.0
+        return max(1, math.ceil(mean * self.outstanding / self.concurrency))
+
+    def get_stats(self):
+        return {
+            "ready": self.ready,
+            "loaded": self.model.is_loaded,
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "outstanding": self.outstanding,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "latency": self.latency.summary(),
+            # Per-stage timings from models with a TimingMixin
+            "stages": self.model.get_timing_stats()["stages"]
+            if self.model.is_loaded and hasattr(self.model, "get_timing_stats") else None
+        }
+
+
+class InferenceServer:
+    """Keeps models resident and serves HTTP/1.1 (with keep-alive) on asyncio streams."""
+
+    def __init__(self, selector=None, model_names=None, concurrency=None, max_queue=None):
+        self._selector = selector or ModelSelector()
+        self._model_names = model_names or self._selector.available_models()
+        self._concurrency = dict(DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self._max_queue = dict(DEFAULT_MAX_QUEUE, **(max_queue or {}))
+        self._lanes = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(self._concurrency.get(name, 1) for name in self._model_names))
+        self._started = time.time()
+        self._requests = 0
+        self._load_task = None
+
+    async def load_models(self):
+        """Loads every served model in the background; /ready reports progress."""
+        loop = asyncio.get_running_loop()
+        for name in self._model_names:
+            model = self._selector.get_model(name)
+            self._lanes[name] = ModelLane(name, model, self._concurrency.get(name, 1),
+                                          self._max_queue.get(name, 16), selector=self._selector)
+        for name, lane in self._lanes.items():
+            # Through the selector so the residency manager accounts for the model
+            if await loop.run_in_executor(self._executor, self._selector.load_model, name) is None:
+                print(f"Failed to load {name}")
+                continue
+            lane.ready = True
+            # Concurrent single requests to the classifier share forward passes. Not for worker
+            # pools: each replica runs one request at a time, so every batch would be a batch
+            # of one that still waited the full max_wait_ms.
+            if hasattr(lane.model, "enable_micro_batching") and not isinstance(lane.model, RemoteModel):
+                lane.model.enable_micro_batching(max_batch_size=lane.concurrency)
+            # Per-stage timings for /metrics; RSS sampling stays off the request path
+            if hasattr(lane.model, "enable_instrumentation"):
+                lane.model.enable_instrumentation(sample_memory=False)
+            print(f"{name} ready")
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self._load_task = asyncio.create_task(self.load_models())
+        print(f"Serving {', '.join(self._model_names)} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    # --- HTTP plumbing ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+                status, payload, extra_headers = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, extra_headers, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer, status, payload, extra_headers, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}",
+                 "Content-Type: application/json",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in extra_headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _route(self, method, path, body):
+        self._requests += 1
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "uptime": time.time() - self._started}, {}
+        if method == "GET" and path == "/ready":
+            models = {name: lane.ready for name, lane in self._lanes.items()}
+            ready = bool(models) and all(models.values()) and len(models) == len(self._model_names)
+            return (HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE), \
+                {"ready": ready, "models": models}, {}
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, {"requests": self._requests,
+                                   "models": {name: lane.get_stats() for name, lane in self._lanes.items()}}, {}
+        if method == "POST" and path == "/predict":
+            return await self._predict(body)
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}, {}
+
+    async def _predict(self, body):
+        try:
+            request = json.loads(body or b"{}")
+            name, input_data = request["model"], request["input"]
+            params = request.get("params") or {}
+        except (ValueError, KeyError, TypeError):
+            return HTTPStatus.BAD_REQUEST, {"error": "Expected JSON with 'model' and 'input'."}, {}
+        lane = self._lanes.get(name)
+        if lane is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown model '{name}'."}, {}
+        if not isinstance(input_data, str):
+            return HTTPStatus.BAD_REQUEST, {"error": "'input' must be a string."}, {}
+        error = validate_params(name, params)
+        if error:
+            return HTTPStatus.BAD_REQUEST, {"error": error}, {}
+        if not lane.ready:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"{name} is still loading."}, {"Retry-After": "5"}
+        try:
+            result = await lane.predict(input_data, params, self._executor)
+        except ServerBusy as e:
+            return HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)}, {"Retry-After": str(e.retry_after)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, {}
+        return HTTPStatus.OK, {"model": name, "result": to_json(result)}, {}
+
+
+def validate_params(model_name, params):
+    """Returns an error message if params are not all allowed for the model, else None."""
+    if not isinstance(params, dict):
+        return "'params' must be a JSON object."
+    allowed = PREDICT_PARAMS.get(model_name, {})
+    for key, value in params.items():
+        if key not in allowed:
+            return f"Unknown param '{key}' for {model_name}; allowed: {', '.join(allowed) or 'none'}."
+        expected = allowed[key]
+        if isinstance(expected, type):
+            if not isinstance(value, expected):
+                return f"Param '{key}' must be of type {expected.__name__}."
+        elif value not in expected:
+            return f"Param '{key}' must be one of: {', '.join(map(str, expected))}."
+    return None
+
+
+def to_json(result):
+    """Structured results expose to_dict(); anything else is returned as its string form."""
+    if hasattr(result, "to_dict"):
+        return result.to_dict()
+    return {"output": str(result)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the GUI's models over HTTP on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", action="append", dest="models",
+                        help="Model to serve (repeatable); defaults to all registered models.")
+    parser.add_argument("--worker-processes", action="store_true",
+                        help="Host each model in its own worker processes.")
+    parser.add_argument("--replicas", action="append", default=[], metavar="MODEL=N",
+                        help="Worker processes for a model (repeatable); implies --worker-processes.")
+    parser.add_argument("--pin-cores", action="store_true",
+                        help="Partition the cores between models and pin each replica to its own slice; "
+                             "implies --worker-processes.")
+    args = parser.parse_args(argv)
+    selector, concurrency = None, None
+    if args.pin_cores:
+        # Replica counts come from the core plan
+        selector = ModelSelector(worker_processes=dict.fromkeys(args.models or MODEL_SPECS), pin_cores=True)
+        print(f"Core plan: {selector.get_core_plan()}")
+        # Two requests per replica keep every replica busy while the next request is sent
+        concurrency = {name: max(DEFAULT_CONCURRENCY.get(name, 1), 2 * len(core_sets))
+                       for name, core_sets in selector.get_core_plan().items()}
+    elif args.worker_processes or args.replicas:
+        pools = dict.fromkeys(args.models or MODEL_SPECS)
+        for item in args.replicas:
+            name, _, count = item.rpartition("=")
+            pools[name] = int(count)
+        selector = ModelSelector(worker_processes=pools)
+    server = InferenceServer(selector=selector, model_names=args.models, concurrency=concurrency)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# Lets the tests import the repository's flat packages (gui, models, utils, benchmarks)
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+import batch_infer
+from benchmarks.stub_models import STUB_SPECS
+from gui.model_selector import ModelSelector
+
+MODEL = "Sentiment Analysis"
+
+
+@pytest.fixture(autouse=True)
+def stub_models(monkeypatch):
+    monkeypatch.setattr(batch_infer, "ModelSelector", lambda: ModelSelector(specs=STUB_SPECS))
+
+
+def write_input(tmp_path, count):
+    path = tmp_path / "reviews.jsonl"
+    path.write_text("".join(json.dumps({"id": f"r{i}", "text": f"review number {i}"}) + "\n" for i in range(count)))
+    return str(path)
+
+
+def run(input_path, output_path, *extra):
+    return batch_infer.main(["--model", MODEL, "--input", input_path, "--output", output_path, "--window", "3", *extra])
+
+
+def output_ids(output_path):
+    with open(output_path) as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_resume_after_interruption_has_no_duplicates_or_gaps(tmp_path, monkeypatch):
+    input_path, output_path = write_input(tmp_path, 10), str(tmp_path / "out.jsonl")
+    real_run = batch_infer.run_sentiment
+    windows_run = []
+
+    def crash_on_third_window(model, window):
+        windows_run.append(window)
+        if len(windows_run) == 3:
+            raise KeyboardInterrupt
+        return real_run(model, window)
+
+    monkeypatch.setattr(batch_infer, "run_sentiment", crash_on_third_window)
+    with pytest.raises(KeyboardInterrupt):
+        run(input_path, output_path)
+    assert output_ids(output_path) == [f"r{i}" for i in range(6)]
+    # A write cut short after the last checkpoint leaves a partial line behind
+    with open(output_path, "a") as f:
+        f.write('{"id": "r6", "lab')
+
+    monkeypatch.setattr(batch_infer, "run_sentiment", real_run)
+    assert run(input_path, output_path, "--resume") == 0
+    assert output_ids(output_path) == [f"r{i}" for i in range(10)]
+    assert not (tmp_path / "out.jsonl.ckpt").exists()
+
+
+def test_existing_output_needs_resume(tmp_path):
+    input_path, output_path = write_input(tmp_path, 2), str(tmp_path / "out.jsonl")
+    assert run(input_path, output_path) == 0
+    with pytest.raises(SystemExit):
+        run(input_path, output_path)
+
+
+def test_json_input_is_read_as_an_array(tmp_path):
+    path = tmp_path / "reviews.json"
+    path.write_text(json.dumps([{"id": "a", "text": "first"}, {"id": "b", "text": "second"}], indent=2))
+    assert batch_infer.detect_format(str(path)) == "json"
+    output_path = str(tmp_path / "out.jsonl")
+    assert run(str(path), output_path) == 0
+    assert output_ids(output_path) == ["a", "b"]
+
+
+def test_json_input_that_is_not_an_array_is_rejected(tmp_path):
+    path = tmp_path / "review.json"
+    path.write_text(json.dumps({"id": "a", "text": "only"}))
+    with pytest.raises(ValueError):
+        run(str(path), str(tmp_path / "out.jsonl"))
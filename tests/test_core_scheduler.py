@@ -0,0 +1,54 @@
+import pytest
+
+from models.core_scheduler import plan_cores
+
+MODELS = ["Text-to-Image", "Sentiment Analysis"]
+
+
+def test_one_core_is_shared_by_every_model():
+    assert plan_cores(MODELS, cores=[0]) == {"Text-to-Image": [[0]], "Sentiment Analysis": [[0]]}
+
+
+def test_two_cores():
+    assert plan_cores(MODELS, cores=[0, 1]) == {"Text-to-Image": [[0]], "Sentiment Analysis": [[1]]}
+
+
+def test_four_cores():
+    assert plan_cores(MODELS, cores=[0, 1, 2, 3]) == {"Text-to-Image": [[0, 1]], "Sentiment Analysis": [[2, 3]]}
+
+
+def test_many_cores_split_sentiment_into_replicas():
+    plan = plan_cores(MODELS, cores=range(16))
+    assert plan["Text-to-Image"] == [list(range(8))]
+    assert plan["Sentiment Analysis"] == [[8, 9], [10, 11], [12, 13], [14, 15]]
+
+
+def test_rounding_remainder_goes_to_a_model():
+    plan = plan_cores(MODELS, cores=range(5))
+    assert plan == {"Text-to-Image": [[0, 1, 2]], "Sentiment Analysis": [[3, 4]]}
+
+
+def test_remainder_cores_spread_over_first_replicas():
+    plan = plan_cores(["Sentiment Analysis"], cores=range(5))
+    assert plan["Sentiment Analysis"] == [[0, 1, 2], [3, 4]]
+
+
+def test_more_models_than_cores_share_all_cores():
+    plan = plan_cores(MODELS + ["Other"], cores=[0, 1])
+    assert plan == {name: [[0, 1]] for name in MODELS + ["Other"]}
+
+
+def test_never_more_replicas_than_cores():
+    # One core per replica asks for as many replicas as possible; a wider width than the slice still gets one
+    plan = plan_cores(MODELS, threads_per_replica={"Text-to-Image": 1, "Sentiment Analysis": 8}, cores=range(6))
+    assert plan == {"Text-to-Image": [[0], [1], [2]], "Sentiment Analysis": [[3, 4, 5]]}
+
+
+@pytest.mark.parametrize("count", range(1, 33))
+def test_every_core_is_used_once_and_no_replica_is_empty(count):
+    plan = plan_cores(MODELS, cores=range(count))
+    for replicas in plan.values():
+        assert all(replicas) and len(replicas) <= count
+    used = [core for replicas in plan.values() for cores in replicas for core in cores]
+    if count >= len(MODELS):
+        assert sorted(used) == list(range(count))
@@ -0,0 +1,144 @@
+import os
+import time
+
+import pytest
+
+from utils.history_store import HistoryStore
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        store = HistoryStore(str(tmp_path / "history.sqlite"), **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def image(tmp_path, name, size=100):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def page_ids(store, **kwargs):
+    return [entry["id"] for entry in store.search(**kwargs)]
+
+
+def test_pages_are_newest_first_and_do_not_overlap(make_store):
+    store = make_store()
+    ids = [store.add("m", f"prompt {i}", {"i": i}) for i in range(7)]
+    first = store.search(limit=3)
+    second = store.search(before=(first[-1]["created"], first[-1]["id"]), limit=3)
+    third = store.search(before=(second[-1]["created"], second[-1]["id"]), limit=3)
+    assert [e["id"] for e in first + second + third] == ids[::-1]
+    assert len(third) == 1
+
+
+def test_entries_round_trip_params_and_output(make_store):
+    store = make_store()
+    entry_id = store.add("Sentiment Analysis", "great day", {"label": "joy", "score": 0.9},
+                         params={"backend": "onnx"}, duration=0.25)
+    entry = store.get(entry_id)
+    assert entry["output"] == {"label": "joy", "score": 0.9}
+    assert entry["params"] == {"backend": "onnx"}
+    assert entry["duration"] == 0.25 and entry["image_path"] is None
+
+
+def test_full_text_search_matches_word_prefixes_and_filters_by_model(make_store):
+    store = make_store()
+    store.add("Text-to-Image", "a red fox in snow", {})
+    store.add("Text-to-Image", "a blue whale", {})
+    store.add("Sentiment Analysis", "foxes are lovely", {})
+    assert store.get_stats()["full_text_search"]
+    assert {e["prompt"] for e in store.search("fox")} == {"a red fox in snow", "foxes are lovely"}
+    assert [e["prompt"] for e in store.search("fox", model="Sentiment Analysis")] == ["foxes are lovely"]
+    assert [e["prompt"] for e in store.search("red snow")] == ["a red fox in snow"]
+    # Query syntax is treated as plain words
+    assert store.search('"; DROP TABLE history') == []
+    assert store.models() == ["Sentiment Analysis", "Text-to-Image"]
+
+
+def test_like_fallback_treats_wildcards_literally(make_store, monkeypatch):
+    monkeypatch.setattr(HistoryStore, "_create_fts", lambda self: False)
+    store = make_store()
+    for prompt in ("100% sure", "1005 sure", "snake_case", "snakeXcase"):
+        store.add("m", prompt, {})
+    assert [e["prompt"] for e in store.search("100%")] == ["100% sure"]
+    assert [e["prompt"] for e in store.search("snake_case")] == ["snake_case"]
+
+
+def test_entry_limit_deletes_oldest_rows_and_their_images(make_store, tmp_path):
+    store = make_store(max_entries=3, prune_every=1000)
+    paths = [image(tmp_path, f"{i}.png") for i in range(5)]
+    for i, path in enumerate(paths):
+        store.add("m", f"p{i}", {}, image_path=path, owned=True)
+    assert store.enforce_limits() == 2
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True, True]
+    assert store.get_stats()["entries"] == 3
+
+
+def test_old_entries_are_pruned_by_age(make_store, monkeypatch):
+    store = make_store(max_age_days=1)
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() - 2 * 86400)
+    store.add("m", "old", {})
+    monkeypatch.setattr(time, "time", real_time)
+    store.add("m", "new", {})
+    store.enforce_limits()
+    assert [e["prompt"] for e in store.search()] == ["new"]
+
+
+def test_image_budget_deletes_oldest_images_but_keeps_rows(make_store, tmp_path):
+    store = make_store(max_image_bytes=250, prune_every=1000)
+    paths = [image(tmp_path, f"{i}.png") for i in range(4)]
+    ids = [store.add("m", f"p{i}", {"image_path": path}, image_path=path, owned=True) for i, path in enumerate(paths)]
+    store.enforce_limits()
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+    assert store.get(ids[0])["image_path"] is None
+    assert store.get(ids[0])["output"] == {"image_path": paths[0]}
+    stats = store.get_stats()
+    assert stats["entries"] == 4 and stats["image_bytes"] == 200
+
+
+def test_shared_image_is_kept_while_referenced_and_counted_once(make_store, tmp_path):
+    store = make_store(max_image_bytes=150, prune_every=1000)
+    old = image(tmp_path, "old.png")
+    shared = image(tmp_path, "shared.png")
+    store.add("m", "old", {}, image_path=old, owned=True)
+    store.add("m", "first", {}, image_path=shared, owned=True)
+    # A result cache hit reuses the first run's file
+    store.add("m", "again", {}, image_path=shared, owned=True)
+    store.enforce_limits()
+    assert not os.path.exists(old)
+    assert os.path.exists(shared)
+    assert store.get_stats()["image_bytes"] == 100
+
+
+def test_unowned_images_are_neither_counted_nor_deleted(make_store, tmp_path):
+    store = make_store(max_entries=1, max_image_bytes=50, prune_every=1000)
+    borrowed = image(tmp_path, "borrowed.png")
+    store.add("m", "old", {}, image_path=borrowed)
+    store.add("m", "new", {}, image_path=image(tmp_path, "new.png", size=10), owned=True)
+    store.enforce_limits()
+    assert [e["prompt"] for e in store.search()] == ["new"]
+    assert os.path.exists(borrowed)
+    assert store.get_stats()["image_bytes"] == 10
+
+
+def test_files_under_protected_dirs_are_never_deleted(make_store, tmp_path):
+    cache_files = tmp_path / "results" / "files"
+    cache_files.mkdir(parents=True)
+    cached = str(cache_files / "key.png")
+    with open(cached, "wb") as f:
+        f.write(b"x" * 100)
+    store = make_store(max_entries=1, prune_every=1000, protected_dirs=[str(tmp_path / "results")])
+    store.add("m", "cache hit", {}, image_path=cached, owned=True)
+    store.add("m", "newer", {})
+    assert store.enforce_limits() == 0
+    assert os.path.exists(cached)
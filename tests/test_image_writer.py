@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from utils.image_writer import ImageWriter
+
+
+class SlowImage:
+    """Stand-in for a PIL image whose save() takes a while and records what it was given."""
+
+    def __init__(self, seconds=0.0, fail=False):
+        self.seconds = seconds
+        self.fail = fail
+        self.saved_to = None
+        self.final_existed = None
+
+    def save(self, path, **options):
+        self.saved_to = path
+        self.final_existed = os.path.exists(path[:-len(".part")])
+        time.sleep(self.seconds)
+        if self.fail:
+            raise OSError("disk full")
+        with open(path, "wb") as f:
+            f.write(options["format"].encode("ascii"))
+
+
+def test_paths_are_unique_and_use_the_format_extension(tmp_path):
+    writer = ImageWriter(output_dir=str(tmp_path))
+    paths = [writer.next_path() for _ in range(100)]
+    assert len(set(paths)) == 100
+    assert all(path.endswith(".png") and f"_{os.getpid()}_" in path for path in paths)
+    assert ImageWriter(output_dir=str(tmp_path), image_format="webp").next_path("draft").endswith(".webp")
+
+
+def test_path_is_returned_before_the_write_and_exists_after(tmp_path):
+    writer = ImageWriter(output_dir=str(tmp_path))
+    image = SlowImage(seconds=0.2)
+    path, future = writer.submit(image)
+    assert not future.done() and not os.path.exists(path)
+    assert future.result(5) == path
+    with open(path, "rb") as f:
+        assert f.read() == b"PNG"
+
+
+def test_image_is_written_to_a_part_file_then_renamed(tmp_path):
+    writer = ImageWriter(output_dir=str(tmp_path))
+    image = SlowImage()
+    path, future = writer.submit(image)
+    future.result(5)
+    assert image.saved_to == path + ".part"
+    assert image.final_existed is False
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_flush_waits_for_every_queued_image(tmp_path):
+    writer = ImageWriter(output_dir=str(tmp_path), image_format="webp")
+    submitted = [writer.submit(SlowImage(seconds=0.05)) for _ in range(4)]
+    writer.flush()
+    assert all(future.done() and os.path.exists(path) for path, future in submitted)
+
+
+def test_failed_write_sets_the_exception_and_leaves_no_file(tmp_path):
+    writer = ImageWriter(output_dir=str(tmp_path))
+    path, future = writer.submit(SlowImage(fail=True))
+    with pytest.raises(OSError):
+        future.result(5)
+    assert not os.path.exists(path)
+    # The writer keeps going after a failure
+    path, future = writer.submit(SlowImage())
+    assert future.result(5) == path
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from utils.job_executor import Job, JobExecutor, JobQueueFull
+
+
+def wait_for(executor, predicate, timeout=5.0):
+    """Polls the executor (as the Tk loop would) until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        executor.poll()
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("Timed out waiting for the executor")
+
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(max_queue=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_runs_job_on_worker_and_delivers_result_on_poll(executor):
+    results = []
+    job = executor.submit(lambda job: threading.current_thread().name, "name", on_done=results.append)
+    wait_for(executor, lambda: results)
+    assert results == ["JobExecutor"]
+    assert job.status == Job.DONE
+    assert job.progress == 1.0
+
+
+def test_failed_job_reports_error(executor):
+    errors = []
+    job = executor.submit(lambda job: 1 / 0, "boom", on_error=errors.append)
+    wait_for(executor, lambda: errors)
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert job.status == Job.FAILED
+
+
+def test_progress_is_delivered_with_payload(executor):
+    events = []
+
+    def work(job):
+        job.report_progress(0.5, "half", payload="preview")
+        return "done"
+
+    executor.submit(work, on_progress=lambda job, payload: events.append((job.message, payload)))
+    wait_for(executor, lambda: events)
+    assert events[0] == ("half", "preview")
+
+
+def test_full_queue_raises(executor):
+    release = threading.Event()
+    executor.submit(lambda job: release.wait(5))
+    wait_for(executor, lambda: executor.current_job is not None)
+    executor.submit(lambda job: None)
+    executor.submit(lambda job: None)
+    with pytest.raises(JobQueueFull):
+        executor.submit(lambda job: None)
+    release.set()
+
+
+def test_cancel_all_skips_queued_and_stops_running_jobs(executor):
+    started = threading.Event()
+    ran = []
+
+    def long_job(job):
+        started.set()
+        while True:
+            job.check_cancelled()
+            time.sleep(0.01)
+
+    running = executor.submit(long_job)
+    queued = executor.submit(lambda job: ran.append(True))
+    assert started.wait(5)
+    assert executor.pending_jobs() == [queued]
+    executor.cancel_all()
+    wait_for(executor, lambda: running.is_finished and queued.is_finished)
+    assert running.status == Job.CANCELLED
+    assert queued.status == Job.CANCELLED
+    assert ran == []
+    assert executor.pending_jobs() == []
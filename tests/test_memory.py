@@ -0,0 +1,18 @@
+import time
+
+from utils.memory import RssSampler, current_rss_bytes
+
+MB = 1024 ** 2
+
+
+def test_sampler_reports_growth_during_the_block_only():
+    assert current_rss_bytes() is not None
+    with RssSampler(interval=0.01) as before:
+        ballast = bytearray(64 * MB)
+        time.sleep(0.05)
+        del ballast
+    # A second block starting from the same RSS does not inherit the earlier peak
+    with RssSampler(interval=0.01) as after:
+        time.sleep(0.05)
+    assert before.peak_growth >= 60 * MB
+    assert after.peak_growth < 32 * MB
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from utils.metrics import LatencyHistogram, MetricsSink
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_sink(tmp_path, **kwargs):
+    return MetricsSink(log_file=str(tmp_path / "log.txt"), metrics_file=str(tmp_path / "metrics.jsonl"), **kwargs)
+
+
+def read_records(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_percentiles_use_nearest_rank():
+    histogram = LatencyHistogram()
+    for value in range(100, 0, -1):
+        histogram.add(float(value), error=value == 7)
+    summary = histogram.summary()
+    assert (summary["p50"], summary["p95"], summary["p99"], summary["max"]) == (50.0, 95.0, 99.0, 100.0)
+    assert summary["mean"] == 50.5
+    assert summary["count"] == 100 and summary["errors"] == 1
+
+
+def test_percentiles_cover_only_the_rolling_window():
+    histogram = LatencyHistogram(window=3)
+    for value in (100.0, 1.0, 2.0, 3.0):
+        histogram.add(value)
+    assert histogram.percentile(99) == 3.0
+    # Totals and the maximum cover every sample
+    assert histogram.count == 4 and histogram.max == 100.0
+    assert LatencyHistogram().summary()["p99"] == 0.0
+
+
+def test_records_are_buffered_until_flush(tmp_path):
+    sink = make_sink(tmp_path, flush_interval=60)
+    sink.record_call("Model.predict")
+    sink.record_timing("Model.predict", 0.25, error=True)
+    assert read_records(tmp_path) == []
+    sink.flush()
+    call, timing = read_records(tmp_path)
+    assert call["event"] == "call" and timing["duration"] == 0.25 and timing["error"] is True
+    assert (tmp_path / "log.txt").read_text().splitlines() == [
+        f"[LOG] Running predict at {time.ctime(call['ts'])}",
+        "[TIME] predict executed in 0.2500 sec (error)",
+    ]
+    assert sink.get_stats("Model.predict")["errors"] == 1
+    sink.close()
+
+
+def test_full_buffer_is_flushed_in_the_background(tmp_path):
+    sink = make_sink(tmp_path, flush_interval=60, max_buffer=5)
+    for _ in range(5):
+        sink.record_timing("f", 0.001)
+    deadline = time.time() + 5
+    while len(read_records(tmp_path)) < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(read_records(tmp_path)) == 5
+    sink.close()
+
+
+def test_pending_records_are_flushed_at_exit(tmp_path):
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1])\n"
+        "from utils.metrics import MetricsSink\n"
+        "sink = MetricsSink(log_file=sys.argv[2] + '/log.txt', metrics_file=sys.argv[2] + '/metrics.jsonl',"
+        " flush_interval=60)\n"
+        "sink.record_timing('f', 0.5)\n"
+    )
+    subprocess.run([sys.executable, "-c", script, REPO_ROOT, str(tmp_path)], check=True, timeout=30)
+    assert [record["function"] for record in read_records(tmp_path)] == ["f"]
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from utils.micro_batcher import MicroBatcher
+
+
+class RecordingBatchFn:
+    """batch_fn that doubles every item and records the size of each batch."""
+
+    def __init__(self):
+        self.sizes = []
+        self.threads = set()
+
+    def __call__(self, items):
+        self.sizes.append(len(items))
+        self.threads.add(threading.current_thread().name)
+        return [item * 2 for item in items]
+
+
+def test_concurrent_items_share_one_batch():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(8)]
+    assert [future.result(5) for future in futures] == [i * 2 for i in range(8)]
+    batcher.close()
+    assert batch_fn.sizes == [8]
+    assert batcher.get_stats() == {"batches": 1, "items": 8, "mean_batch_size": 8.0}
+    assert batch_fn.threads == {"MicroBatcher"}
+
+
+def test_batches_never_exceed_max_batch_size():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(10)]
+    assert [future.result(5) for future in futures] == [i * 2 for i in range(10)]
+    batcher.close()
+    assert max(batch_fn.sizes) <= 4
+    assert sum(batch_fn.sizes) == 10
+
+
+def test_single_item_is_dispatched_after_max_wait():
+    batcher = MicroBatcher(RecordingBatchFn(), max_batch_size=16, max_wait_ms=1)
+    assert batcher(21) == 42
+    batcher.close()
+
+
+def test_batch_error_fails_every_future_in_the_batch():
+    def failing(items):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=100)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError, match="bad batch"):
+            future.result(5)
+    batcher.close()
+
+
+def test_result_count_mismatch_is_an_error():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=2, max_wait_ms=100)
+    futures = [batcher.submit(i) for i in range(2)]
+    with pytest.raises(RuntimeError, match="returned 1 results for 2 items"):
+        futures[0].result(5)
+    batcher.close()
+
+
+def test_closed_batcher_rejects_items_and_validates_size():
+    batcher = MicroBatcher(RecordingBatchFn())
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+    with pytest.raises(ValueError):
+        MicroBatcher(RecordingBatchFn(), max_batch_size=0)
@@ -0,0 +1,90 @@
+from models.prompt_embedding_cache import PromptEmbeddingCache, tensor_nbytes
+
+
+class FakeTensor:
+    """Stands in for a torch tensor; only numel/element_size are used for accounting."""
+
+    def __init__(self, nbytes):
+        self._nbytes = nbytes
+
+    def numel(self):
+        return self._nbytes
+
+    def element_size(self):
+        return 1
+
+
+def encoder(nbytes, calls):
+    def compute():
+        calls.append(1)
+        return FakeTensor(nbytes), FakeTensor(nbytes)
+    return compute
+
+
+def test_tensor_nbytes_ignores_missing_tensor():
+    assert tensor_nbytes(None) == 0
+    assert tensor_nbytes(FakeTensor(12)) == 12
+
+
+def test_hit_skips_compute():
+    cache, calls = PromptEmbeddingCache(max_bytes=1000), []
+    first = cache.get_or_compute("m", "a cat", None, encoder(10, calls))
+    second = cache.get_or_compute("m", "a cat", "", encoder(10, calls))
+    assert second is first and len(calls) == 1
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert (stats["entries"], stats["bytes"]) == (1, 20)
+
+
+def test_key_includes_model_and_negative_prompt():
+    cache, calls = PromptEmbeddingCache(max_bytes=1000), []
+    cache.get_or_compute("m", "a cat", None, encoder(10, calls))
+    cache.get_or_compute("other", "a cat", None, encoder(10, calls))
+    cache.get_or_compute("m", "a cat", "blurry", encoder(10, calls))
+    assert len(calls) == 3
+
+
+def test_evicts_least_recently_used_past_max_bytes():
+    cache, calls = PromptEmbeddingCache(max_bytes=60), []
+    for prompt in ("a", "b", "c"):
+        cache.get_or_compute("m", prompt, None, encoder(10, calls))
+    cache.get_or_compute("m", "a", None, encoder(10, calls))  # "b" is now the oldest
+    cache.get_or_compute("m", "d", None, encoder(10, calls))
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (3, 60, 1)
+    calls.clear()
+    cache.get_or_compute("m", "a", None, encoder(10, calls))
+    assert not calls
+    cache.get_or_compute("m", "b", None, encoder(10, calls))
+    assert len(calls) == 1
+
+
+def test_entry_larger_than_budget_is_not_cached():
+    cache, calls = PromptEmbeddingCache(max_bytes=15), []
+    cache.get_or_compute("m", "huge", None, encoder(10, calls))
+    assert cache.get_stats()["entries"] == 0
+    cache.get_or_compute("m", "huge", None, encoder(10, calls))
+    assert len(calls) == 2
+
+
+def test_shared_tensors_are_not_counted_per_entry():
+    cache, calls = PromptEmbeddingCache(max_bytes=1000), []
+    uncond = FakeTensor(100)
+    cache.set_shared("m", "uncond", uncond)
+    assert cache.get_shared("m", "uncond") is uncond
+    for prompt in ("a", "b"):
+        cache.get_or_compute("m", prompt, None, lambda: (FakeTensor(10), uncond))
+    assert cache.get_stats()["bytes"] == 20
+
+
+def test_clear_by_model():
+    cache, calls = PromptEmbeddingCache(max_bytes=1000), []
+    cache.set_shared("m", "uncond", FakeTensor(5))
+    cache.get_or_compute("m", "a", None, encoder(10, calls))
+    cache.get_or_compute("other", "a", None, encoder(10, calls))
+    cache.clear("m")
+    assert cache.get_shared("m", "uncond") is None
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["bytes"]) == (1, 20)
+    cache.clear()
+    assert cache.get_stats()["bytes"] == 0
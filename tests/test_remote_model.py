@@ -0,0 +1,15 @@
+from benchmarks.stub_models import STUB_SPECS
+from models.remote_model import RemoteModel
+
+
+def test_only_the_latest_state_call_per_method_is_replayed_in_call_order():
+    model = RemoteModel(STUB_SPECS["Sentiment Analysis"], replicas=1, threads_per_replica=1)
+    # No workers are running, so the calls are only recorded for (re)started replicas
+    for _ in range(3):
+        model._broadcast("enable_instrumentation", (), {"sample_memory": False})
+        model._broadcast("disable_instrumentation", (), {})
+    model._broadcast("enable_instrumentation", (), {"sample_memory": True})
+    assert list(model._state_calls.items()) == [
+        ("disable_instrumentation", ((), {})),
+        ("enable_instrumentation", ((), {"sample_memory": True})),
+    ]
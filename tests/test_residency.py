@@ -0,0 +1,135 @@
+import threading
+import time
+
+from benchmarks.stub_models import STUB_SPECS, StubSentimentModel
+from gui.model_selector import ModelSelector
+from models.residency import ResidencyManager
+
+MB = 1024 ** 2
+
+
+def stub(footprint_mb):
+    return StubSentimentModel(load_seconds=0, footprint=footprint_mb * MB)
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    manager = ResidencyManager(budget_bytes=250 * MB)
+    a, b, c = stub(100), stub(100), stub(100)
+    manager.acquire("a", a)
+    manager.acquire("b", b)
+    manager.acquire("a", a)
+    manager.acquire("c", c)
+    assert not b.is_loaded
+    assert a.is_loaded and c.is_loaded
+    assert manager.get_stats()["evictions"] == 1
+    assert manager.resident_bytes() == 200 * MB
+
+
+def test_pinned_model_is_never_evicted():
+    manager = ResidencyManager(budget_bytes=150 * MB)
+    a, b = stub(100), stub(100)
+    manager.acquire("a", a)
+    manager.pin("a")
+    manager.acquire("b", b)
+    # Over budget, but the only other model is the one just acquired
+    assert a.is_loaded and b.is_loaded
+    manager.unpin("a")
+    assert not a.is_loaded and b.is_loaded
+
+
+def test_evicted_model_is_reloaded_on_acquire():
+    manager = ResidencyManager(budget_bytes=150 * MB)
+    a, b = stub(100), stub(100)
+    manager.acquire("a", a)
+    manager.acquire("b", b)
+    assert not a.is_loaded
+    assert manager.acquire("a", a) is a
+    assert a.is_loaded and not b.is_loaded
+    assert manager.get_stats()["loads"] == 3
+
+
+def test_leased_model_is_not_evicted_until_the_lease_ends():
+    manager = ResidencyManager(budget_bytes=150 * MB)
+    a, b = stub(100), stub(100)
+    with manager.lease("a", a) as leased:
+        assert leased is a
+        manager.acquire("b", b)
+        # Eviction of the busy model is deferred
+        assert a.is_loaded and b.is_loaded
+        assert manager.get_stats()["in_use"] == {"a": 1}
+    # The lease made "a" most recently used, so "b" goes
+    assert a.is_loaded and not b.is_loaded
+    assert manager.get_stats()["in_use"] == {}
+
+
+def test_concurrent_leases_keep_the_model_loaded():
+    manager = ResidencyManager(budget_bytes=150 * MB)
+    a, b = stub(100), stub(100)
+    inside = threading.Barrier(3)
+    leave = threading.Event()
+
+    def hold():
+        with manager.lease("a", a):
+            inside.wait(5)
+            leave.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    inside.wait(5)
+    assert manager.get_stats()["in_use"] == {"a": 2}
+    manager.acquire("b", b)
+    assert a.is_loaded
+    leave.set()
+    for thread in threads:
+        thread.join(5)
+    assert a.is_loaded and not b.is_loaded
+
+
+def test_release_unloads_and_clears_pin():
+    manager = ResidencyManager()
+    a = stub(100)
+    manager.acquire("a", a)
+    manager.pin("a")
+    manager.release("a")
+    assert not a.is_loaded
+    assert manager.get_stats()["pinned"] == []
+
+
+def test_selector_applies_budget_across_models():
+    selector = ModelSelector(specs=STUB_SPECS, memory_budget=1300 * MB)
+    sentiment = selector.load_model("Sentiment Analysis")
+    image = selector.load_model("Text-to-Image")
+    # 300 MB + 1200 MB exceeds the budget: the older sentiment model is unloaded
+    assert image.is_loaded and not sentiment.is_loaded
+    with selector.lease_model("Sentiment Analysis") as model:
+        assert model is sentiment and model.is_loaded
+
+
+def test_slow_load_does_not_block_leases_on_other_models():
+    manager = ResidencyManager()
+    resident = stub(100)
+    manager.acquire("resident", resident)
+    cold = StubSentimentModel(load_seconds=1.0)
+    loader = threading.Thread(target=manager.acquire, args=("cold", cold))
+    loader.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    with manager.lease("resident", resident) as model:
+        assert model is resident
+    assert time.perf_counter() - start < 0.5
+    loader.join(5)
+    assert cold.is_loaded
+
+
+def test_concurrent_acquires_of_one_model_load_it_once():
+    manager = ResidencyManager()
+    model = StubSentimentModel(load_seconds=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.acquire("a", model))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert results == [model] * 3
+    assert manager.get_stats()["loads"] == 1
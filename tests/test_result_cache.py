@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from benchmarks.stub_models import STUB_SPECS
+from gui.model_selector import ModelSelector
+from models.base_model import BaseModel
+from models.mixins import CachingMixin
+from utils.result_cache import MemoryTier, ResultCache, make_cache_key
+
+
+class EchoModel(BaseModel, CachingMixin):
+    """Minimal cached model: returns the input upper-cased and counts computations."""
+
+    def __init__(self):
+        super().__init__(model_name="test/echo", category="Test", description="Echo")
+        self.calls = 0
+
+    def load_model(self):
+        self._is_loaded = True
+        return True
+
+    def predict(self, input_data, shout=True):
+        def compute():
+            self.calls += 1
+            return input_data.upper() if shout else input_data
+        return self._cached_predict(input_data, compute, shout=shout)
+
+    def get_usage_example(self):
+        return "hello"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(cache_dir=str(tmp_path / "results"))
+
+
+def test_cache_key_ignores_whitespace_but_not_params():
+    assert make_cache_key("m", "a  b\n") == make_cache_key("m", "a b")
+    assert make_cache_key("m", "a", {"steps": 1}) != make_cache_key("m", "a", {"steps": 2})
+    assert make_cache_key("m", "a") != make_cache_key("n", "a")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(max_entries=2)
+    tier.put("a", "m", 1, 10)
+    tier.put("b", "m", 2, 10)
+    tier.get("a")
+    tier.put("c", "m", 3, 10)
+    assert tier.get("b") is None
+    assert tier.get("a") is not None and tier.get("c") is not None
+    assert tier.evictions == 1
+
+
+def test_memory_tier_respects_byte_budget():
+    tier = MemoryTier(max_bytes=100)
+    tier.put("big", "m", "x", 101)
+    assert len(tier) == 0
+    tier.put("a", "m", 1, 60)
+    tier.put("b", "m", 2, 60)
+    assert len(tier) == 1 and tier.size_bytes == 60
+
+
+def test_cached_predict_computes_once_per_input_and_params(cache):
+    model = EchoModel()
+    model.enable_result_cache(cache)
+    assert model.predict("hi") == "HI"
+    assert model.predict("hi ") == "HI"
+    assert model.calls == 1
+    assert model.predict("hi", shout=False) == "hi"
+    assert model.calls == 2
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 2
+
+
+def test_disk_tier_survives_a_new_cache_instance(tmp_path):
+    cache_dir = str(tmp_path / "results")
+    first = ResultCache(cache_dir=cache_dir)
+    model = EchoModel()
+    model.enable_result_cache(first)
+    model.predict("persist me")
+
+    second = ResultCache(cache_dir=cache_dir)
+    model = EchoModel()
+    model.enable_result_cache(second)
+    assert model.predict("persist me") == "PERSIST ME"
+    assert model.calls == 0
+    assert second.get_stats()["disk_hits"] == 1
+
+
+def test_disk_eviction_removes_files_and_memory_entries(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path / "results"), max_disk_bytes=150)
+    sources = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.png"
+        path.write_bytes(b"x" * 100)
+        sources.append(str(path))
+    cache.put_memory("a", "m", "A")
+    stored_a = cache.put_disk("a", "m", {"v": "A"}, sources[0])
+    assert os.path.exists(stored_a)
+    stored_b = cache.put_disk("b", "m", {"v": "B"}, sources[1])
+    # "a" was least recently used: its file and its memory entry are gone
+    assert not os.path.exists(stored_a)
+    assert cache.get("a") is None
+    assert cache.get("b") == ("disk", ({"v": "B"}, stored_b))
+    assert cache.get_stats()["disk_evictions"] == 1
+
+
+def test_invalidate_model_drops_both_tiers(cache):
+    cache.put_memory("k1", "m1", "v1")
+    cache.put_disk("k1", "m1", "v1")
+    cache.put_disk("k2", "m2", "v2")
+    cache.invalidate_model("m1")
+    assert cache.get("k1") is None
+    assert cache.get("k2") == ("disk", ("v2", None))
+
+
+def test_disk_tier_evicts_rows_without_files_by_entry_count(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path / "results"), max_disk_bytes=10, max_disk_entries=3)
+    for i in range(10):
+        cache.put_disk(f"k{i}", "m", {"label": "joy"})
+    stats = cache.get_stats()
+    assert stats["disk_entries"] == 3 and stats["disk_evictions"] == 7
+    assert cache.get("k0") is None
+    assert cache.get("k9") == ("disk", ({"label": "joy"}, None))
+
+
+def test_selector_purges_entries_of_unregistered_model_ids(tmp_path):
+    cache_dir = str(tmp_path / "results")
+    old = ResultCache(cache_dir=cache_dir)
+    old.put_disk("old", "stub/sentiment-v1", "v")
+    old.put_disk("current", "stub/sentiment", "v")
+
+    cache = ResultCache(cache_dir=cache_dir)
+    ModelSelector(specs=STUB_SPECS, result_cache=cache)
+    assert cache.get("old") is None
+    assert cache.get("current") == ("disk", ("v", None))
@@ -0,0 +1,64 @@
+import functools
+import json
+
+from benchmarks import run_benchmarks
+from benchmarks.run_benchmarks import benchmark_model, compare
+from benchmarks.stub_models import StubSentimentModel
+
+MODEL = "Sentiment Analysis"
+
+
+def bench():
+    return {"results": {MODEL: benchmark_model(MODEL, True, iterations=3, batch_sizes=[1, 4],
+                                               concurrency_levels=[1, 2])}}
+
+
+def test_slower_stub_is_reported_as_regression(monkeypatch):
+    baseline = bench()
+    assert compare(baseline, baseline, 0.10) == []
+    # Ten times the per-call cost of the default stub
+    monkeypatch.setattr(StubSentimentModel, "__init__",
+                        functools.partialmethod(StubSentimentModel.__init__, call_overhead=0.02, per_item=0.002))
+    regressed = {metric for metric, *_ in compare(baseline, bench(), 0.10)}
+    assert f"{MODEL}.warm_predict_p50_seconds" in regressed
+    assert f"{MODEL}.throughput_batch_4_items_per_s" in regressed
+    assert f"{MODEL}.throughput_concurrency_1_req_per_s" in regressed
+
+
+def report(**metrics):
+    return {"results": {MODEL: metrics}}
+
+
+def test_threshold_and_direction():
+    baseline = report(warm_predict_p50_seconds=0.1, throughput_batch_1_items_per_s=100.0, peak_rss_bytes=1000)
+    assert compare(baseline, report(warm_predict_p50_seconds=0.105, throughput_batch_1_items_per_s=95.0,
+                                    peak_rss_bytes=1050), 0.10) == []
+    # Faster latency and higher throughput are improvements, not regressions
+    assert compare(baseline, report(warm_predict_p50_seconds=0.05, throughput_batch_1_items_per_s=200.0,
+                                    peak_rss_bytes=1000), 0.10) == []
+    regressions = compare(baseline, report(warm_predict_p50_seconds=0.2, throughput_batch_1_items_per_s=50.0,
+                                           peak_rss_bytes=2000), 0.10)
+    assert [metric for metric, *_ in regressions] == [f"{MODEL}.warm_predict_p50_seconds",
+                                                      f"{MODEL}.throughput_batch_1_items_per_s",
+                                                      f"{MODEL}.peak_rss_bytes"]
+    assert regressions[1][3] == -0.5
+
+
+def test_small_timing_changes_are_noise():
+    baseline = report(warm_predict_p50_seconds=0.001)
+    assert compare(baseline, report(warm_predict_p50_seconds=0.003), 0.10) == []
+    assert len(compare(baseline, report(warm_predict_p50_seconds=0.003), 0.10, min_seconds=0.001)) == 1
+
+
+def test_errors_and_missing_metrics_are_skipped():
+    baseline = report(load_seconds=0.1)
+    assert compare(baseline, {"results": {MODEL: {"error": "failed"}, "Other": {"load_seconds": 9.0}}}, 0.10) == []
+
+
+def test_compare_exit_code(tmp_path, capsys):
+    old, new = tmp_path / "old.json", tmp_path / "new.json"
+    old.write_text(json.dumps(report(load_seconds=0.1)))
+    new.write_text(json.dumps(report(load_seconds=0.5)))
+    assert run_benchmarks.main(["--compare", str(old), str(old)]) == 0
+    assert run_benchmarks.main(["--compare", str(old), str(new), "--threshold", "0.2"]) == 1
+    assert "REGRESSION Sentiment Analysis.load_seconds" in capsys.readouterr().out
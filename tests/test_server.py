@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from benchmarks.stub_models import STUB_SPECS
+from gui.model_selector import ModelSelector
+from models.results import ImageResult
+from server import InferenceServer, ModelLane, to_json
+from utils.image_writer import ImageWriter
+
+MODEL = "Sentiment Analysis"
+
+
+def make_server(concurrency=1, max_queue=1, call_seconds=0.0):
+    selector = ModelSelector(specs=STUB_SPECS)
+    # Slow the stub down so requests overlap
+    selector.get_model(MODEL)._call_overhead = call_seconds
+    return InferenceServer(selector=selector, model_names=[MODEL],
+                           concurrency={MODEL: concurrency}, max_queue={MODEL: max_queue})
+
+
+def predict_body(text, params=None):
+    return json.dumps({"model": MODEL, "input": text, "params": params or {}}).encode("utf-8")
+
+
+async def loaded(server):
+    await server.load_models()
+    return server
+
+
+def test_ready_after_load_and_predict_returns_structured_result():
+    async def scenario():
+        server = make_server()
+        status, payload, _ = await server._route("GET", "/ready", b"")
+        assert status == HTTPStatus.SERVICE_UNAVAILABLE
+        await loaded(server)
+        status, payload, _ = await server._route("GET", "/ready", b"")
+        assert status == HTTPStatus.OK and payload["models"] == {MODEL: True}
+        return await server._route("POST", "/predict", predict_body("hello"))
+
+    status, payload, _ = asyncio.run(scenario())
+    assert status == HTTPStatus.OK
+    assert payload["model"] == MODEL
+    assert set(payload["result"]) == {"label", "score"}
+
+
+def test_full_queue_returns_429_with_retry_after():
+    async def scenario():
+        server = await loaded(make_server(concurrency=1, max_queue=1, call_seconds=0.2))
+        # One running and one queued request fill the lane; the third is rejected
+        responses = await asyncio.gather(*(server._route("POST", "/predict", predict_body(f"text {i}"))
+                                           for i in range(3)))
+        return server, responses
+
+    server, responses = asyncio.run(scenario())
+    statuses = [status for status, _, _ in responses]
+    assert statuses == [HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.TOO_MANY_REQUESTS]
+    _, payload, headers = responses[2]
+    assert int(headers["Retry-After"]) >= 1
+    assert server._lanes[MODEL].get_stats()["rejected"] == 1
+
+
+def test_identical_in_flight_requests_are_coalesced():
+    async def scenario():
+        server = await loaded(make_server(concurrency=1, max_queue=0, call_seconds=0.1))
+        responses = await asyncio.gather(*(server._route("POST", "/predict", predict_body("same"))
+                                           for _ in range(3)))
+        return server, responses
+
+    server, responses = asyncio.run(scenario())
+    assert [status for status, _, _ in responses] == [HTTPStatus.OK] * 3
+    assert server._lanes[MODEL].get_stats()["coalesced"] == 2
+
+
+def test_bad_requests_return_400_or_404():
+    async def scenario():
+        server = await loaded(make_server())
+        return [
+            await server._route("POST", "/predict", b"not json"),
+            await server._route("POST", "/predict", predict_body("hi", {"unknown": 1})),
+            await server._route("POST", "/predict", predict_body(["not", "a", "string"])),
+            await server._route("POST", "/predict", json.dumps({"model": "Nope", "input": "x"}).encode()),
+            await server._route("GET", "/nowhere", b""),
+        ]
+
+    statuses = [status for status, _, _ in asyncio.run(scenario())]
+    assert statuses == [HTTPStatus.BAD_REQUEST] * 3 + [HTTPStatus.NOT_FOUND] * 2
+
+
+def test_evicted_model_stays_ready_and_is_reloaded_by_the_next_request():
+    async def scenario():
+        server = await loaded(make_server())
+        # e.g. a memory budget unloading the model between requests
+        server._selector.unload_model(MODEL)
+        ready = await server._route("GET", "/ready", b"")
+        predicted = await server._route("POST", "/predict", predict_body("hello"))
+        return server, ready, predicted
+
+    server, (ready_status, _, _), (status, payload, _) = asyncio.run(scenario())
+    assert ready_status == HTTPStatus.OK
+    assert status == HTTPStatus.OK and set(payload["result"]) == {"label", "score"}
+    assert server._selector.get_model(MODEL).is_loaded
+
+
+class SlowSavingImage:
+    """Stand-in for a PIL image whose background save takes a while."""
+
+    size = (8, 8)
+
+    def save(self, path, **options):
+        time.sleep(0.2)
+        with open(path, "wb") as f:
+            f.write(b"png")
+
+
+class BackgroundImageModel:
+    """Returns ImageResults before their files are written, like TextToImageModel."""
+
+    def __init__(self, output_dir):
+        self._writer = ImageWriter(output_dir=output_dir)
+
+    def predict(self, input_data):
+        path, future = self._writer.submit(SlowSavingImage())
+        return ImageResult(SlowSavingImage(), path=path, prompt=input_data, save_future=future)
+
+
+def test_image_path_exists_when_the_result_is_returned(tmp_path):
+    lane = ModelLane("Text-to-Image", BackgroundImageModel(str(tmp_path)), concurrency=1, max_queue=1)
+    executor = ThreadPoolExecutor(max_workers=1)
+    result = asyncio.run(lane.predict("a cat", {}, executor))
+    assert os.path.exists(to_json(result)["image_path"])
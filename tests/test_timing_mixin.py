@@ -0,0 +1,38 @@
+import time
+
+from benchmarks.stub_models import StubSentimentModel
+
+
+def loaded_stub():
+    model = StubSentimentModel(load_seconds=0, call_overhead=0)
+    model.load_model()
+    return model
+
+
+def test_spans_are_not_recorded_until_instrumentation_is_enabled():
+    model = loaded_stub()
+    model.predict("hello")
+    assert model.get_timing_stats() == {"stages": {}}
+    model.enable_instrumentation(sample_memory=False)
+    model.predict("hello")
+    assert model.get_timing_stats()["stages"]["forward"]["count"] == 1
+
+
+def test_memory_is_only_sampled_when_requested():
+    model = loaded_stub()
+    model.enable_instrumentation(sample_memory=False)
+    model.predict("hello")
+    assert [event["ph"] for event in model._timing["events"]] == ["X"]
+    model.enable_instrumentation(sample_memory=True)
+    model.predict("hello")
+    assert [event["ph"] for event in model._timing["events"]] == ["X", "C"]
+
+
+def test_late_spans_are_dropped_after_disable():
+    model = loaded_stub()
+    model.enable_instrumentation(sample_memory=False)
+    start = time.perf_counter_ns()
+    model.disable_instrumentation()
+    # e.g. a background image save finishing after instrumentation was switched off
+    model._record_span("image_save", start, time.perf_counter_ns())
+    assert model.get_timing_stats() == {"stages": {}}
@@ -2,27 +2,28 @@
 import time
 from functools import wraps
 
-LOG_FILE = "function_log.txt"
+# LOG_FILE is re-exported for code that still references decorators.LOG_FILE
+from utils.metrics import LOG_FILE, metrics
 
 def log_action(func):
-    """Decorator 1: Logs function calls to a file."""
+    """Decorator 1: Logs function calls (buffered, flushed to LOG_FILE in the background)."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        log_message = f"[LOG] Running {func.__name__} at {time.ctime()}\n"
-        with open(LOG_FILE, "a") as f:
-            f.write(log_message)
+        metrics.record_call(func.__qualname__)
         return func(*args, **kwargs)
     return wrapper
 
 def measure_time(func):
-    """Decorator 2: Measures execution time and logs it to a file."""
+    """Decorator 2: Measures execution time on a monotonic clock and records it in the metrics sink."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        time_message = f"[TIME] {func.__name__} executed in {end - start:.4f} sec\n"
-        with open(LOG_FILE, "a") as f:
-            f.write(time_message)
-        return result
-    return wrapper
\ No newline at end of file
+        start = time.perf_counter()
+        error = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.record_timing(func.__qualname__, time.perf_counter() - start, error)
+    return wrapper
@@ -0,0 +1,228 @@
+# --- FILE: utils/history_store.py ---
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from utils.result_cache import CACHE_DIR
+
+HISTORY_PATH = os.path.join(".model_cache", "history.sqlite")
+
+
+class HistoryStore:
+    """
+    Persistent, searchable record of every run: model, prompt, params, structured output,
+    duration and the generated image file, in a SQLite database.
+    Prompts are full-text indexed (FTS5, with a LIKE fallback), and model and time are
+    indexed so pages are read with keyset queries instead of loading the whole history.
+    Bounded by age and entry count (rows and their images are deleted) and by total
+    image bytes (the oldest images are deleted; their rows stay searchable).
+    Only images recorded as owned (written by the app for that run) are counted or
+    deleted, and nothing under protected_dirs (the result cache's files) is ever deleted.
+    """
+
+    _COLUMNS = "id, created, model, prompt, params, output, duration, image_path"
+
+    def __init__(self, db_path=HISTORY_PATH, max_entries=5000, max_age_days=30,
+                 max_image_bytes=1024 ** 3, prune_every=20, protected_dirs=(CACHE_DIR,)):
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.max_image_bytes = max_image_bytes
+        self._prune_every = prune_every
+        self._protected_dirs = [os.path.realpath(path) for path in protected_dirs]
+        self._adds_since_prune = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            " id INTEGER PRIMARY KEY, created REAL, model TEXT, prompt TEXT, params TEXT,"
+            " output TEXT, duration REAL, image_path TEXT, image_bytes INTEGER, owned INTEGER DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(history)")]
+        if "owned" not in columns:
+            # Databases from before ownership was recorded: every image was written by the app
+            self._db.execute("ALTER TABLE history ADD COLUMN owned INTEGER DEFAULT 1")
+        self._db.execute("CREATE INDEX IF NOT EXISTS history_created ON history (created, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS history_model ON history (model, created, id)")
+        self._fts = self._create_fts()
+        self._db.commit()
+        self.enforce_limits()
+
+    def _create_fts(self):
+        """External-content FTS5 index over prompts; False if this SQLite lacks FTS5."""
+        try:
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts"
+                " USING fts5(prompt, content='history', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            return False
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN"
+            " INSERT INTO history_fts (rowid, prompt) VALUES (new.id, new.prompt); END"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN"
+            " INSERT INTO history_fts (history_fts, rowid, prompt) VALUES ('delete', old.id, old.prompt); END"
+        )
+        return True
+
+    def add(self, model, prompt, output, params=None, duration=None, image_path=None, owned=False):
+        """
+        Records one result; output is a JSON-serializable value (e.g. result.to_dict()).
+        owned marks image_path as written for this run, so retention may delete it.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO history (created, model, prompt, params, output, duration, image_path, owned)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), model, prompt, json.dumps(params or {}, sort_keys=True, default=str),
+                 json.dumps(output, default=str), duration, image_path, int(bool(image_path and owned)))
+            )
+            self._db.commit()
+            self._adds_since_prune += 1
+            prune = self._adds_since_prune >= self._prune_every
+        if prune:
+            self.enforce_limits()
+        return cursor.lastrowid
+
+    def get(self, entry_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLUMNS} FROM history WHERE id = ?", (entry_id,)).fetchone()
+        return self._to_entry(row) if row else None
+
+    def search(self, query=None, model=None, before=None, limit=50):
+        """
+        Newest-first page of entries matching every word of `query` (prefix match) and `model`.
+        `before` is the (created, id) of the last entry of the previous page.
+        """
+        clauses, args = [], []
+        if query and query.strip():
+            if self._fts:
+                words = re.findall(r"\w+", query)
+                if not words:
+                    return []
+                clauses.append("id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)")
+                args.append(" ".join('"{}"*'.format(word) for word in words))
+            else:
+                for word in query.split():
+                    clauses.append("prompt LIKE ? ESCAPE '\\'")
+                    escaped = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    args.append(f"%{escaped}%")
+        if model:
+            clauses.append("model = ?")
+            args.append(model)
+        if before:
+            clauses.append("(created < ? OR (created = ? AND id < ?))")
+            args.extend([before[0], before[0], before[1]])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM history {where} ORDER BY created DESC, id DESC LIMIT ?",
+                args + [limit]
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def models(self):
+        with self._lock:
+            return [model for (model,) in self._db.execute("SELECT DISTINCT model FROM history ORDER BY model")]
+
+    def enforce_limits(self):
+        """Applies the age, entry-count and image-byte bounds; returns the number of files deleted."""
+        with self._lock:
+            self._adds_since_prune = 0
+            doomed = []
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                doomed += self._db.execute(
+                    "SELECT id, image_path, owned FROM history WHERE created < ?", (cutoff,)).fetchall()
+            if self.max_entries is not None:
+                doomed += self._db.execute(
+                    "SELECT id, image_path, owned FROM history ORDER BY created DESC, id DESC LIMIT -1 OFFSET ?",
+                    (self.max_entries,)).fetchall()
+            deleted = 0
+            for entry_id, (image_path, owned) in {row[0]: row[1:] for row in doomed}.items():
+                self._db.execute("DELETE FROM history WHERE id = ?", (entry_id,))
+                if owned:
+                    deleted += self._release_image(image_path)
+            if self.max_image_bytes is not None:
+                deleted += self._evict_images()
+            self._db.commit()
+            return deleted
+
+    def _evict_images(self):
+        # Images are written in the background, so sizes are filled in once the file exists
+        for entry_id, image_path in self._db.execute(
+                "SELECT id, image_path FROM history"
+                " WHERE owned = 1 AND image_path IS NOT NULL AND image_bytes IS NULL").fetchall():
+            if os.path.exists(image_path):
+                self._db.execute("UPDATE history SET image_bytes = ? WHERE id = ?",
+                                 (os.path.getsize(image_path), entry_id))
+        total = self._image_bytes()
+        deleted = 0
+        if total <= self.max_image_bytes:
+            return deleted
+        rows = self._db.execute(
+            "SELECT id, image_path, image_bytes FROM history"
+            " WHERE owned = 1 AND image_bytes > 0 AND image_path IS NOT NULL ORDER BY created, id").fetchall()
+        for entry_id, image_path, size in rows:
+            if total <= self.max_image_bytes:
+                break
+            self._db.execute("UPDATE history SET image_path = NULL, image_bytes = 0 WHERE id = ?", (entry_id,))
+            # A file shared with newer rows stays (and keeps counting) until its last row lets go
+            if self._release_image(image_path):
+                deleted += 1
+                total -= size
+        return deleted
+
+    def _image_bytes(self):
+        """Bytes of owned image files still on disk, counting files shared by several rows once."""
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(image_bytes) AS size FROM history"
+            " WHERE owned = 1 AND image_path IS NOT NULL GROUP BY image_path)").fetchone()[0]
+
+    def get_stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            image_bytes = self._image_bytes()
+        return {"entries": entries, "image_bytes": image_bytes, "full_text_search": self._fts,
+                "max_entries": self.max_entries, "max_age_days": self.max_age_days,
+                "max_image_bytes": self.max_image_bytes}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _to_entry(row):
+        entry_id, created, model, prompt, params, output, duration, image_path = row
+        return {"id": entry_id, "created": created, "model": model, "prompt": prompt,
+                "params": json.loads(params), "output": json.loads(output),
+                "duration": duration, "image_path": image_path}
+
+    def _release_image(self, image_path):
+        # Results served from the result cache share their image file with the original run
+        if image_path and self._db.execute(
+                "SELECT 1 FROM history WHERE image_path = ? LIMIT 1", (image_path,)).fetchone() is None:
+            return self._delete_file(image_path)
+        return 0
+
+    def _delete_file(self, file_path):
+        if not file_path:
+            return 0
+        real_path = os.path.realpath(file_path)
+        # Files another component manages (e.g. the result cache's copies) are never ours to delete
+        if any(real_path.startswith(directory + os.sep) for directory in self._protected_dirs):
+            return 0
+        if os.path.exists(file_path):
+            try:
+                os.remove(file_path)
+                return 1
+            except OSError as e:
+                print(f"Could not delete history image {file_path}: {e}")
+        return 0
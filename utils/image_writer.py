@@ -0,0 +1,88 @@
+# --- FILE: utils/image_writer.py ---
+import atexit
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ImageWriter:
+    """
+    Encodes and writes PIL images on a background thread.
+    submit() picks a collision-free file name immediately and returns it with a
+    Future that resolves once the file is fully on disk, so callers can show the
+    in-memory image without waiting for PNG/WebP encoding.
+    """
+
+    def __init__(self, output_dir=".", image_format="png", compress_level=3, quality=90):
+        self.output_dir = output_dir
+        self.image_format = image_format.lower()
+        # PNG zlib level 0-9 (lossless; higher is smaller and slower), WebP quality 0-100
+        self.compress_level = compress_level
+        self.quality = quality
+        self._counter = itertools.count()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="ImageWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def next_path(self, prefix="output"):
+        """Unique per process (counter) and across processes (pid), sortable by time."""
+        extension = "webp" if self.image_format == "webp" else "png"
+        name = f"{prefix}_{time.time_ns()}_{os.getpid()}_{next(self._counter)}.{extension}"
+        return os.path.join(self.output_dir, name)
+
+    def submit(self, image, prefix="output"):
+        """Queues image for writing; returns (path, Future[path])."""
+        path = self.next_path(prefix)
+        future = Future()
+        self._queue.put((image, path, future))
+        return path, future
+
+    def flush(self):
+        """Blocks until every queued image has been written."""
+        self._queue.join()
+
+    def _save_options(self):
+        if self.image_format == "webp":
+            return {"format": "WEBP", "quality": self.quality}
+        return {"format": "PNG", "compress_level": self.compress_level}
+
+    def _run(self):
+        while True:
+            image, path, future = self._queue.get()
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                # Write then rename, so a reader never sees a partially written file
+                tmp_path = path + ".part"
+                image.save(tmp_path, **self._save_options())
+                os.replace(tmp_path, path)
+                future.set_result(path)
+            except Exception as e:
+                print(f"Error writing image {path}: {e}")
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def get_default_writer():
+    """Process-wide writer used by TextToImageModel unless it is given its own."""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = ImageWriter()
+        return _default_writer
+
+
+def flush_default_writer():
+    """Waits for the default writer's queued images, if it was ever created."""
+    with _default_lock:
+        writer = _default_writer
+    if writer is not None:
+        writer.flush()
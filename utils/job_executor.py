@@ -0,0 +1,224 @@
+# --- FILE: utils/job_executor.py ---
+import itertools
+import queue
+import threading
+import time
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the bounded queue is full."""
+
+
+class JobCancelled(Exception):
+    """Raised from inside a job function to stop cooperatively after cancel()."""
+
+
+class Job:
+    """A unit of work run by JobExecutor, with status, progress and cancellation."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    _ids = itertools.count(1)
+
+    def __init__(self, func, description="", on_done=None, on_error=None, on_progress=None):
+        self.id = next(Job._ids)
+        self.description = description
+        self.status = Job.PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        # Encapsulation: the callable and callbacks are only touched by the executor
+        self._func = func
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._cancel_event = threading.Event()
+        self._executor = None
+
+    def cancel(self):
+        """Requests cancellation. Pending jobs are skipped, running jobs stop cooperatively."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raises JobCancelled if cancel() was called; job functions call this between steps."""
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.description)
+
+    def report_progress(self, fraction, message=None, payload=None):
+        """Called from the worker thread; delivered to on_progress on the polling thread."""
+        self.progress = max(0.0, min(1.0, float(fraction)))
+        if message is not None:
+            self.message = message
+        if self._executor is not None:
+            self._executor._post(self, "progress", payload)
+
+    @property
+    def is_finished(self):
+        return self.status in (Job.DONE, Job.FAILED, Job.CANCELLED)
+
+    def __repr__(self):
+        return f"Job(id={self.id}, description={self.description!r}, status={self.status})"
+
+
+class JobExecutor:
+    """
+    Runs jobs on a background worker thread so the Tk main loop never blocks.
+    Jobs are queued in a bounded FIFO; completion and progress callbacks are
+    delivered on whichever thread calls poll() (the Tk thread via attach()).
+    """
+
+    def __init__(self, max_queue=8):
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._events = queue.Queue()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._current = None
+        self._shutdown = False
+        self._root = None
+        self._poll_interval = 100
+        self._listeners = []
+        self._worker = threading.Thread(target=self._work_loop, name="JobExecutor", daemon=True)
+        self._worker.start()
+
+    def submit(self, func, description="", on_done=None, on_error=None, on_progress=None):
+        """
+        Queues func(job) for execution and returns the Job.
+        Raises JobQueueFull if the queue is at capacity.
+        """
+        if self._shutdown:
+            raise RuntimeError("Executor has been shut down.")
+        job = Job(func, description, on_done, on_error, on_progress)
+        job._executor = self
+        with self._lock:
+            try:
+                self._jobs.put_nowait(job)
+            except queue.Full:
+                raise JobQueueFull(f"Job queue is full ({self._jobs.maxsize} jobs waiting).")
+            self._pending.append(job)
+        self._notify()
+        return job
+
+    @property
+    def current_job(self):
+        return self._current
+
+    def pending_jobs(self):
+        """Returns the jobs still waiting to run, oldest first."""
+        with self._lock:
+            return [job for job in self._pending if not job.is_cancelled()]
+
+    def cancel_all(self):
+        """Cancels the running job and every queued job."""
+        with self._lock:
+            for job in self._pending:
+                job.cancel()
+        current = self._current
+        if current is not None:
+            current.cancel()
+
+    def add_listener(self, callback):
+        """Registers callback(executor) to be called on the polling thread whenever job state changes."""
+        self._listeners.append(callback)
+
+    def attach(self, root, interval_ms=100):
+        """Starts polling for job events with root.after so callbacks run on the Tk thread."""
+        self._root = root
+        self._poll_interval = interval_ms
+        self._root.after(self._poll_interval, self._poll_tick)
+
+    def poll(self):
+        """Delivers all queued job events to their callbacks. Must be called from the UI thread."""
+        changed = False
+        while True:
+            try:
+                job, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            changed = True
+            try:
+                if kind == "progress" and job._on_progress:
+                    job._on_progress(job, payload)
+                elif kind == "done" and job._on_done:
+                    job._on_done(job.result)
+                elif kind == "failed" and job._on_error:
+                    job._on_error(job.error)
+            except Exception as e:
+                print(f"Error in job callback for {job!r}: {e}")
+        if changed:
+            for listener in self._listeners:
+                listener(self)
+
+    def shutdown(self, wait=False):
+        """Stops accepting work, cancels queued jobs and stops the worker."""
+        self._shutdown = True
+        self.cancel_all()
+        try:
+            self._jobs.put_nowait(None)
+        except queue.Full:
+            pass
+        if wait:
+            self._worker.join()
+
+    def _poll_tick(self):
+        self.poll()
+        if not self._shutdown and self._root is not None:
+            self._root.after(self._poll_interval, self._poll_tick)
+
+    def _post(self, job, kind, payload=None):
+        self._events.put((job, kind, payload))
+
+    def _notify(self):
+        self._events.put((None, "state", None))
+
+    def _work_loop(self):
+        while not self._shutdown:
+            # shutdown() posts a None sentinel; the timeout covers a full queue
+            try:
+                job = self._jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if job is None:
+                break
+            with self._lock:
+                if job in self._pending:
+                    self._pending.remove(job)
+            if job.is_cancelled():
+                job.status = Job.CANCELLED
+                self._post(job, "cancelled")
+                continue
+
+            self._current = job
+            job.status = Job.RUNNING
+            job.started_at = time.monotonic()
+            self._notify()
+            try:
+                result = job._func(job)
+                if job.is_cancelled():
+                    raise JobCancelled(job.description)
+                job.result = result
+                job.progress = 1.0
+                job.status, kind = Job.DONE, "done"
+            except JobCancelled:
+                job.status, kind = Job.CANCELLED, "cancelled"
+            except Exception as e:
+                # A model that stops early because cancel() was requested is cancelled, not failed
+                if job.is_cancelled():
+                    job.status, kind = Job.CANCELLED, "cancelled"
+                else:
+                    job.error = e
+                    job.status, kind = Job.FAILED, "failed"
+            # Clear the current job before posting so listeners never see a finished job as running
+            job.finished_at = time.monotonic()
+            self._current = None
+            self._post(job, kind)
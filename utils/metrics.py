@@ -0,0 +1,154 @@
+# --- FILE: utils/metrics.py ---
+import atexit
+import json
+import math
+import threading
+import time
+from collections import deque
+
+LOG_FILE = "function_log.txt"
+METRICS_FILE = "function_metrics.jsonl"
+
+
+class LatencyHistogram:
+    """Rolling latency statistics for one function: counts, errors and percentiles over a window."""
+
+    def __init__(self, window=2048):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration, error=False):
+        self._samples.append(duration)
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q):
+        """Nearest-rank percentile (q in 0..100) over the rolling window."""
+        samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        rank = max(0, min(len(samples) - 1, math.ceil(q / 100.0 * len(samples)) - 1))
+        return samples[rank]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max
+        }
+
+
+class MetricsSink:
+    """
+    Buffers metric records in memory and flushes them in batches on a background
+    thread, so instrumented calls never touch the filesystem. Each flush appends
+    structured records to METRICS_FILE (JSONL) and the human-readable lines to LOG_FILE.
+    Per-function latency histograms are kept in-process and queried with get_stats().
+    """
+
+    def __init__(self, log_file=LOG_FILE, metrics_file=METRICS_FILE,
+                 flush_interval=1.0, max_buffer=512, window=2048):
+        self.log_file = log_file
+        self.metrics_file = metrics_file
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._window = window
+        self._buffer = deque()
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def record_call(self, name):
+        """Records that a function was entered."""
+        self._append({"event": "call", "function": name, "ts": time.time()})
+
+    def record_timing(self, name, duration, error=False):
+        """Records one completed call's duration (seconds, monotonic clock) and whether it raised."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self._window)
+            histogram.add(duration, error)
+        self._append({"event": "timing", "function": name, "ts": time.time(),
+                      "duration": duration, "error": error})
+
+    def get_stats(self, name=None):
+        """Returns the latency summary for one function, or for all functions keyed by name."""
+        with self._lock:
+            if name is not None:
+                histogram = self._histograms.get(name)
+                return histogram.summary() if histogram else None
+            return {key: histogram.summary() for key, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def flush(self):
+        """Writes all buffered records now. Safe to call from any thread."""
+        with self._flush_lock:
+            records = []
+            while self._buffer:
+                records.append(self._buffer.popleft())
+            if not records:
+                return
+            try:
+                with open(self.metrics_file, "a") as f:
+                    f.writelines(json.dumps(record) + "\n" for record in records)
+                with open(self.log_file, "a") as f:
+                    f.writelines(self._format_line(record) for record in records)
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _append(self, record):
+        self._buffer.append(record)
+        self._ensure_started()
+        if len(self._buffer) >= self.max_buffer:
+            self._wake.set()
+
+    def _ensure_started(self):
+        if self._thread is None and not self._closed:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="MetricsSink", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    @staticmethod
+    def _format_line(record):
+        # Same text format the decorators used to write directly
+        function = record["function"].rsplit(".", 1)[-1]
+        if record["event"] == "call":
+            return f"[LOG] Running {function} at {time.ctime(record['ts'])}\n"
+        status = " (error)" if record.get("error") else ""
+        return f"[TIME] {function} executed in {record['duration']:.4f} sec{status}\n"
+
+
+# Process-wide sink fed by the decorators in utils/decorators.py
+metrics = MetricsSink()
@@ -0,0 +1,269 @@
+# --- FILE: utils/result_cache.py ---
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = os.path.join(".model_cache", "results")
+
+
+def normalize_input(input_data):
+    """Collapses whitespace so trivially different resubmissions share a cache entry."""
+    if isinstance(input_data, str):
+        return " ".join(input_data.split())
+    return input_data
+
+
+def make_cache_key(model_id, input_data, params=None):
+    """Content address for one prediction: hash of (model id, normalized input, generation params)."""
+    payload = json.dumps([model_id, normalize_input(input_data), params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    """In-memory LRU bounded by entry count and an approximate byte budget."""
+
+    def __init__(self, max_entries=256, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, model_id, value, size):
+        if size > self.max_bytes:
+            return
+        self.remove(key)
+        self._entries[key] = (model_id, value, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def remove_model(self, model_id):
+        for key in [key for key, entry in self._entries.items() if entry[0] == model_id]:
+            self.remove(key)
+
+    def retain_models(self, model_ids):
+        for key in [key for key, entry in self._entries.items() if entry[0] not in model_ids]:
+            self.remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskTier:
+    """
+    Persistent tier: a small SQLite key-value index holding JSON-encoded results,
+    plus payload files (e.g. generated images) copied into the cache directory.
+    Least recently used entries are evicted once max_bytes of payload files or
+    max_entries rows is exceeded.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=2 * 1024 ** 3, max_entries=100000):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._files_dir = os.path.join(cache_dir, "files")
+        os.makedirs(self._files_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, model_id TEXT, value TEXT, file TEXT,"
+            " size INTEGER, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_model ON entries (model_id)")
+        self._db.commit()
+
+    def get(self, key):
+        row = self._db.execute("SELECT value, file FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, file_path = row
+        if file_path and not os.path.exists(file_path):
+            self.remove(key)
+            return None
+        self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return json.loads(value), file_path
+
+    def put(self, key, model_id, value, source_file=None):
+        """Stores an entry; returns (cached file path or None, keys evicted to stay within budget)."""
+        file_path, size = None, 0
+        if source_file:
+            file_path = os.path.join(self._files_dir, key + os.path.splitext(source_file)[1])
+            shutil.copyfile(source_file, file_path)
+            size = os.path.getsize(file_path)
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (key, model_id, value, file, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model_id, json.dumps(value), file_path, size, time.time())
+        )
+        self._db.commit()
+        return file_path, self._evict()
+
+    def remove(self, key):
+        row = self._db.execute("SELECT file FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        self._delete_file(row[0])
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._db.commit()
+
+    def remove_model(self, model_id):
+        for (file_path,) in self._db.execute("SELECT file FROM entries WHERE model_id = ?", (model_id,)).fetchall():
+            self._delete_file(file_path)
+        self._db.execute("DELETE FROM entries WHERE model_id = ?", (model_id,))
+        self._db.commit()
+
+    def retain_models(self, model_ids):
+        model_ids = list(model_ids)
+        where = f"model_id NOT IN ({', '.join('?' * len(model_ids))})"
+        for (file_path,) in self._db.execute(f"SELECT file FROM entries WHERE {where}", model_ids).fetchall():
+            self._delete_file(file_path)
+        self._db.execute(f"DELETE FROM entries WHERE {where}", model_ids)
+        self._db.commit()
+
+    def clear(self):
+        for (file_path,) in self._db.execute("SELECT file FROM entries").fetchall():
+            self._delete_file(file_path)
+        self._db.execute("DELETE FROM entries")
+        self._db.commit()
+
+    @property
+    def size_bytes(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        evicted = []
+        total, count = self.size_bytes, len(self)
+        if total <= self.max_bytes and count <= self.max_entries:
+            return evicted
+        rows = self._db.execute("SELECT key, file, size FROM entries ORDER BY last_access").fetchall()
+        for key, file_path, size in rows:
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            self._delete_file(file_path)
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            count -= 1
+            self.evictions += 1
+            evicted.append(key)
+        self._db.commit()
+        return evicted
+
+    @staticmethod
+    def _delete_file(file_path):
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU + disk) cache of prediction results, keyed by make_cache_key().
+    Models opt in through models.mixins.CachingMixin, which handles encoding results.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_entries=256, max_memory_bytes=256 * 1024 * 1024,
+                 max_disk_bytes=2 * 1024 ** 3, max_disk_entries=100000, use_disk=True):
+        self.memory = MemoryTier(max_memory_entries, max_memory_bytes)
+        self.disk = DiskTier(cache_dir, max_disk_bytes, max_disk_entries) if use_disk else None
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    def get(self, key):
+        """Returns ("memory", value) or ("disk", (encoded_value, file_path)), or None on a miss."""
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.hits["memory"] += 1
+                return "memory", entry[1]
+            if self.disk is not None:
+                stored = self.disk.get(key)
+                if stored is not None:
+                    self.hits["disk"] += 1
+                    return "disk", stored
+            self.misses += 1
+            return None
+
+    def put_memory(self, key, model_id, value, size=None):
+        with self._lock:
+            self.memory.put(key, model_id, value, size if size is not None else sys.getsizeof(value))
+
+    def put_disk(self, key, model_id, encoded_value, source_file=None):
+        """Stores an encoded result on disk; returns the cached copy of source_file, if any."""
+        if self.disk is None:
+            return None
+        with self._lock:
+            file_path, evicted = self.disk.put(key, model_id, encoded_value, source_file)
+            # Memory entries may reference the evicted files
+            for evicted_key in evicted:
+                self.memory.remove(evicted_key)
+            return None if key in evicted else file_path
+
+    def invalidate_model(self, model_id):
+        """Drops every entry produced by model_id from both tiers."""
+        with self._lock:
+            self.memory.remove_model(model_id)
+            if self.disk is not None:
+                self.disk.remove_model(model_id)
+
+    def retain_models(self, model_ids):
+        """Drops every entry not produced by one of model_ids, e.g. left over from a replaced model."""
+        model_ids = set(model_ids)
+        with self._lock:
+            self.memory.retain_models(model_ids)
+            if self.disk is not None:
+                self.disk.retain_models(model_ids)
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self.disk is not None:
+                self.disk.clear()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+            return {
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory.size_bytes,
+                "memory_evictions": self.memory.evictions,
+                "disk_entries": len(self.disk) if self.disk else 0,
+                "disk_bytes": self.disk.size_bytes if self.disk else 0,
+                "disk_evictions": self.disk.evictions if self.disk else 0
+            }